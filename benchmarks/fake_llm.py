@@ -0,0 +1,210 @@
+"""
+Deterministic stand-in for the OpenAI models used by the crews.
+
+`ScriptedLLM` plays the agents' side of every crew task with the ReAct text
+protocol crewai parses ("Action:" / "Action Input:" / "Final Answer:"), so
+the real agent executors, tools and Trello integration run unchanged. It
+works out its next step from the tool observations already in the prompt,
+which keeps it stateless and safe to share between concurrent crews.
+With `stream`, completions are also delivered as stream chunk events, with
+the call's latency spread over the chunks like a model generating tokens.
+"""
+import ast
+import json
+import re
+import time
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+
+LIST_NAMES = ["Backlog", "To Do", "In Progress", "Code Review", "Testing", "Done"]
+LIST_ID_KEYS = ["backlog_list_id", "todo_list_id", "in_progress_list_id", "review_list_id", "testing_list_id", "done_list_id"]
+CATEGORIES = ["Backend", "Frontend", "Database", "DevOps", "Testing", "Documentation"]
+PRIORITIES = ["Critical", "High", "Medium", "Low"]
+CHECKLIST_ITEMS = 3
+STREAM_CHUNK_SIZE = 64
+
+# Tool results only; the task descriptions quote the same messages without the trailing context
+CREATED_LIST = re.compile(r"Successfully created list '([^']+)' \(ID: ([^)]+)\) on board")
+CREATED_CARD = re.compile(r"Successfully created card '.*?' \(ID: ([^)]+)\) in list")
+CREATED_CHECKLIST = re.compile(r"Successfully created checklist '.*?' \(ID: ([^)]+)\) on card")
+ADDED_ITEM = re.compile(r"Successfully added item '")
+CREATED_LABEL = re.compile(r"Successfully created \w+ label '")
+CARD_SPECIFICATION = re.compile(r"Card Specification: (\{.*?\})\s*STEP 1", re.DOTALL)
+BOARD_ID = re.compile(r"Board ID: (\S+)")
+WORKSTREAM = re.compile(r"ONE workstream of the project: (.+)")
+
+
+def _prompt_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+
+def _action(tool: str, arguments: dict) -> str:
+    return f"Thought: I should use the {tool} tool.\nAction: {tool}\nAction Input: {json.dumps(arguments)}"
+
+
+def _final_answer(answer) -> str:
+    if not isinstance(answer, str):
+        answer = json.dumps(answer)
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+class ScriptedLLM(BaseLLM):
+    def __init__(self, model: str, card_count: int, latency: float = 0.0, stream: bool = False):
+        super().__init__(model=model, temperature=0, provider="openai")
+        self.card_count = card_count
+        self.latency = latency
+        self.stream = stream
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        self._emit_call_started_event(messages=messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+        prompt = _prompt_text(messages)
+        respond = getattr(self, f"_respond_{from_task.name}", None) if from_task else None
+        response = respond(prompt) if respond else self._respond_research(prompt)
+
+        if self.stream:
+            chunks = [response[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(response), STREAM_CHUNK_SIZE)]
+            for chunk in chunks:
+                if self.latency:
+                    time.sleep(self.latency / len(chunks))
+                self._emit_stream_chunk_event(chunk=chunk, from_task=from_task, from_agent=from_agent)
+        elif self.latency:
+            time.sleep(self.latency)
+
+        # Rough 4-characters-per-token estimate, enough to compare runs
+        self._track_token_usage_internal({
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(response) // 4,
+        })
+        self._emit_call_completed_event(response=response, call_type=LLMCallType.LLM_CALL,
+                                        from_task=from_task, from_agent=from_agent, messages=messages)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+    # ============================ Task scripts ============================
+
+    def _respond_research(self, prompt: str) -> str:
+        return _final_answer(
+            "Research level: minimal. The project description is detailed enough to plan from; "
+            "no external research topics were required."
+        )
+
+    def _respond_create_board_structure_task(self, prompt: str) -> str:
+        created = dict(CREATED_LIST.findall(prompt))
+        for position, name in enumerate(LIST_NAMES, start=1):
+            if name not in created:
+                board_id = BOARD_ID.search(prompt).group(1)
+                return _action("Create Trello List", {"board_id": board_id, "list_name": name, "position": position})
+        return _final_answer({key: created[name] for key, name in zip(LIST_ID_KEYS, LIST_NAMES)})
+
+    def _respond_task_generation_task(self, prompt: str) -> str:
+        tasks = []
+        for index in range(self.card_count):
+            category = CATEGORIES[index % len(CATEGORIES)]
+            priority = PRIORITIES[index % len(PRIORITIES)]
+            tasks.append({
+                "task_id": f"T{index + 1}",
+                "title": f"{category} work package {index + 1}",
+                "description": f"Deliver the {category.lower()} scope of work package {index + 1}.",
+                "category": category,
+                "priority": priority,
+                "estimated_days": 3 + index % 5,
+                "acceptance_criteria": [f"Criterion {item + 1}" for item in range(CHECKLIST_ITEMS)],
+                "dependencies": [f"T{index}"] if index else [],
+            })
+        return _final_answer(tasks)
+
+    def _planned_task(self, index: int) -> dict:
+        category = CATEGORIES[index % len(CATEGORIES)]
+        priority = PRIORITIES[index % len(PRIORITIES)]
+        # Each work package builds on the previous one of its category
+        previous = index - len(CATEGORIES)
+        return {
+            "id": f"T{index + 1}",
+            "title": f"{category} work package {index + 1}",
+            "summary": f"Deliver the {category.lower()} scope of work package {index + 1}.",
+            "category": category,
+            "priority": priority,
+            "estimate_days": 3 + index % 5,
+            "depends_on": [f"T{previous + 1}"] if previous >= 0 else [],
+            "criteria": [f"Criterion {item + 1}" for item in range(CHECKLIST_ITEMS)],
+        }
+
+    def _respond_card_specifications_task(self, prompt: str) -> str:
+        return _final_answer({"tasks": [self._planned_task(index) for index in range(self.card_count)]})
+
+    def _respond_workstream_outline_task(self, prompt: str) -> str:
+        return _final_answer({"workstreams": [
+            {"name": category, "scope": f"All {category.lower()} work of the project."} for category in CATEGORIES
+        ]})
+
+    def _respond_workstream_card_specifications_task(self, prompt: str) -> str:
+        # The same tasks as the single-call plan, split by category
+        workstream = WORKSTREAM.search(prompt).group(1).strip()
+        tasks = [
+            self._planned_task(index)
+            for index in range(self.card_count)
+            if CATEGORIES[index % len(CATEGORIES)] == workstream
+        ]
+        return _final_answer({"tasks": tasks})
+
+    def _respond_create_single_card_task(self, prompt: str) -> str:
+        # The specification is interpolated into the task description as a Python dict
+        specification = ast.literal_eval(CARD_SPECIFICATION.search(prompt).group(1))
+
+        card = CREATED_CARD.search(prompt)
+        if card is None:
+            return _action("Create Trello Card", {
+                "list_id": specification["list_id"],
+                "card_name": specification["card_name"],
+                "description": specification["description"],
+                "team_member_ids": json.dumps(specification.get("team_member_ids", [])),
+                "start_date": specification["start_date"],
+                "end_date": specification["end_date"],
+            })
+        card_id = card.group(1)
+
+        checklist = CREATED_CHECKLIST.search(prompt)
+        if checklist is None:
+            return _action("Create Checklist on Card", {"card_id": card_id, "checklist_name": "Acceptance Criteria"})
+
+        items_added = len(ADDED_ITEM.findall(prompt))
+        if items_added < len(specification["checklist_items"]):
+            return _action("Add Item to Checklist", {
+                "checklist_id": checklist.group(1),
+                "item_name": specification["checklist_items"][items_added],
+            })
+
+        labels_created = len(CREATED_LABEL.findall(prompt))
+        if labels_created < len(specification["labels"]):
+            label = specification["labels"][labels_created]
+            return _action("Create Label", {"card_id": card_id, "label_name": label["name"], "color": label["color"]})
+
+        return _final_answer({
+            "card_id": card_id,
+            "card_name": specification["card_name"],
+            "checklist_created": True,
+            "checklist_items_added": items_added,
+            "labels_created": labels_created,
+            "status": "completed",
+        })
@@ -0,0 +1,164 @@
+"""
+Local stand-in for the Trello REST API.
+
+Serves the endpoints the Trello integration uses from in-memory state and
+counts requests per operation. `redirect_trello` points py-trello, which
+hardcodes https://trello.com/1, at the local server.
+"""
+import contextlib
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+TRELLO_API_URL = "https://trello.com/1"
+
+# (method, path segments) -> operation name; "*" matches any id
+ROUTES = {
+    ("POST", ("boards",)): "create_board",
+    ("PUT", ("boards", "*")): "update_board",
+    ("DELETE", ("boards", "*")): "delete_board",
+    ("GET", ("boards", "*", "members")): "get_board_members",
+    ("PUT", ("boards", "*", "members")): "invite_board_member",
+    ("GET", ("boards", "*", "lists")): "get_board_lists",
+    ("POST", ("lists",)): "create_list",
+    ("PUT", ("lists", "*")): "update_list",
+    ("POST", ("cards",)): "create_card",
+    ("PUT", ("cards", "*")): "update_card",
+    ("DELETE", ("cards", "*")): "delete_card",
+    ("POST", ("cards", "*", "labels")): "create_label",
+    ("POST", ("cards", "*", "checklists")): "create_checklist",
+    ("POST", ("checklists", "*", "checkItems")): "create_checkitem",
+}
+
+
+class FakeTrelloState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.objects: dict[str, dict] = {}
+        self.board_members: dict[str, list[dict]] = {}
+        self.requests = Counter()
+
+    def new_id(self) -> str:
+        return f"{next(self._ids):024x}"
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    def handle(self, operation: str, ids: list[str], data: dict):
+        with self._lock:
+            self.requests[operation] += 1
+            if operation in ("get_board_members", "invite_board_member"):
+                members = self.board_members.setdefault(ids[0], [])
+                if operation == "invite_board_member":
+                    members.append({"id": self.new_id(), "fullName": data.get("fullName"), "email": data.get("email")})
+                return {"id": ids[0], "members": members} if operation == "invite_board_member" else members
+            if operation == "get_board_lists":
+                return [obj for obj in self.objects.values() if obj.get("idBoard") == ids[0]]
+            if operation.startswith(("update_", "delete_")):
+                obj = self.objects.get(ids[0])
+                if obj is None:
+                    return None
+                if operation.startswith("delete_"):
+                    return self.objects.pop(ids[0])
+                obj.update(data)
+                return obj
+
+            obj = {"id": self.new_id(), **data}
+            if operation == "create_label":
+                obj["idCard"] = ids[0]
+            elif operation == "create_checklist":
+                obj["idCard"] = ids[0]
+                obj["checkItems"] = []
+            elif operation == "create_checkitem":
+                checklist = self.objects.get(ids[0])
+                if checklist is None:
+                    return None
+                checklist["checkItems"].append(obj)
+            self.objects[obj["id"]] = obj
+            return obj
+
+
+def _route(method: str, path: str):
+    segments = tuple(segment for segment in path.split("/") if segment)[1:]  # drop the "1" version prefix
+    for (route_method, pattern), operation in ROUTES.items():
+        if route_method != method or len(pattern) != len(segments):
+            continue
+        if all(part == "*" or part == segment for part, segment in zip(pattern, segments)):
+            ids = [segment for part, segment in zip(pattern, segments) if part == "*"]
+            return operation, ids
+    return None, []
+
+
+class FakeTrelloHandler(BaseHTTPRequestHandler):
+    server: "FakeTrelloServer"
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        operation, ids = _route(self.command, url.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        data = dict(parse_qsl(self.rfile.read(length).decode("utf-8"))) if length else {}
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        body = self.server.state.handle(operation, ids, data) if operation else None
+        status = 200 if body is not None else 404
+        payload = json.dumps(body if body is not None else {"message": "not found"}).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTrelloServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeTrelloHandler)
+        self.latency = latency
+        self.state = FakeTrelloState()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-trello", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextlib.contextmanager
+def redirect_trello(base_url: str):
+    """Sends every request made to the Trello API to `base_url` instead."""
+    original = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        if isinstance(url, str) and url.startswith(TRELLO_API_URL):
+            url = base_url + url[len(TRELLO_API_URL):]
+        return original(session, method, url, *args, **kwargs)
+
+    with mock.patch.object(requests.Session, "request", request):
+        yield
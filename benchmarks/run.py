@@ -0,0 +1,294 @@
+"""
+End-to-end benchmark of the project flow.
+
+Runs `run_flow` against a local fake Trello server and scripted LLMs for every
+combination of card count, team size and execution concurrency, and reports
+wall time, LLM and Trello calls per stage, throughput and peak memory.
+Everything runs offline; each case runs in a fresh process so peak memory
+and module state are not shared between cases.
+
+    python -m benchmarks.run --cards 10,50 --team-sizes 3,10 --concurrency 1,4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+from datetime import date
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+# Keeps crewai from collecting first-run traces, which need app.crewai.com
+os.environ.setdefault("CREWAI_TESTING", "true")
+# The crews build their LLM clients at import time; the scripted LLMs replace them before any call
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("TRELLO_API_KEY", "benchmark")
+os.environ.setdefault("TRELLO_API_TOKEN", "benchmark")
+
+STAGES = ("research", "planning", "execution")
+FLOW_STAGES = ("run_research_crew", "run_planning_crew", "run_execution_crew")
+# Roles and skills the benchmark team members cycle through
+MEMBER_PROFILES = [
+    ("Backend Developer", ["python", "django", "postgresql"]),
+    ("Frontend Developer", ["react", "typescript", "css"]),
+    ("DevOps Engineer", ["docker", "kubernetes", "ci/cd"]),
+    ("QA Engineer", ["pytest", "testing", "playwright"]),
+]
+
+
+def _setup_django():
+    import django
+
+    django.setup()
+    # Progress events and metrics go to Redis when it is reachable; don't flood the report otherwise
+    for name in ("project.events", "pm_master.metrics"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def _parse_ints(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _create_project(team_size: int):
+    from integrations.boards import get_board_integration
+    from organization.models import Organization, User
+    from project.models import Project, ProjectMember
+
+    admin, _ = User.objects.get_or_create(username="benchmark", defaults={"email": "benchmark@example.com"})
+    organization, _ = Organization.objects.get_or_create(name="Benchmark", admin=admin)
+    project = Project.objects.create(
+        name="Benchmark Project",
+        industry="Software",
+        description="A web application that uses AI agents to manage projects",
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 12, 31),
+        organization=organization,
+    )
+    members = [
+        ProjectMember.objects.create(
+            project=project,
+            name=f"Member {index + 1}",
+            email=f"member{index + 1}@example.com",
+            role=MEMBER_PROFILES[index % len(MEMBER_PROFILES)][0],
+            skills=MEMBER_PROFILES[index % len(MEMBER_PROFILES)][1],
+        )
+        for index in range(team_size)
+    ]
+
+    board_integration = get_board_integration()
+    board = board_integration.create_board(project.name, project.description, team_members=[])
+    member_mapping = board_integration.invite_team_members(
+        board["id"], [{"name": member.name, "email": member.email} for member in members],
+    )
+    for member in members:
+        member.set_trello_member_id(member_mapping.get(member.email))
+    project.trello_board_id = board["id"]
+    project.save()
+    return project, members
+
+
+def _stage_timer():
+    """Returns the start/finish timestamps of flow stages and the first card, collected from crewai's event bus."""
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.flow_events import MethodExecutionFinishedEvent, MethodExecutionStartedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+
+    timestamps = {}
+
+    @crewai_event_bus.on(MethodExecutionStartedEvent)
+    def on_started(source, event):
+        timestamps.setdefault(event.method_name, {})["started"] = event.timestamp
+
+    @crewai_event_bus.on(MethodExecutionFinishedEvent)
+    def on_finished(source, event):
+        timestamps.setdefault(event.method_name, {})["finished"] = event.timestamp
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        if event.tool_name == "Create Trello Card":
+            timestamps.setdefault("first_card", event.timestamp)
+
+    return timestamps
+
+
+def run_case(cards: int, team_size: int, concurrency: int, trello_url: str, llm_latency: float,
+             stream: bool, planning_mode: str, trace_memory: bool, verbose: bool) -> dict:
+    """Runs one flow in this process and returns its measurements; `trello_url` is None for the local board."""
+    _setup_django()
+    from django.test import override_settings
+
+    from benchmarks.fake_llm import ScriptedLLM
+    from benchmarks.fake_trello import redirect_trello
+    from crews import execution_crew, planning_crew, research_crew
+    from crews.main import run_flow
+    from integrations.local_board import local_board
+    from project.models import LLMUsage
+
+    for module in (research_crew, planning_crew, execution_crew):
+        module.llm.use_backend(ScriptedLLM(
+            module.llm.model, card_count=cards, latency=llm_latency, stream=stream and module is planning_crew,
+        ))
+    stage_timestamps = _stage_timer()
+
+    with redirect_trello(trello_url) if trello_url else contextlib.nullcontext():
+        project, members = _create_project(team_size)
+        project_data = {
+            "project_name": project.name,
+            "industry": project.industry,
+            "project_description": project.description,
+            "team_members": [
+                {"name": m.name, "email": m.email, "role": m.role, "skills": m.skills, "trello_member_id": m.trello_member_id}
+                for m in members
+            ],
+            "project_timeline": f"{project.start_date} to {project.end_date}",
+            "board_id": project.trello_board_id,
+            "project_id": str(project.id),
+        }
+
+        if trace_memory:
+            tracemalloc.start()
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        started_at = time.perf_counter()
+        with override_settings(EXECUTION_CONCURRENCY=concurrency, PLAN_STREAMING=stream, PLANNING_MODE=planning_mode), output:
+            asyncio.run(run_flow(project_data))
+        wall_time = time.perf_counter() - started_at
+        python_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    usage = {row["stage"]: row for row in LLMUsage.objects.filter(project=project).by_stage()}
+    flow_started = stage_timestamps.get(FLOW_STAGES[0], {}).get("started")
+    first_card = stage_timestamps.get("first_card")
+    stage_seconds = {}
+    for stage in FLOW_STAGES:
+        timestamps = stage_timestamps.get(stage, {})
+        if "started" in timestamps and "finished" in timestamps:
+            stage_seconds[stage] = round((timestamps["finished"] - timestamps["started"]).total_seconds(), 3)
+
+    result = {
+        "cards": cards,
+        "team_size": team_size,
+        "concurrency": concurrency,
+        "wall_time_s": round(wall_time, 3),
+        "cards_per_s": round(cards / wall_time, 3) if wall_time else None,
+        "stage_seconds": stage_seconds,
+        "first_card_s": round((first_card - flow_started).total_seconds(), 3) if first_card and flow_started else None,
+        "llm_calls": {stage: usage.get(stage, {}).get("calls", 0) for stage in STAGES},
+        "tokens": sum((row["prompt_tokens"] or 0) + (row["completion_tokens"] or 0) for row in usage.values()),
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_python_mb": round(python_peak / 1024 / 1024, 1) if python_peak is not None else None,
+    }
+    if trello_url is None:
+        result["trello_calls"] = dict(local_board.operations)
+    return result
+
+
+def _run_isolated(pool_context, **case) -> dict:
+    with pool_context.Pool(processes=1) as pool:
+        return pool.apply(run_case, kwds=case)
+
+
+def _format_table(results: list[dict]) -> str:
+    headers = ["cards", "team", "conc", "wall s", "cards/s", "first card s", "research s", "planning s", "execution s",
+               "llm calls (r/p/e)", "trello calls", "tokens", "rss MB", "py MB"]
+    rows = []
+    for result in results:
+        stage_seconds = result["stage_seconds"]
+        rows.append([
+            result["cards"],
+            result["team_size"],
+            result["concurrency"],
+            result["wall_time_s"],
+            result["cards_per_s"],
+            result["first_card_s"] if result["first_card_s"] is not None else "-",
+            *(stage_seconds.get(stage, "-") for stage in FLOW_STAGES),
+            "/".join(str(result["llm_calls"][stage]) for stage in STAGES),
+            sum(result["trello_calls"].values()),
+            result["tokens"],
+            result["peak_rss_mb"],
+            result["peak_python_mb"] if result["peak_python_mb"] is not None else "-",
+        ])
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(value).rjust(width) for value, width in zip(row, widths)) for row in [headers, *rows]]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the project flow end to end against local stand-ins.")
+    parser.add_argument("--cards", default="10,50", help="comma-separated card counts")
+    parser.add_argument("--team-sizes", default="3,10", help="comma-separated team sizes")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated EXECUTION_CONCURRENCY values")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds each scripted LLM call sleeps")
+    parser.add_argument("--trello-latency", type=float, default=0.0, help="seconds each fake Trello request sleeps")
+    parser.add_argument("--board", choices=("http", "local"), default="http",
+                        help="fake Trello HTTP server, or the in-memory local board backend")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the planned cards to the execution crew while they are generated")
+    parser.add_argument("--planning-mode", choices=("single", "workstreams"), default="single",
+                        help="plan in one crew run, or per workstream concurrently (PLANNING_MODE)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report peak Python heap (slows the run)")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the crews' console output")
+    args = parser.parse_args()
+
+    if args.board == "local":
+        # Inherited by the case processes, which select the board backend at import
+        os.environ["BOARD_BACKEND"] = "local"
+    _setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from benchmarks.fake_trello import FakeTrelloServer
+
+    database = settings.DATABASES["default"]["NAME"]
+    if os.path.exists(database):
+        os.remove(database)
+    call_command("migrate", verbosity=0, interactive=False)
+
+    server = FakeTrelloServer(latency=args.trello_latency).start() if args.board == "http" else None
+    pool_context = multiprocessing.get_context("spawn")
+    results = []
+    try:
+        for cards, team_size, concurrency in itertools.product(
+            _parse_ints(args.cards), _parse_ints(args.team_sizes), _parse_ints(args.concurrency)
+        ):
+            if server is not None:
+                server.state.reset_counts()
+            result = _run_isolated(
+                pool_context,
+                cards=cards,
+                team_size=team_size,
+                concurrency=concurrency,
+                trello_url=server.url if server is not None else None,
+                llm_latency=args.llm_latency,
+                stream=args.stream,
+                planning_mode=args.planning_mode,
+                trace_memory=args.tracemalloc,
+                verbose=args.verbose,
+            )
+            if server is not None:
+                result["trello_calls"] = dict(server.state.requests)
+            results.append(result)
+            print(f"cards={cards} team={team_size} concurrency={concurrency}: {result['wall_time_s']}s", flush=True)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print()
+    print(_format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
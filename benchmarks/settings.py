@@ -0,0 +1,20 @@
+"""
+Settings for offline benchmark runs: a throwaway SQLite database, no trace export and no Trello rate limit.
+"""
+import os
+import tempfile
+
+from pm_master.settings import *  # noqa: F401,F403
+
+SECRET_KEY = SECRET_KEY or "benchmark"
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("BENCHMARK_DB", os.path.join(tempfile.gettempdir(), "pm_master_benchmark.sqlite3")),
+    }
+}
+
+TRACE_EXPORTER = "none"
+# The fake Trello server has no rate limit to respect
+TRELLO_RATE_LIMIT = 0
@@ -1,8 +1,10 @@
-from crewai import Crew, Agent, Task, LLM
+from crewai import Crew, Agent
 from dotenv import load_dotenv
 from integrations.trello_tool import get_all_trello_tools
 from pydantic import BaseModel
-import os
+
+from .llm import build_llm
+from .task import TracedTask
 
 class Label(BaseModel):
    name: str
@@ -16,10 +18,11 @@ class CardSpecification(BaseModel):
    end_date: str
    labels: list[Label]
    checklist_items: list[str]
+   team_member_ids: list[str] = []
 
 load_dotenv()
 
-llm = LLM(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
+llm = build_llm("gpt-4o", stage="execution")
 
 # Get all Trello tools
 trello_tools = get_all_trello_tools()
@@ -49,7 +52,8 @@ trello_card_creator = Agent(
 
 # ================================ Tasks ================================
 
-create_single_card_task = Task(
+create_single_card_task = TracedTask(
+    name="create_single_card_task",
     description="""
     Create Trello card with all details from the specification.
 
@@ -60,7 +64,7 @@ create_single_card_task = Task(
     - list_id: spec.list_id
     - card_name: spec.card_name
     - description: spec.description
-    - team_member_ids: "[]"
+    - team_member_ids: spec.team_member_ids as a JSON array string, e.g. '["5f1b2c3d"]' ('[]' if empty)
     - start_date: spec.start_date
     - end_date: spec.end_date
 
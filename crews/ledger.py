@@ -0,0 +1,158 @@
+import json
+import threading
+
+from django.db import transaction
+
+from planning.calendar import parse_dates, to_dates
+from project.models import CardDependency, LLMUsage, ProjectCard, ProjectMember
+
+
+class UsageLedger:
+    """
+    Collects per-LLM-call usage of the active flow run and persists it as LLMUsage rows.
+
+    Records are buffered in memory and written with a single bulk insert when the
+    run is flushed, so metering adds no database round-trips to LLM calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.project_id = None
+        self.run_id = None
+        self._records: list[dict] = []
+
+    def begin_run(self, project_id: str, run_id: str):
+        with self._lock:
+            self.project_id = project_id
+            self.run_id = run_id
+            self._records = []
+
+    def record(self, **fields):
+        with self._lock:
+            if self.run_id is None:
+                return
+            self._records.append(fields)
+
+    def flush(self) -> int:
+        """Persists the buffered records of the active run and closes it."""
+        with self._lock:
+            project_id, run_id, records = self.project_id, self.run_id, self._records
+            self.project_id, self.run_id, self._records = None, None, []
+
+        if not project_id or not records:
+            return 0
+
+        LLMUsage.objects.bulk_create([
+            LLMUsage(project_id=project_id, run_id=run_id, **fields)
+            for fields in records
+        ])
+        return len(records)
+
+
+usage_ledger = UsageLedger()
+
+
+class CardLedger:
+    """
+    Collects the cards the active flow run creates on the board and persists them as ProjectCard rows.
+
+    Like the usage ledger, records are buffered and bulk-inserted when the run is
+    flushed. Each card keeps its list, dates and assignee (the project member with
+    the card's first board member ID), which the workload views are built from.
+    The card specifications handed to the execution crew are announced with
+    `expect`; a created card is matched to its specification by name, which
+    gives it its task ID, and the dependencies between the run's cards are
+    stored as CardDependency rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.project_id = None
+        self._records: list[dict] = []
+        # normalized card name -> (task ID, dependency task IDs) of the specifications not created yet
+        self._expected: dict[str, list[tuple[str, list[str]]]] = {}
+
+    def begin_run(self, project_id: str):
+        with self._lock:
+            self.project_id = project_id
+            self._records = []
+            self._expected = {}
+
+    def expect(self, card_specification):
+        """Announces a card specification the execution crew is about to create."""
+        if not card_specification.task_id:
+            return
+        with self._lock:
+            if self.project_id is None:
+                return
+            self._expected.setdefault(_name_key(card_specification.card_name), []).append(
+                (card_specification.task_id, list(card_specification.depends_on))
+            )
+
+    def record(self, trello_card_id: str, args: dict):
+        """Records a card the create-card tool has just created, with the arguments it was created from."""
+        with self._lock:
+            if self.project_id is None:
+                return
+            self._records.append({"trello_card_id": trello_card_id, **args})
+
+    def flush(self) -> int:
+        """Persists the cards of the active run and closes it."""
+        with self._lock:
+            project_id, records, expected = self.project_id, self._records, self._expected
+            self.project_id, self._records, self._expected = None, [], {}
+
+        if not project_id or not records:
+            return 0
+
+        members = dict(
+            ProjectMember.objects.filter(project_id=project_id, trello_member_id__isnull=False)
+            .values_list("trello_member_id", "id")
+        )
+        starts = to_dates(parse_dates([record.get("start_date") for record in records]))
+        ends = to_dates(parse_dates([record.get("end_date") for record in records]))
+        cards, dependencies = [], []
+        for record, start_date, end_date in zip(records, starts, ends):
+            # Specifications with the same name are created in the order they were announced
+            specifications = expected.get(_name_key(record.get("card_name") or ""))
+            task_id, depends_on = specifications.pop(0) if specifications else (None, [])
+            dependencies.append(depends_on)
+            cards.append(ProjectCard(
+                project_id=project_id,
+                name=(record.get("card_name") or "")[:255],
+                description=record.get("description") or "",
+                trello_card_id=record["trello_card_id"],
+                task_id=task_id,
+                trello_list_id=record.get("list_id"),
+                assignee_id=next((members[member_id] for member_id in _member_ids(record) if member_id in members), None),
+                start_date=start_date,
+                end_date=end_date,
+            ))
+        with transaction.atomic():
+            ProjectCard.objects.bulk_create(cards)
+            # Dependencies on tasks whose card was not created (invalid, or failed) are dropped
+            cards_by_task = {card.task_id: card for card in cards if card.task_id}
+            CardDependency.objects.bulk_create([
+                CardDependency(project_id=project_id, card=card, depends_on=cards_by_task[dependency])
+                for card, depends_on in zip(cards, dependencies)
+                for dependency in dict.fromkeys(depends_on)
+                if dependency in cards_by_task and cards_by_task[dependency] is not card
+            ])
+        return len(cards)
+
+
+def _name_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def _member_ids(record: dict) -> list:
+    member_ids = record.get("team_member_ids") or []
+    if isinstance(member_ids, str):
+        try:
+            member_ids = json.loads(member_ids)
+        except ValueError:
+            return []
+    return member_ids if isinstance(member_ids, list) else []
+
+
+card_ledger = CardLedger()
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from decimal import Decimal
+from typing import Any
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from django.conf import settings
+
+from pm_master.metrics import cache_requests_total, llm_request_duration_seconds, llm_tokens_total
+from pm_master.tracing import tracer
+
+from .ledger import usage_ledger
+from .progress import progress_listener
+
+# USD per 1M tokens: (prompt, cached prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o-mini": (Decimal("0.15"), Decimal("0.075"), Decimal("0.60")),
+    "gpt-4o": (Decimal("2.50"), Decimal("1.25"), Decimal("10.00")),
+}
+
+PROMPT_EXCERPT_LENGTH = 500
+
+_call_state = threading.local()
+
+
+def normalize_prompt(messages) -> str:
+    """Flattens chat messages into a single whitespace-normalized string."""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "\n".join(
+            f"{message.get('role', '')}: {message.get('content') or ''}"
+            for message in messages
+        )
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def prompt_hash(messages) -> str:
+    return hashlib.sha256(normalize_prompt(messages).encode("utf-8")).hexdigest()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> Decimal:
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return Decimal("0")
+    prompt_price, cached_price, completion_price = pricing
+    uncached_tokens = max(prompt_tokens - cached_tokens, 0)
+    cost = uncached_tokens * prompt_price + cached_tokens * cached_price + completion_tokens * completion_price
+    return (cost / Decimal(1_000_000)).quantize(Decimal("0.000001"))
+
+
+class LLMWrapper(BaseLLM):
+    """Base for LLMs that wrap another crewai LLM and delegate to it what they don't override."""
+
+    def __init__(self, inner: BaseLLM):
+        self._inner = inner
+        super().__init__(model=inner.model, temperature=inner.temperature, provider=inner.provider)
+
+    def __getattr__(self, name: str) -> Any:
+        inner = self.__dict__.get("_inner")
+        if inner is None:
+            raise AttributeError(name)
+        return getattr(inner, name)
+
+    # Agents mutate `llm.stop`; it has to reach the LLM that actually makes the request
+    @property
+    def stop(self) -> list[str]:
+        return self._inner.stop
+
+    @stop.setter
+    def stop(self, value: list[str]):
+        self._inner.stop = value
+
+    def supports_function_calling(self) -> bool:
+        return self._inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._inner.get_context_window_size()
+
+
+class MeteredLLM(LLMWrapper):
+    """
+    Wraps a crewai LLM and records the usage of every call in the run's usage ledger.
+
+    Token counts are taken from the wrapped LLM's own usage tracking, captured per
+    thread so concurrent calls on a shared LLM are attributed correctly.
+    """
+
+    def __init__(self, inner: BaseLLM, stage: str):
+        self.stage = stage
+        super().__init__(inner)
+        self.use_backend(inner)
+
+    def use_backend(self, inner: BaseLLM):
+        """Routes calls to another LLM, e.g. a local stand-in, keeping the stage and metering."""
+        inner._track_token_usage_internal = self._wrap_usage_tracker(inner._track_token_usage_internal)
+        self._inner = inner
+
+    @staticmethod
+    def _wrap_usage_tracker(track):
+        def tracker(usage_data: dict[str, Any]) -> None:
+            track(usage_data)
+            usage = getattr(_call_state, "usage", None)
+            if usage is None:
+                return
+            usage["prompt_tokens"] += usage_data.get("prompt_tokens") or usage_data.get("input_tokens") or 0
+            usage["completion_tokens"] += usage_data.get("completion_tokens") or usage_data.get("output_tokens") or 0
+            usage["cached_tokens"] += usage_data.get("cached_tokens") or usage_data.get("cached_prompt_tokens") or 0
+            usage["cache_hit"] = usage["cache_hit"] or bool(usage_data.get("cache_hit"))
+
+        return tracker
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cache_hit": False}
+        _call_state.usage = usage
+        started_at = time.perf_counter()
+        with tracer.start_as_current_span("llm.call") as span:
+            span.set_attribute("llm.model", self.model)
+            span.set_attribute("llm.stage", self.stage)
+            try:
+                response = self._inner.call(
+                    messages,
+                    tools=tools,
+                    callbacks=callbacks,
+                    available_functions=available_functions,
+                    from_task=from_task,
+                    from_agent=from_agent,
+                    response_model=response_model,
+                )
+            finally:
+                _call_state.usage = None
+            span.set_attribute("llm.prompt_tokens", usage["prompt_tokens"])
+            span.set_attribute("llm.completion_tokens", usage["completion_tokens"])
+            span.set_attribute("llm.cache_hit", usage["cache_hit"])
+        latency = time.perf_counter() - started_at
+        latency_ms = int(latency * 1000)
+        cache_hit = usage["cache_hit"] or usage["cached_tokens"] > 0
+
+        llm_request_duration_seconds.observe(latency, model=self.model, stage=self.stage)
+        for kind in ("prompt", "completion", "cached"):
+            llm_tokens_total.inc(usage[f"{kind}_tokens"], model=self.model, stage=self.stage, kind=kind)
+        cache_requests_total.inc(cache="llm", result="hit" if cache_hit else "miss")
+
+        self._track_token_usage_internal(usage)
+        usage_ledger.record(
+            stage=self.stage,
+            task_name=((from_task.name or from_task.description) if from_task else "")[:255],
+            agent_role=(from_agent.role if from_agent else "")[:255],
+            model=self.model,
+            prompt_hash=prompt_hash(messages),
+            prompt_excerpt=normalize_prompt(messages)[-PROMPT_EXCERPT_LENGTH:],
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+            cached_tokens=usage["cached_tokens"],
+            cost=estimate_cost(self.model, usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"]),
+            latency_ms=latency_ms,
+            cache_hit=cache_hit,
+        )
+        progress_listener.llm_call_finished(
+            self.model, from_agent.role if from_agent else "", latency_ms, usage["prompt_tokens"] + usage["completion_tokens"],
+        )
+        return response
+
+
+def build_llm(model: str, stage: str, **kwargs) -> MeteredLLM:
+    """
+    Creates the LLM used by a crew, metered under the given flow stage.
+
+    `LLM_BACKEND` selects where completions come from: the live OpenAI API, the
+    live API while recording into `LLM_FIXTURES`, or a replay of those fixtures.
+    """
+    from .replay import LLMFixtures, RecordingLLM, ReplayLLM
+
+    backend = settings.LLM_BACKEND
+    if backend == "replay":
+        inner = ReplayLLM(model, LLMFixtures.open(settings.LLM_FIXTURES), latency=settings.LLM_REPLAY_LATENCY)
+    else:
+        inner = LLM(model=model, api_key=os.getenv("OPENAI_API_KEY"), **kwargs)
+        if backend == "record":
+            inner = RecordingLLM(inner, LLMFixtures.open(settings.LLM_FIXTURES))
+    return MeteredLLM(inner, stage=stage)
@@ -1,16 +1,58 @@
 import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from crewai.flow import Flow, start, listen
 from pydantic import BaseModel
 from typing import Optional
 from asgiref.sync import sync_to_async
-
-from .research_crew import research_crew
-from .planning_crew import planning_crew, CardSpecifications
+from django.conf import settings
+
+from .research_crew import research_crew, research_synthesis_crew
+from .planning_crew import (
+    planning_crew,
+    card_specifications_task,
+    workstream_card_specifications_task,
+    llm as planning_llm,
+    CardSpecification,
+    CardSpecifications,
+    CompactPlan,
+)
 from .execution_crew import execution_crew
+from .progress import progress_listener
+from .ledger import card_ledger, usage_ledger
+from .streaming import TaskStream, plan_stream_listener
+from .workstreams import plan_workstreams
+from .plan import (
+    PlanExpander,
+    PlanParseError,
+    PlanValidation,
+    PlanValidationError,
+    build_assigner,
+    expand_compact_plan,
+    parse_compact_plan,
+    parse_timeline,
+    restate_compact_plan,
+    summarize_plan,
+    validate_plan,
+)
+
+from planning.calendar import WorkingCalendar
+from planning.skills import TeamSkills
+from planning.team import assess_team
+from pm_master.tracing import traced, tracer
 
 # Import Trello integration for board creation
 from integrations.trello import TrelloIntegration, TeamMember
-from project.models import ProjectMember
+from integrations.boards import get_board_integration, use_board_integration
+from integrations.local_board import LocalBoardIntegration
+from project.models import PlanPreview
+from organization.models import working_calendar
+
+logger = logging.getLogger(__name__)
 
 class ProjectData(BaseModel):
     project_name: Optional[str] = None
@@ -20,9 +62,14 @@ class ProjectData(BaseModel):
     team_members: Optional[list[dict]] = None
     board_id: Optional[str] = None
     project_id: Optional[str] = None
+    # The organization's holidays (YYYY-MM-DD), which are not working days
+    holidays: list[str] = []
+    # "full" runs every stage; "preview" stops after planning
+    mode: str = "full"
 class ProJectFlow(Flow[ProjectData]):
 
     @start()
+    @traced("flow.get_project_data")
     async def get_project_data(self):
         print("Getting project data", self.state)
 
@@ -40,26 +87,64 @@ class ProJectFlow(Flow[ProjectData]):
         return self.project_data
 
     @listen(get_project_data)
+    @traced("flow.run_research_crew")
     def run_research_crew(self, project_data):
-
-        return research_crew.kickoff(project_data)
+        team_members = project_data["team_members"] or []
+        # Each member and each distinct skill once, instead of every member's raw skill list
+        team_skills = TeamSkills(team_members)
+        analysis = research_crew.kickoff({**project_data, "team_members": team_skills.summary()})
+        outputs = {task_output.name: task_output.raw for task_output in analysis.tasks_output}
+
+        # The team assessment is set arithmetic over skills, so it is computed instead of asked for
+        timeline_start, timeline_end = parse_timeline(project_data["project_timeline"])
+        capacity_days = (
+            working_calendar(self.state.holidays).count(timeline_start, timeline_end)
+            if timeline_start and timeline_end else None
+        )
+        assessment = assess_team(
+            team_members, project_data["project_description"] or "",
+            outputs.get("conditional_project_analysis_task", ""), capacity_days,
+        )
+        return research_synthesis_crew.kickoff({
+            **project_data,
+            "research_recommendation": outputs.get("evaluate_research_needs_task", ""),
+            "industry_research": outputs.get("conditional_industry_research_task", ""),
+            "project_analysis": outputs.get("conditional_project_analysis_task", ""),
+            "team_assessment": assessment.render(),
+        })
 
     @listen(run_research_crew)
+    @traced("flow.run_planning_crew")
     async def run_planning_crew(self, research_output):
+        workstreams = settings.PLANNING_MODE == "workstreams"
+        task_stream = None
+        if settings.PLAN_STREAMING and self.state.mode != "preview":
+            # Cards are created while the plan is still being generated
+            task = workstream_card_specifications_task if workstreams else card_specifications_task
+            task_stream = TaskStream(task.name, maxsize=settings.PLAN_STREAM_QUEUE_SIZE)
+            self.streamed_execution = StreamedExecution(
+                task_stream, self.state.board_id, self.state.project_timeline, self.state.team_members,
+                working_calendar(self.state.holidays),
+            ).start()
+
+        inputs = {
+            "research_output": research_output.raw,
+            "team_members": self.project_data["team_members"],
+            "project_timeline": self.project_data["project_timeline"],
+            "board_id": self.project_data["board_id"],
+            "project_description": self.project_data["project_description"],
+        }
+        try:
+            with plan_stream_listener.streaming(task_stream):
+                if workstreams:
+                    planning_result = await plan_workstreams(inputs)
+                else:
+                    planning_result = await planning_crew.kickoff_async(inputs=inputs)
+        finally:
+            if task_stream is not None:
+                task_stream.close()
 
-
-        planning_result = await planning_crew.kickoff_async(
-            inputs={
-                "research_output": research_output.raw,
-                "team_members": self.project_data["team_members"],
-                "project_timeline": self.project_data["project_timeline"],
-                "board_id": self.project_data["board_id"],
-                "project_description": self.project_data["project_description"],
-            }
-        )
-
-
-        self.planning_output = planning_result.raw
+        self.planning_output = planning_result.model_dump_json() if workstreams else planning_result.raw
         return planning_result
 
     # @listen(run_planning_crew)
@@ -100,79 +185,291 @@ class ProJectFlow(Flow[ProjectData]):
     #     }
 
     @listen(run_planning_crew)
+    @traced("flow.run_execution_crew")
     def run_execution_crew(self, planning_output):
         """Run the execution crew to populate the Trello board"""
-
-        # Extract the parsed CardSpecifications from the CrewOutput
-        # When output_json is used, CrewAI parses it - try multiple ways to access it
-        import json
-
-        card_specs = None
-
-        # Method 1: Try to get from tasks_output (CrewAI stores parsed output_json here)
-        if hasattr(planning_output, 'tasks_output') and planning_output.tasks_output:
-            last_task_output = planning_output.tasks_output[-1]
-            if isinstance(last_task_output, CardSpecifications):
-                card_specs = last_task_output
-            elif isinstance(last_task_output, dict):
-                card_specs = CardSpecifications.model_validate(last_task_output)
-            elif isinstance(last_task_output, str):
+        plan = self._compact_plan(planning_output)
+
+        streamed_execution = getattr(self, "streamed_execution", None)
+        if streamed_execution is not None:
+            streamed_results = streamed_execution.join()
+            # Tasks the stream missed (e.g. when the output needed repairs) are created now, scheduled after
+            # the streamed tasks they depend on
+            received = {task.id for task in streamed_execution.stream.received}
+            expander = streamed_execution.expander()
+            cards = [card for task in plan.tasks if task.id not in received for card in expander.add(task)]
+            card_specs = CardSpecifications(card_specifications=cards + expander.flush())
+            if not card_specs.card_specifications:
+                return streamed_results
+            board_lists = expander.board_lists
+        else:
+            board_lists = get_board_integration().get_lists(self.state.board_id) if self.state.board_id else None
+            card_specs = expand_compact_plan(
+                plan, board_lists, self.state.project_timeline, working_calendar(self.state.holidays),
+                self.state.team_members,
+            )
+
+        if self.state.mode == "preview":
+            # Nothing is created; run_flow stores the plan (and what is wrong with it) so it can be committed later
+            return check_plan(card_specs, self.state.board_id, self.state.project_timeline, raise_errors=False,
+                              board_lists=board_lists, calendar=working_calendar(self.state.holidays))
+
+        validation = check_plan(card_specs, self.state.board_id, self.state.project_timeline, board_lists=board_lists,
+                                calendar=working_calendar(self.state.holidays))
+        results = execute_card_specifications(validation.valid_cards())
+        return streamed_results + list(results) if streamed_execution is not None else results
+
+    def _compact_plan(self, planning_output) -> CompactPlan:
+        """Extract the CompactPlan from the planning CrewOutput"""
+        if isinstance(planning_output, CompactPlan):
+            # Workstream planning has already parsed and merged the plan
+            return planning_output
+
+        task_output = planning_output.tasks_output[-1] if planning_output.tasks_output else None
+        if task_output is not None and task_output.pydantic is not None:
+            return parse_compact_plan(task_output.pydantic)
+
+        raw_output = task_output.raw if task_output is not None else planning_output.raw
+        try:
+            return parse_compact_plan(raw_output)
+        except PlanParseError as e:
+            logger.warning("%s; asking the model to restate the plan", e)
+
+        # Only the malformed output goes back to the model; the planning crew is not run again
+        return parse_compact_plan(restate_compact_plan(planning_llm, raw_output))
+
+
+def check_plan(card_specs: CardSpecifications, board_id: Optional[str], project_timeline: Optional[str],
+               raise_errors: bool = True, board_lists: Optional[list[dict]] = None,
+               calendar: Optional[WorkingCalendar] = None) -> PlanValidation:
+    """Validate the plan against the board's lists and the project timeline before any card is created"""
+    mode = settings.PLAN_VALIDATION
+    if mode == "off":
+        return PlanValidation(card_specs=card_specs)
+
+    if board_lists is None and board_id:
+        board_lists = get_board_integration().get_lists(board_id)
+    validation = validate_plan(card_specs, board_lists, project_timeline, repair=mode == "repair", calendar=calendar)
+    for violation in validation.violations:
+        logger.warning("Plan check: %s", violation)
+    if validation.errors and mode == "strict" and raise_errors:
+        raise PlanValidationError(validation)
+    return validation
+
+
+def execution_inputs(card_specification: CardSpecification) -> dict:
+    """Execution crew inputs for one card; the card ledger keeps its task ID and dependencies instead of the prompt"""
+    card_ledger.expect(card_specification)
+    return {"card_specification": card_specification.model_dump(exclude={"task_id", "depends_on", "assignee_member_id"})}
+
+
+def execute_card_specifications(card_specs: CardSpecifications):
+    """Create one card (with checklist and labels) per specification with the execution crew"""
+    cleaned_planning_output = [
+        execution_inputs(card_specification) for card_specification in card_specs.card_specifications
+    ]
+
+    concurrency = settings.EXECUTION_CONCURRENCY
+    if concurrency <= 1:
+        return execution_crew.kickoff_for_each(inputs=cleaned_planning_output)
+
+    # Each card gets its own crew copy; the trace context is carried into the worker threads
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, execution_crew.copy().kickoff, inputs=inputs)
+            for inputs in cleaned_planning_output
+        ]
+        return [future.result() for future in futures]
+
+
+class StreamedExecution:
+    """Expands the tasks of a TaskStream and creates their cards as they arrive, while the planning crew is still generating."""
+
+    def __init__(self, stream: TaskStream, board_id: Optional[str], project_timeline: Optional[str],
+                 team_members: Optional[list[dict]] = None, calendar: Optional[WorkingCalendar] = None):
+        self.stream = stream
+        self.board_id = board_id
+        self.project_timeline = project_timeline
+        self.team_members = team_members
+        self.calendar = calendar or working_calendar()
+        self.error: Optional[Exception] = None
+        self._expander: Optional[PlanExpander] = None
+        self._results = []
+        # Runs with the caller's context, so the board backend and the trace carry over
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._consume,), daemon=True)
+
+    def start(self) -> "StreamedExecution":
+        self._thread.start()
+        return self
+
+    def expander(self) -> PlanExpander:
+        """The expander the streamed tasks went through; it knows their dates and the board's lists."""
+        if self._expander is None:
+            # The board's lists exist by now: the board structure task runs before the tasks are generated
+            board_lists = get_board_integration().get_lists(self.board_id) if self.board_id else None
+            assigner = build_assigner(self.team_members, self.project_timeline, self.calendar)
+            self._expander = PlanExpander(board_lists, self.project_timeline, self.calendar, assigner=assigner)
+        return self._expander
+
+    def _consume(self):
+        futures = []
+        with ThreadPoolExecutor(max_workers=max(settings.EXECUTION_CONCURRENCY, 1)) as pool:
+            for task in itertools.chain(self.stream, [None]):
+                # Keep draining after a failure so the planning model's stream is never blocked
+                if self.error is not None:
+                    continue
                 try:
-                    card_specs = CardSpecifications.model_validate_json(last_task_output)
-                except:
-                    pass
-
-        # Method 2: Try using stored planning_output from previous step
-        if card_specs is None and hasattr(self, 'planning_output'):
-            try:
-                if isinstance(self.planning_output, str):
-                    parsed = json.loads(self.planning_output)
-                    card_specs = CardSpecifications.model_validate(parsed)
-                else:
-                    card_specs = CardSpecifications.model_validate(self.planning_output)
-            except:
-                pass
-
-        # Method 3: Parse from raw output of CrewOutput
-        if card_specs is None:
-            raw_output = planning_output.raw if hasattr(planning_output, 'raw') else str(planning_output)
-            try:
-                # Try parsing as JSON string
-                if isinstance(raw_output, str):
-                    parsed = json.loads(raw_output)
-                    card_specs = CardSpecifications.model_validate(parsed)
-                else:
-                    card_specs = CardSpecifications.model_validate(raw_output)
-            except Exception as e:
-                # Last resort: try direct validation
+                    # A task waits for its dependencies' dates; the end of the stream releases the rest
+                    expander = self.expander()
+                    cards = expander.add(task) if task is not None else expander.flush()
+                    if not cards:
+                        continue
+                    validation = check_plan(
+                        CardSpecifications(card_specifications=cards), self.board_id, self.project_timeline,
+                        board_lists=expander.board_lists, calendar=self.calendar,
+                    )
+                    for valid_card in validation.valid_cards().card_specifications:
+                        futures.append(pool.submit(
+                            contextvars.copy_context().run,
+                            execution_crew.copy().kickoff,
+                            inputs=execution_inputs(valid_card),
+                        ))
+                except Exception as e:
+                    self.error = e
+            for future in futures:
                 try:
-                    card_specs = CardSpecifications.model_validate_json(raw_output)
-                except:
-                    raise ValueError(f"Could not parse CardSpecifications from planning output. Tried tasks_output, self.planning_output, and raw. Error: {e}")
+                    self._results.append(future.result())
+                except Exception as e:
+                    self.error = self.error or e
 
-        cleaned_planning_output = [
-            {"card_specification": card_specification.model_dump()}
-            for card_specification in card_specs.card_specifications
-        ]
+    def join(self) -> list:
+        """Waits for the cards already streamed to be created; returns their crew outputs."""
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self._results
 
-        execution_result = execution_crew.kickoff_for_each(inputs=cleaned_planning_output)
 
-        return execution_result
+class PlanCommitData(BaseModel):
+    project_id: Optional[str] = None
+    board_id: Optional[str] = None
+    project_timeline: Optional[str] = None
+    board_lists: list[dict] = []
+    card_specifications: list[dict] = []
+    holidays: list[str] = []
+    # Project member ID -> board member ID, known only once the project's board exists
+    board_member_ids: dict[int, str] = {}
+
 
+class PlanCommitFlow(Flow[PlanCommitData]):
+    """Runs only the execution stage, against the plan stored by a preview run."""
 
-async def run_flow(project_data:dict):
+    @start()
+    @traced("flow.create_board_lists")
+    def create_board_lists(self):
+        """Recreate the previewed list structure on the real board"""
+        board = get_board_integration()
+        list_ids = {}
+        for board_list in sorted(self.state.board_lists, key=lambda board_list: int(board_list["pos"])):
+            created = board.create_list(board_id=self.state.board_id, list_name=board_list["name"], position=board_list["pos"])
+            list_ids[board_list["id"]] = created["id"]
+        return list_ids
+
+    @listen(create_board_lists)
+    @traced("flow.run_execution_crew")
+    def run_execution_crew(self, list_ids):
+        # The stored specifications point at the preview's sandbox lists, and at no board member
+        card_specs = CardSpecifications.model_validate({
+            "card_specifications": [
+                {
+                    **card_specification,
+                    "list_id": list_ids.get(card_specification["list_id"], card_specification["list_id"]),
+                    "team_member_ids": self._board_member_ids(card_specification),
+                }
+                for card_specification in self.state.card_specifications
+            ]
+        })
+        validation = check_plan(card_specs, self.state.board_id, self.state.project_timeline,
+                                calendar=working_calendar(self.state.holidays))
+        return execute_card_specifications(validation.valid_cards())
+
+    def _board_member_ids(self, card_specification: dict) -> list[str]:
+        board_member_id = self.state.board_member_ids.get(card_specification.get("assignee_member_id"))
+        return [board_member_id] if board_member_id else card_specification.get("team_member_ids", [])
+
+
+async def _run(flow: Flow, project_id: str, inputs: dict, span_name: str):
+    """Kicks off a flow as a tracked run: progress events, usage and card ledgers and a root span."""
+    run_id = str(uuid.uuid4())
+    progress_listener.begin_run(flow, project_id, run_id)
+    usage_ledger.begin_run(project_id, run_id)
+    # A preview run's cards only exist on its sandbox board
+    if inputs.get("mode") != "preview":
+        card_ledger.begin_run(project_id)
+    with tracer.start_as_current_span(span_name) as span:
+        span.set_attribute("project.id", str(project_id))
+        span.set_attribute("flow.run_id", run_id)
+        try:
+            result = await flow.kickoff_async(inputs=inputs)
+        except Exception as e:
+            progress_listener.end_run(flow, error=e)
+            raise
+        finally:
+            # Persist what was spent, and the cards that exist, even when the run fails part-way
+            await sync_to_async(usage_ledger.flush)()
+            await sync_to_async(card_ledger.flush)()
+    progress_listener.end_run(flow)
+    return run_id, result
+
+
+def _save_plan_preview(project_id: str, run_id: str, validation: PlanValidation, sandbox: LocalBoardIntegration):
+    card_specs = validation.valid_cards()
+    board_lists = [
+        {"id": board_list["id"], "name": board_list["name"], "pos": board_list["pos"]}
+        for board_list in sandbox.lists.values()
+    ]
+    return PlanPreview.objects.create(
+        project_id=project_id,
+        run_id=run_id,
+        card_specifications=card_specs.model_dump()["card_specifications"],
+        board_lists=board_lists,
+        summary={
+            **summarize_plan(card_specs, {board_list["id"]: board_list["name"] for board_list in board_lists}),
+            "validation": validation.as_dict(),
+        },
+    )
+
+
+async def run_flow(project_data:dict, mode: str = "full"):
     print("\n\n\n\n\nRunning flow", project_data, "\n\n\n\n\n")
-    flow = ProJectFlow()
-    result = await flow.kickoff_async(inputs={
+    inputs = {
         "project_name": project_data["project_name"],
         "project_description": project_data["project_description"],
         "project_timeline": project_data["project_timeline"],
         "industry": project_data["industry"],
         "team_members": project_data["team_members"],
         "board_id": project_data["board_id"],
-        "project_id": project_data["project_id"]
-    })
+        "project_id": project_data["project_id"],
+        "holidays": project_data.get("holidays", []),
+        "mode": mode,
+    }
+
+    if mode == "preview":
+        # Plan against a throwaway in-memory board, so a preview never touches Trello
+        sandbox = LocalBoardIntegration()
+        inputs["board_id"] = sandbox.create_board(project_data["project_name"], project_data["project_description"], [])["id"]
+        with use_board_integration(sandbox):
+            run_id, validation = await _run(ProJectFlow(), project_data["project_id"], inputs, "run_flow")
+        return await sync_to_async(_save_plan_preview)(project_data["project_id"], run_id, validation, sandbox)
+
+    run_id, result = await _run(ProJectFlow(), project_data["project_id"], inputs, "run_flow")
     print(result)
+    return result
+
+
+async def run_plan_commit(commit_data: dict):
+    """Creates the board content of a stored plan preview; returns the run ID and the execution result."""
+    return await _run(PlanCommitFlow(), commit_data["project_id"], commit_data, "run_plan_commit")
 
 
 if __name__ == "__main__":
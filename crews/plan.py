@@ -0,0 +1,596 @@
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Optional
+
+import json_repair
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from integrations.index import TRELLO_LABEL_COLORS
+from planning.assignment import PlannedWork, TaskAssigner
+from planning.calendar import WorkingCalendar, default_calendar, parse_dates, to_dates
+from planning.schedule import Schedule, schedule_tasks
+
+from .planning_crew import (
+    DEFAULT_WORKSTREAMS,
+    CardSpecification,
+    CardSpecifications,
+    CompactPlan,
+    Label,
+    PlannedTask,
+    Workstream,
+)
+
+# The color the label tool falls back to when none is given
+DEFAULT_LABEL_COLOR = "blue"
+
+# Fixed mappings the compact plan is expanded with, so the model does not have to write them out
+PRIORITY_COLORS = {"critical": "red", "high": "orange", "medium": "yellow", "low": "green"}
+CATEGORY_COLORS = {
+    "backend": "blue",
+    "frontend": "purple",
+    "database": "sky",
+    "devops": "lime",
+    "testing": "pink",
+    "documentation": "black",
+}
+PRIORITY_LISTS = {"critical": "To Do", "high": "To Do", "medium": "Backlog", "low": "Backlog"}
+DEFAULT_PRIORITY = "Medium"
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+logger = logging.getLogger(__name__)
+
+
+class PlanParseError(ValueError):
+    """Raised when not a single planned task can be recovered from the planning output."""
+
+
+def _json_array(data: Any, key: str) -> Optional[list]:
+    """Finds the array of `key` in whatever shape the model wrapped it."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get(key), list):
+        return data[key]
+    lists = [value for value in data.values() if isinstance(value, list)]
+    return lists[0] if len(lists) == 1 else None
+
+
+def parse_compact_plan(output: str | dict | list | BaseModel) -> CompactPlan:
+    """
+    Parses the planning output into a CompactPlan without calling the model again.
+
+    Valid JSON is validated directly. Otherwise the text is repaired locally
+    (code fences, surrounding prose, trailing commas, truncated output) and the
+    tasks are validated one by one, so a single malformed task is dropped
+    instead of failing the whole plan.
+    """
+    if isinstance(output, BaseModel):
+        output = output.model_dump()
+    if isinstance(output, str):
+        try:
+            return CompactPlan.model_validate_json(output)
+        except ValidationError:
+            data = json_repair.loads(output)
+    else:
+        data = output
+
+    tasks = _json_array(data, "tasks")
+    if not tasks:
+        raise PlanParseError("Planning output contains no tasks array")
+
+    valid_tasks = []
+    for index, task in enumerate(tasks):
+        try:
+            valid_tasks.append(PlannedTask.model_validate(task))
+        except ValidationError as e:
+            logger.warning("Dropping unparseable planned task %s: %s", index, e.errors()[0]["msg"])
+    if not valid_tasks:
+        raise PlanParseError(f"None of the {len(tasks)} planned tasks in the planning output is valid")
+    return CompactPlan(tasks=valid_tasks)
+
+
+def parse_workstream_outline(output: str | BaseModel) -> list[Workstream]:
+    """Workstreams of an outline; the default workstreams when the outline does not parse."""
+    data = output.model_dump() if isinstance(output, BaseModel) else json_repair.loads(output or "")
+    workstreams = []
+    for item in _json_array(data, "workstreams") or []:
+        try:
+            workstream = Workstream.model_validate(item)
+        except ValidationError:
+            continue
+        if workstream.name.strip() and workstream.name.casefold() not in {w.name.casefold() for w in workstreams}:
+            workstreams.append(workstream)
+    if not workstreams:
+        logger.warning("Workstream outline does not parse; using the default workstreams")
+        return [Workstream(name=name, scope="") for name in DEFAULT_WORKSTREAMS]
+    return workstreams
+
+
+def _title_key(task: PlannedTask) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", task.title.casefold()))
+
+
+def merge_compact_plans(parts: list[CompactPlan]) -> CompactPlan:
+    """
+    Concatenates partial plans, merging tasks whose titles only differ in case and punctuation.
+
+    Task IDs must be unique across the parts. The first task with a title is
+    kept; duplicates only contribute dependencies and criteria it does not have
+    yet, and dependencies on a duplicate point to the kept task.
+    """
+    merged: dict[str, PlannedTask] = {}
+    kept_ids: dict[str, str] = {}
+    for part in parts:
+        for task in part.tasks:
+            key = _title_key(task)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = task.model_copy(deep=True)
+                kept_ids[task.id] = task.id
+                continue
+            kept_ids[task.id] = existing.id
+            existing.depends_on += [dependency for dependency in task.depends_on if dependency not in existing.depends_on]
+            existing.criteria += [criterion for criterion in task.criteria if criterion not in existing.criteria]
+
+    tasks = list(merged.values())
+    for task in tasks:
+        depends_on = [kept_ids.get(dependency, dependency) for dependency in task.depends_on]
+        task.depends_on = [dependency for index, dependency in enumerate(depends_on)
+                           if dependency != task.id and dependency not in depends_on[:index]]
+    return CompactPlan(tasks=tasks)
+
+
+def restate_compact_plan(llm, output: str):
+    """Asks the model once to restate malformed planning output in the CompactPlan schema."""
+    messages = [
+        {
+            "role": "system",
+            "content": "You convert project plans into JSON matching the given schema. "
+                       "Keep every task and its details; do not add tasks.",
+        },
+        {
+            "role": "user",
+            "content": f'Restate this plan as a JSON object with a "tasks" array:\n\n{output}',
+        },
+    ]
+    return llm.call(messages, response_model=CompactPlan)
+
+
+class PlanExpander:
+    """
+    Expands planned tasks into full card specifications with the fixed mappings.
+
+    Priority picks the list (Critical/High -> To Do, Medium/Low -> Backlog) and
+    the priority label color, category the category label color. Dates come
+    from `schedule` when the whole plan was scheduled up front; otherwise a
+    task starts on the working day after the last of its dependencies ends (or
+    at the start of the timeline) and lasts `estimate_days` working days, which
+    is the scheduler's forward pass. With an `assigner`, each card is assigned
+    to a team member. Tasks can be added one at a time, as they
+    stream in: a task is expanded once all its dependencies have been; `flush`
+    expands the rest, ignoring dependencies that never arrived.
+    """
+
+    def __init__(self, board_lists: Optional[list[dict]], project_timeline: Optional[str],
+                 calendar: WorkingCalendar = default_calendar, schedule: Optional[Schedule] = None,
+                 assigner: Optional[TaskAssigner] = None):
+        board_lists = sorted(board_lists or [], key=lambda board_list: float(board_list.get("pos") or 0))
+        self.board_lists = board_lists
+        self.list_ids = {board_list["name"].strip().casefold(): board_list["id"] for board_list in board_lists}
+        self.default_list_id = board_lists[0]["id"] if board_lists else ""
+        self.start_date = parse_timeline(project_timeline)[0] or date.today()
+        self.calendar = calendar
+        self.schedule = schedule
+        self.assigner = assigner
+        self.expanded: list[tuple[PlannedTask, CardSpecification]] = []
+        self._tasks: dict[str, PlannedTask] = {}
+        # Working-day offset from the start of the timeline at which each expanded task is done
+        self._finish_offsets: dict[str, int] = {}
+        self._pending: list[PlannedTask] = []
+
+    def add(self, task: PlannedTask) -> list[CardSpecification]:
+        """Adds a task; returns the cards that became ready."""
+        self._pending.append(task)
+        return self._release(flush=False)
+
+    def flush(self) -> list[CardSpecification]:
+        """Expands every task still waiting for a dependency."""
+        return self._release(flush=True)
+
+    def _release(self, flush: bool) -> list[CardSpecification]:
+        cards = []
+        while self._pending:
+            ready = [
+                task for task in self._pending
+                if all(dependency in self._finish_offsets or dependency == task.id for dependency in task.depends_on)
+            ]
+            if not ready:
+                if not flush:
+                    break
+                # Missing or circular dependencies: schedule the oldest waiting task without them
+                ready = self._pending[:1]
+            for task in ready:
+                self._pending.remove(task)
+                card = self._expand(task)
+                self.expanded.append((task, card))
+                cards.append(card)
+        return cards
+
+    def _expand(self, task: PlannedTask) -> CardSpecification:
+        duration = max(task.estimate_days, 1)
+        scheduled = self.schedule.tasks.get(task.id) if self.schedule is not None else None
+        if scheduled is not None:
+            start, end = scheduled.start, scheduled.end
+            earliest_start = scheduled.earliest_start
+        else:
+            earliest_start = max(
+                (self._finish_offsets[dependency] for dependency in task.depends_on if dependency in self._finish_offsets),
+                default=0,
+            )
+            start, end = self.calendar.dates(self.start_date, [earliest_start, earliest_start + duration - 1])
+        self._tasks[task.id] = task
+        self._finish_offsets[task.id] = earliest_start + duration
+
+        priority = task.priority.strip().capitalize()
+        if priority.casefold() not in PRIORITY_COLORS:
+            priority = DEFAULT_PRIORITY
+        list_id = self.list_ids.get(PRIORITY_LISTS[priority.casefold()].casefold(), self.default_list_id)
+
+        description = task.summary.strip() or task.title
+        description += f"\n\nEstimate: {task.estimate_days} working day(s)."
+        dependencies = [self._tasks[dependency].title for dependency in task.depends_on if dependency in self._tasks]
+        if dependencies:
+            description += f"\nDepends on: {', '.join(dependencies)}."
+        team_member_ids, assignee_member_id = [], None
+        if self.assigner is not None and (member := self.assigner.assign([planned_work(task)])[0]) is not None:
+            description += f"\nAssignee: {member.get('name') or member.get('email')}."
+            team_member_ids = [member["trello_member_id"]] if member.get("trello_member_id") else []
+            assignee_member_id = member.get("id")
+        if scheduled is not None:
+            description += "\nOn the critical path." if scheduled.critical else f"\nSlack: {scheduled.slack} working day(s)."
+
+        return CardSpecification(
+            list_id=list_id,
+            card_name=task.title,
+            description=description,
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+            labels=[
+                Label(name=f"{priority} Priority", color=PRIORITY_COLORS[priority.casefold()]),
+                Label(name=task.category, color=CATEGORY_COLORS.get(task.category.strip().casefold(), DEFAULT_LABEL_COLOR)),
+            ],
+            checklist_items=list(task.criteria),
+            team_member_ids=team_member_ids,
+            assignee_member_id=assignee_member_id,
+            task_id=task.id,
+            depends_on=[dependency for dependency in task.depends_on if dependency != task.id],
+        )
+
+
+def planned_work(task: PlannedTask) -> PlannedWork:
+    """What the assigner matches against the team's skills."""
+    text = " ".join([task.title, task.summary, task.category, *task.criteria])
+    return PlannedWork(id=task.id, text=text, days=task.estimate_days)
+
+
+def build_assigner(team_members: Optional[list[dict]], project_timeline: Optional[str],
+                   calendar: WorkingCalendar = default_calendar, schedule: Optional[Schedule] = None) -> Optional[TaskAssigner]:
+    """
+    Assigner over the team; each member can take their working days within the timeline (their time off excluded),
+    or the working days of the schedule.
+    """
+    if not team_members:
+        return None
+    timeline_start, timeline_end = parse_timeline(project_timeline)
+    if timeline_start and timeline_end:
+        capacity = [calendar.for_member(member).count(timeline_start, timeline_end) for member in team_members]
+    elif schedule is not None:
+        capacity = schedule.duration
+    else:
+        # No window to fill: only the load penalty balances the work
+        capacity = 10 ** 6
+    return TaskAssigner(team_members, capacity)
+
+
+def schedule_compact_plan(plan: CompactPlan, project_timeline: Optional[str],
+                          calendar: WorkingCalendar = default_calendar) -> Schedule:
+    """Critical-path schedule of the plan's tasks from the start of the timeline."""
+    timeline_start, timeline_end = parse_timeline(project_timeline)
+    durations, dependencies = {}, {}
+    for task in plan.tasks:
+        durations.setdefault(task.id, task.estimate_days)
+        dependencies.setdefault(task.id, task.depends_on)
+    schedule = schedule_tasks(durations, dependencies, timeline_start or date.today(), calendar)
+    if timeline_end is not None and schedule.finish > timeline_end:
+        logger.warning(
+            "The critical path (%s working days) ends on %s, after the end of the timeline (%s)",
+            schedule.duration, schedule.finish, timeline_end,
+        )
+    return schedule
+
+
+def expand_compact_plan(plan: CompactPlan, board_lists: Optional[list[dict]], project_timeline: Optional[str],
+                        calendar: WorkingCalendar = default_calendar,
+                        team_members: Optional[list[dict]] = None) -> CardSpecifications:
+    """Schedules and assigns a whole compact plan and expands it into card specifications, in dependency order."""
+    schedule = schedule_compact_plan(plan, project_timeline, calendar)
+    assigner = build_assigner(team_members, project_timeline, calendar, schedule)
+    if assigner is not None:
+        # One batch, so the longest tasks get the first pick
+        assigner.assign([planned_work(task) for task in plan.tasks])
+        logger.info("Team utilization: %s", assigner.utilization())
+    expander = PlanExpander(board_lists, project_timeline, calendar, schedule, assigner)
+    for task in plan.tasks:
+        expander.add(task)
+    expander.flush()
+    return CardSpecifications(card_specifications=[card for _, card in expander.expanded])
+
+
+def parse_timeline(project_timeline: Optional[str]) -> tuple[Optional[date], Optional[date]]:
+    """First and last ISO date of a timeline such as "2025-01-01 to 2025-12-31"."""
+    dates = [d for d in to_dates(parse_dates(ISO_DATE.findall(project_timeline or ""))) if d]
+    if not dates:
+        return None, None
+    return min(dates), max(dates)
+
+
+def summarize_plan(card_specs: CardSpecifications, list_names: dict[str, str] = None) -> dict:
+    """Card count, date span and label/list distribution of a plan, without touching any board."""
+    list_names = list_names or {}
+    days = parse_dates(
+        [card.start_date for card in card_specs.card_specifications] + [card.end_date for card in card_specs.card_specifications]
+    )
+    days = days[~np.isnat(days)]
+    start_date = days.min().item() if len(days) else None
+    end_date = days.max().item() if len(days) else None
+
+    labels = Counter(label.name for card in card_specs.card_specifications for label in card.labels)
+    lists = Counter(list_names.get(card.list_id, card.list_id) for card in card_specs.card_specifications)
+
+    return {
+        "card_count": len(card_specs.card_specifications),
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "span_days": (end_date - start_date).days if start_date else 0,
+        "checklist_items": sum(len(card.checklist_items) for card in card_specs.card_specifications),
+        "labels": dict(labels.most_common()),
+        "lists": dict(lists.most_common()),
+    }
+
+
+@dataclass
+class PlanViolation:
+    card_index: int
+    card_name: str
+    field: str
+    code: str
+    message: str
+    repaired: bool = False
+
+    def __str__(self):
+        suffix = " (repaired)" if self.repaired else ""
+        return f"card {self.card_index} '{self.card_name}': {self.field}: {self.message}{suffix}"
+
+
+@dataclass
+class PlanValidation:
+    card_specs: CardSpecifications
+    violations: list[PlanViolation] = field(default_factory=list)
+
+    @property
+    def errors(self) -> list[PlanViolation]:
+        """Violations that were not repaired."""
+        return [violation for violation in self.violations if not violation.repaired]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def valid_cards(self) -> CardSpecifications:
+        """The plan without the cards that still have errors."""
+        invalid = {violation.card_index for violation in self.errors}
+        return CardSpecifications(card_specifications=[
+            card for index, card in enumerate(self.card_specs.card_specifications) if index not in invalid
+        ])
+
+    def as_dict(self) -> dict:
+        return {
+            "valid": self.is_valid,
+            "violations": [
+                {
+                    "card_index": violation.card_index,
+                    "card_name": violation.card_name,
+                    "field": violation.field,
+                    "code": violation.code,
+                    "message": violation.message,
+                    "repaired": violation.repaired,
+                }
+                for violation in self.violations
+            ],
+        }
+
+
+class PlanValidationError(ValueError):
+    def __init__(self, validation: PlanValidation):
+        self.validation = validation
+        errors = validation.errors
+        details = "; ".join(str(violation) for violation in errors[:10])
+        more = f" (and {len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"Plan has {len(errors)} invalid card specification(s): {details}{more}")
+
+
+class _CardChecker:
+    """Checks (and optionally repairs) one card specification, recording every violation."""
+
+    def __init__(self, index: int, card: CardSpecification, violations: list[PlanViolation], repair: bool):
+        self.index = index
+        self.card = card
+        self.violations = violations
+        self.repair = repair
+
+    def violation(self, field_name: str, code: str, message: str, repaired: bool = False):
+        self.violations.append(PlanViolation(self.index, self.card.card_name, field_name, code, message, repaired))
+
+    def check_name(self):
+        if not self.card.card_name.strip():
+            self.violation("card_name", "empty", "card name is empty")
+
+    def check_list(self, list_ids: set[str], list_ids_by_name: dict[str, str], default_list_id: Optional[str]):
+        if self.card.list_id in list_ids:
+            return
+        # Agents sometimes put the list name where the ID belongs
+        replacement = list_ids_by_name.get(self.card.list_id.strip().lower()) or default_list_id
+        message = f"list {self.card.list_id!r} is not on the board"
+        if self.repair and replacement:
+            self.violation("list_id", "unknown_list", f"{message}; using {replacement}", repaired=True)
+            self.card.list_id = replacement
+        else:
+            self.violation("list_id", "unknown_list", message)
+
+    def check_dates(self, start: Optional[date], end: Optional[date], timeline_start: Optional[date],
+                    timeline_end: Optional[date]) -> tuple[Optional[date], Optional[date]]:
+        """Checks the parsed dates of the card; returns them as repaired (None when a date is invalid)."""
+        if start is None:
+            self.violation("start_date", "invalid_date", f"{self.card.start_date!r} is not a YYYY-MM-DD date")
+        if end is None:
+            self.violation("end_date", "invalid_date", f"{self.card.end_date!r} is not a YYYY-MM-DD date")
+        if start is None or end is None:
+            return None, None
+
+        if end < start:
+            message = f"ends ({end}) before it starts ({start})"
+            if self.repair:
+                start, end = end, start
+                self.violation("end_date", "end_before_start", f"{message}; swapped", repaired=True)
+            else:
+                self.violation("end_date", "end_before_start", message)
+
+        for field_name, value in (("start_date", start), ("end_date", end)):
+            clamped = value
+            if timeline_start and clamped < timeline_start:
+                clamped = timeline_start
+            if timeline_end and clamped > timeline_end:
+                clamped = timeline_end
+            if clamped == value:
+                continue
+            message = f"{value} is outside the project timeline {timeline_start} to {timeline_end}"
+            if self.repair:
+                self.violation(field_name, "outside_timeline", f"{message}; moved to {clamped}", repaired=True)
+                if field_name == "start_date":
+                    start = clamped
+                else:
+                    end = clamped
+            else:
+                self.violation(field_name, "outside_timeline", message)
+
+        if self.repair:
+            self.card.start_date = start.isoformat()
+            self.card.end_date = end.isoformat()
+        return start, end
+
+    def check_working_days(self, start: Optional[date], end: Optional[date], start_is_working: bool,
+                           end_is_working: bool, next_working_day: Optional[date], previous_working_day: Optional[date]):
+        """A start on a weekend or holiday moves to the next working day, an end to the previous one (not before the start)."""
+        if start is None or end is None:
+            return
+        moved_start = start if start_is_working else next_working_day
+        moved_end = end if end_is_working else max(previous_working_day, moved_start)
+        for field_name, value, moved in (("start_date", start, moved_start), ("end_date", end, moved_end)):
+            if moved == value:
+                continue
+            message = f"{value} is not a working day"
+            if self.repair:
+                self.violation(field_name, "non_working_day", f"{message}; moved to {moved}", repaired=True)
+            else:
+                self.violation(field_name, "non_working_day", message)
+        if self.repair:
+            self.card.start_date = moved_start.isoformat()
+            self.card.end_date = moved_end.isoformat()
+
+    def check_labels(self):
+        for label in self.card.labels:
+            if label.color in TRELLO_LABEL_COLORS:
+                continue
+            normalized = label.color.strip().lower()
+            replacement = normalized if normalized in TRELLO_LABEL_COLORS else DEFAULT_LABEL_COLOR
+            message = f"label '{label.name}' has invalid color {label.color!r}"
+            if self.repair:
+                self.violation("labels", "invalid_color", f"{message}; using {replacement}", repaired=True)
+                label.color = replacement
+            else:
+                self.violation("labels", "invalid_color", message)
+
+    def check_checklist(self):
+        items = [item.strip() for item in self.card.checklist_items if item.strip()]
+        if not items:
+            self.violation("checklist_items", "empty_checklist", "checklist has no items")
+        elif len(items) != len(self.card.checklist_items):
+            message = "checklist has blank items"
+            if self.repair:
+                self.violation("checklist_items", "blank_item", f"{message}; removed", repaired=True)
+                self.card.checklist_items = items
+            else:
+                self.violation("checklist_items", "blank_item", message)
+
+
+def validate_plan(
+    card_specs: CardSpecifications,
+    board_lists: Optional[list[dict]] = None,
+    project_timeline: Optional[str] = None,
+    repair: bool = False,
+    calendar: Optional[WorkingCalendar] = None,
+) -> PlanValidation:
+    """
+    Checks a whole plan before any card is created and returns every violation at once.
+
+    `board_lists` are the lists on the board (dicts with id, name and pos); when
+    None, list IDs are not checked. With a `calendar`, dates must be working
+    days. With `repair`, trivial problems are fixed on a copy of the plan: list
+    names given as IDs, swapped, out-of-timeline or non-working dates, unknown
+    label colors and blank checklist items. All dates are parsed, and checked
+    against the calendar, in one vectorized pass each.
+    """
+    card_specs = card_specs.model_copy(deep=True) if repair else card_specs
+    timeline_start, timeline_end = parse_timeline(project_timeline)
+
+    list_ids, list_ids_by_name, default_list_id = None, {}, None
+    if board_lists is not None:
+        list_ids = {board_list["id"] for board_list in board_lists}
+        list_ids_by_name = {board_list["name"].strip().lower(): board_list["id"] for board_list in board_lists}
+        ordered = sorted(board_lists, key=lambda board_list: float(board_list.get("pos") or 0))
+        default_list_id = ordered[0]["id"] if ordered else None
+
+    cards = card_specs.card_specifications
+    starts = to_dates(parse_dates([card.start_date for card in cards]))
+    ends = to_dates(parse_dates([card.end_date for card in cards]))
+
+    violations = []
+    checkers = []
+    for index, card in enumerate(cards):
+        checker = _CardChecker(index, card, violations, repair)
+        checker.check_name()
+        if list_ids is not None:
+            checker.check_list(list_ids, list_ids_by_name, default_list_id)
+        starts[index], ends[index] = checker.check_dates(starts[index], ends[index], timeline_start, timeline_end)
+        checker.check_labels()
+        checker.check_checklist()
+        checkers.append(checker)
+
+    if calendar is not None and cards:
+        is_working = calendar.is_working_day(starts + ends)
+        next_working_days = to_dates(calendar.roll(starts, "forward"))
+        previous_working_days = to_dates(calendar.roll(ends, "backward"))
+        for index, checker in enumerate(checkers):
+            checker.check_working_days(
+                starts[index], ends[index], is_working[index], is_working[len(cards) + index],
+                next_working_days[index], previous_working_days[index],
+            )
+    violations.sort(key=lambda violation: violation.card_index)
+
+    return PlanValidation(card_specs=card_specs, violations=violations)
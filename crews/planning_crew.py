@@ -1,15 +1,20 @@
-from crewai import Crew, Agent, Task, LLM
+from crewai import Crew, Agent
 from dotenv import load_dotenv
 from crewai_tools import ScrapeWebsiteTool, SerperDevTool
 from integrations.trello_tool import get_all_trello_tools
+from django.conf import settings
 from pydantic import BaseModel
-import os
+from typing import Optional
+
+from .llm import build_llm
+from .task import TracedTask
 
 load_dotenv()
 
 trello_tools = get_all_trello_tools()
 
-llm = LLM(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
+# Streamed completions let the flow create cards while the plan is still being generated
+llm = build_llm("gpt-4o-mini", stage="planning", stream=settings.PLAN_STREAMING)
 class Label(BaseModel):
    name: str
    color: str
@@ -22,11 +27,41 @@ class CardSpecification(BaseModel):
    end_date: str
    labels: list[Label]
    checklist_items: list[str]
+   # Board member IDs of the assignees, chosen locally from the team's skills
+   team_member_ids: list[str] = []
+   # Project member ID of the assignee; gives the board member ID of a preview's cards once the board exists
+   assignee_member_id: Optional[int] = None
+   # The planned task the card comes from and the tasks it depends on; stored with the created card
+   task_id: str = ""
+   depends_on: list[str] = []
 
 
 class CardSpecifications(BaseModel):
    card_specifications: list[CardSpecification]
 
+class PlannedTask(BaseModel):
+   """Compact plan entry; list, labels and dates of its card are derived from it locally."""
+   id: str
+   title: str
+   summary: str = ""
+   category: str
+   priority: str
+   estimate_days: int = 1
+   depends_on: list[str] = []
+   criteria: list[str] = []
+
+class CompactPlan(BaseModel):
+   tasks: list[PlannedTask]
+
+class Workstream(BaseModel):
+   name: str
+   scope: str
+
+class WorkstreamOutline(BaseModel):
+   workstreams: list[Workstream]
+
+DEFAULT_WORKSTREAMS = ["Backend", "Frontend", "Database", "DevOps", "Testing", "Documentation"]
+
 # ================================ Agents ================================
 
 trello_board_manager = Agent(
@@ -83,22 +118,6 @@ timeline_planner = Agent(
     allow_delegation=False
 )
 
-task_assigner = Agent(
-    role="Assignment Optimizer",
-    goal="Match tasks to team members based on skills and balance workload",
-    backstory="""You are a resource allocation expert who assigns tasks to team members
-    based on their skills and availability. You:
-    - Match tasks to team members with the best skills
-    - Balance workload across the team
-    - Identify when team members need training or support
-    - Flag when external help may be needed
-
-    You ensure no one is overloaded and everyone's skills are used effectively.""",
-    llm=llm,
-    verbose=True,
-    allow_delegation=False
-)
-
 planning_synthesizer = Agent(
     role="Project Planning Synthesizer",
     goal="Consolidate all planning outputs into a comprehensive, execution-ready project plan",
@@ -121,7 +140,8 @@ planning_synthesizer = Agent(
 )
 
 # ================================ Tasks ================================
-create_board_structure_task = Task(
+create_board_structure_task = TracedTask(
+    name="create_board_structure_task",
     description="""
     Create a Trello board structure by creating these lists in order:
 
@@ -158,7 +178,8 @@ create_board_structure_task = Task(
 )
 
 
-task_generation_task = Task(
+task_generation_task = TracedTask(
+    name="task_generation_task",
     description="""
     Break down the project into MODERATE-SIZED, manageable tasks.
 
@@ -239,98 +260,142 @@ task_generation_task = Task(
 
 
 # ================================ Crew ================================
-card_specifications_task = Task(
+card_specifications_task = TracedTask(
+    name="card_specifications_task",
     description="""
-    Convert ALL tasks into Trello card specifications with complete details.
+    Convert ALL tasks into a compact plan, one entry per task.
 
     Task List from previous task: {output from task_generation_task}
-    List IDs from board structure: {output from create_board_structure_task}
-
-    STEP 1: EXTRACT LIST IDs FROM create_board_structure_task OUTPUT
-    Parse the JSON to get:
-    - todo_list_id (for Critical/High priority tasks)
-    - backlog_list_id (for Medium/Low priority tasks)
-
-    STEP 2: ANALYZE ALL TASKS
-    Go through EVERY task in the task list and count them.
-
-    STEP 3: CREATE CARD SPECIFICATION FOR EACH TASK
-    For EACH task, create a card specification with this EXACT format:
-    {{
-        "list_id": "[list_id from create_board_structure_task output]",
-        "card_name": "[task title]",
-        "description": "[task description with acceptance criteria]",
-        "start_date": "[YYYY-MM-DD - calculate from project timeline {project_timeline}]",
-        "end_date": "[YYYY-MM-DD - calculate from project timeline {project_timeline}]",
-        "labels": [
-            {{"name": "[priority level] Priority", "color": "[priority color]"}},
-            {{"name": "[category]", "color": "[category color]"}}
-        ],
-        "checklist_items": ["[acceptance criterion 1]", "[acceptance criterion 2]", ...]
-    }}
-
-    Label colors:
-    - Priority: Critical→red, High→orange, Medium→yellow, Low→green
-    - Category: Backend→blue, Frontend→purple, Database→sky, DevOps→lime, Testing→pink, Documentation→black
-
-    YOUR FINAL OUTPUT MUST BE A JSON OBJECT with a "card_specifications" field containing an array:
+    Project Timeline: {project_timeline}
+
+    Board lists, label names and colors, and start/end dates are filled in by the system from
+    these fields, so do NOT write them. For EACH task give:
+    - id: short unique ID, e.g. "T1"
+    - title: the task title (action-oriented)
+    - summary: one sentence on what is included
+    - category: Backend | Frontend | Database | DevOps | Testing | Documentation
+    - priority: Critical | High | Medium | Low
+    - estimate_days: working days for one developer (3-7)
+    - depends_on: IDs of the tasks that must be finished first
+    - criteria: 3-5 measurable acceptance criteria
+
+    YOUR FINAL OUTPUT MUST BE A JSON OBJECT with a "tasks" array:
     {{
-        "card_specifications": [
-            {{
-                "list_id": "6731abc123",
-                "card_name": "Setup Development Environment",
-                "description": "Configure local environment with Node.js, React, PostgreSQL. Set up linting and Git hooks.",
-                "start_date": "2025-11-15",
-                "end_date": "2025-11-16",
-                "labels": [
-                    {{"name": "Critical Priority", "color": "red"}},
-                    {{"name": "DevOps", "color": "lime"}}
-                ],
-                "checklist_items": [
-                    "All team members can run app locally",
-                    "ESLint and Prettier configured",
-                    "Git pre-commit hooks working"
-                ]
-            }},
+        "tasks": [
             {{
-                "list_id": "6731def456",
-                "card_name": "Design Database Schema",
-                "description": "Create PostgreSQL schema for users, projects, tasks. Include migrations and indexes.",
-                "start_date": "2025-11-17",
-                "end_date": "2025-11-19",
-                "labels": [
-                    {{"name": "High Priority", "color": "orange"}},
-                    {{"name": "Database", "color": "sky"}}
-                ],
-                "checklist_items": [
-                    "ER diagram created and reviewed",
-                    "All tables created with proper indexes",
-                    "Migration scripts tested"
-                ]
+                "id": "T1",
+                "title": "Setup Development Environment",
+                "summary": "Local environment with Node.js, React and PostgreSQL, linting and Git hooks.",
+                "category": "DevOps",
+                "priority": "Critical",
+                "estimate_days": 3,
+                "depends_on": [],
+                "criteria": ["All team members can run app locally", "ESLint and Prettier configured", "Git pre-commit hooks working"]
             }}
         ]
     }}
 
     CRITICAL REQUIREMENTS:
-    - Create specification for EVERY task in the task list
-    - Use ACTUAL list IDs from create_board_structure_task output
-    - Calculate realistic dates based on project timeline
-    - Each card must have at least 2 labels (priority + category)
-    - Each card must have 3-5 checklist items from acceptance criteria
-    - Output MUST be a JSON object with "card_specifications" field containing the array
+    - Create an entry for EVERY task in the task list
     - Output ONLY the JSON object, NO additional text
-    - Minimum 10 card specifications
+    - Minimum 10 tasks
     """,
     agent=planning_synthesizer,
-    expected_output="Valid JSON object with 'card_specifications' field containing an array of card specifications in the exact format specified, one for each task. Minimum 10 cards. NO additional text.",
-    context=[create_board_structure_task, task_generation_task],
-    output_json=CardSpecifications
+    expected_output="Valid JSON object with a 'tasks' array in the compact format, one entry per task. Minimum 10 tasks. NO additional text.",
+    context=[task_generation_task],
+    # Native structured output: the model is constrained to the schema instead of being re-asked
+    # by crewai's converter; the flow parses (and if needed repairs) the result locally
+    response_model=CompactPlan
 )
 
 planning_crew = Crew(
-    agents=[trello_board_manager, task_generator, timeline_planner, task_assigner, planning_synthesizer],
+    agents=[trello_board_manager, task_generator, timeline_planner, planning_synthesizer],
     tasks=[create_board_structure_task, task_generation_task, card_specifications_task],
     verbose=True,
     memory=False,  # Disable memory for consistent behavior
     cache=False    # Disable cache for fresh execution
 )
+
+
+# ====================== Workstream planning (PLANNING_MODE=workstreams) ======================
+# The board structure is created first, then the project is outlined into workstreams, and each
+# workstream's cards are generated by its own crew run, concurrently; the flow merges the results.
+
+workstream_outline_task = TracedTask(
+    name="workstream_outline_task",
+    description="""
+    Outline the workstreams of this project.
+
+    Project Description: {project_description}
+    research_output: {research_output}
+    Project Timeline: {project_timeline}
+
+    Start from these workstreams: Backend, Frontend, Database, DevOps, Testing, Documentation.
+    Drop the ones this project does not need and add at most two project-specific ones.
+
+    For each workstream give its name and a 2-4 sentence scope: the functional areas it covers and
+    where it ends, so that no task belongs to two workstreams.
+
+    Return ONLY a JSON object: {{"workstreams": [{{"name": "...", "scope": "..."}}]}}
+    """,
+    agent=task_generator,
+    expected_output="JSON object with a 'workstreams' array of name/scope objects. NO additional text.",
+    response_model=WorkstreamOutline
+)
+
+workstream_card_specifications_task = TracedTask(
+    name="workstream_card_specifications_task",
+    description="""
+    Plan the tasks of ONE workstream of the project: {workstream}
+
+    Workstream scope: {workstream_scope}
+    Other workstreams (their tasks are planned separately - do NOT include them): {other_workstreams}
+
+    Project Description: {project_description}
+    research_output: {research_output}
+    Project Timeline: {project_timeline}
+
+    Break the workstream into moderate-sized tasks: each takes one developer 3-7 days, covers a
+    complete functional area and has 3-5 measurable acceptance criteria. Create as many tasks as
+    the workstream needs to be complete.
+
+    Board lists, labels and dates are filled in by the system, so do NOT write them. For EACH task give:
+    - id: short unique ID, e.g. "T1"
+    - title: the task title (action-oriented)
+    - summary: one sentence on what is included
+    - category: "{workstream}"
+    - priority: Critical | High | Medium | Low
+    - estimate_days: working days for one developer (3-7)
+    - depends_on: IDs of tasks in this workstream that must be finished first
+    - criteria: the acceptance criteria
+
+    Output ONLY a JSON object with a "tasks" array, NO additional text.
+    """,
+    agent=planning_synthesizer,
+    expected_output="Valid JSON object with a 'tasks' array covering this workstream only. NO additional text.",
+    response_model=CompactPlan
+)
+
+board_structure_crew = Crew(
+    agents=[trello_board_manager],
+    tasks=[create_board_structure_task],
+    verbose=True,
+    memory=False,
+    cache=False
+)
+
+workstream_outline_crew = Crew(
+    agents=[task_generator],
+    tasks=[workstream_outline_task],
+    verbose=True,
+    memory=False,
+    cache=False
+)
+
+workstream_crew = Crew(
+    agents=[planning_synthesizer],
+    tasks=[workstream_card_specifications_task],
+    verbose=True,
+    memory=False,
+    cache=False
+)
@@ -0,0 +1,147 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from crewai.events import BaseEventListener
+from crewai.events.types.flow_events import (
+    MethodExecutionStartedEvent,
+    MethodExecutionFinishedEvent,
+    MethodExecutionFailedEvent,
+)
+
+from pm_master.metrics import flow_runs_total, flow_stage_duration_seconds
+from project.events import publish_event, reset_events
+
+
+class FlowRun:
+    """Counters and timing state for a single ProJectFlow run."""
+
+    def __init__(self, project_id: str, run_id: str):
+        self.project_id = project_id
+        self.run_id = run_id
+        self.started_at = time.monotonic()
+        self.stage_started_at: dict[str, float] = {}
+        self.counters = {
+            "llm_calls": 0,
+            "llm_latency_ms": 0,
+            "total_tokens": 0,
+            "cards_created": 0,
+        }
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started_at) * 1000)
+
+
+# The run of the flow whose code is executing; the threads and tasks the flow starts inherit it
+_current_run: ContextVar[Optional[FlowRun]] = ContextVar("flow_progress_run", default=None)
+
+
+class FlowProgressListener(BaseEventListener):
+    """
+    Forwards the progress of flow runs to their projects' Redis event streams.
+
+    crewai's event bus is process-wide, has no way to unregister handlers and
+    calls them on its own threads, so the listener is registered once and each
+    flow event is routed to its run by the flow's ID. LLM calls and created cards
+    are reported by the code that makes them (`MeteredLLM`, the create-card
+    tool) to the run of the current context. Several flows running in one
+    process therefore never mix their events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # flow ID -> run
+        self.runs: dict[str, FlowRun] = {}
+        super().__init__()
+
+    def begin_run(self, flow, project_id: str, run_id: str):
+        """Starts tracking `flow`'s run; the current context, and what the flow starts from it, reports to it."""
+        run = FlowRun(project_id, run_id)
+        with self._lock:
+            self.runs[flow.flow_id] = run
+        _current_run.set(run)
+        reset_events(project_id)
+        publish_event(project_id, "flow_started", {"run_id": run_id})
+
+    def end_run(self, flow, error: Exception = None):
+        with self._lock:
+            run = self.runs.pop(flow.flow_id, None)
+        if run is None:
+            return
+        if _current_run.get() is run:
+            _current_run.set(None)
+
+        data = {"run_id": run.run_id, "duration_ms": run.elapsed_ms(), **run.counters}
+        flow_runs_total.inc(status="failed" if error is not None else "succeeded")
+        if error is not None:
+            publish_event(run.project_id, "flow_failed", {**data, "error": str(error)})
+        else:
+            publish_event(run.project_id, "flow_finished", data)
+
+    @staticmethod
+    def publish(run: FlowRun, event: str, data: dict = None):
+        publish_event(run.project_id, event, {"run_id": run.run_id, **(data or {})})
+
+    def llm_call_finished(self, model: str, agent_role: str, latency_ms: int, total_tokens: int):
+        """Counts an LLM call of the current run."""
+        run = _current_run.get()
+        if run is None:
+            return
+        with self._lock:
+            run.counters["llm_calls"] += 1
+            run.counters["llm_latency_ms"] += latency_ms
+            run.counters["total_tokens"] += total_tokens
+            counters = dict(run.counters)
+        self.publish(run, "llm_call", {"model": model, "agent": agent_role, "latency_ms": latency_ms, **counters})
+
+    def card_created(self, card_id: str, args: dict):
+        """Counts a card the current run created on the board."""
+        run = _current_run.get()
+        if run is None:
+            return
+        with self._lock:
+            run.counters["cards_created"] += 1
+            cards_created = run.counters["cards_created"]
+        self.publish(run, "card_created", {
+            "card_id": card_id,
+            "card_name": args.get("card_name"),
+            "list_id": args.get("list_id"),
+            "start_date": args.get("start_date"),
+            "end_date": args.get("end_date"),
+            "cards_created": cards_created,
+        })
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(MethodExecutionStartedEvent)
+        def on_stage_started(source, event):
+            run = self.runs.get(source.flow_id)
+            if run is None:
+                return
+            run.stage_started_at[event.method_name] = time.monotonic()
+            self.publish(run, "stage_started", {"stage": event.method_name})
+
+        @crewai_event_bus.on(MethodExecutionFinishedEvent)
+        def on_stage_finished(source, event):
+            run = self.runs.get(source.flow_id)
+            if run is None:
+                return
+            started_at = run.stage_started_at.pop(event.method_name, time.monotonic())
+            duration = time.monotonic() - started_at
+            flow_stage_duration_seconds.observe(duration, stage=event.method_name, status="succeeded")
+            self.publish(run, "stage_finished", {
+                "stage": event.method_name,
+                "duration_ms": int(duration * 1000),
+            })
+
+        @crewai_event_bus.on(MethodExecutionFailedEvent)
+        def on_stage_failed(source, event):
+            run = self.runs.get(source.flow_id)
+            if run is None:
+                return
+            started_at = run.stage_started_at.pop(event.method_name, time.monotonic())
+            flow_stage_duration_seconds.observe(time.monotonic() - started_at, stage=event.method_name, status="failed")
+            self.publish(run, "stage_failed", {"stage": event.method_name, "error": str(event.error)})
+
+
+progress_listener = FlowProgressListener()
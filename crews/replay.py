@@ -0,0 +1,198 @@
+"""
+Record/replay of LLM completions for offline runs.
+
+In record mode the live LLM's completions are appended to a JSON lines fixture
+file, keyed by model and normalized prompt. In replay mode they are served back
+from that file, so crews run reproducibly without OpenAI access. Replay only
+matches prompts that are identical to the recorded ones, so the board, list and
+card IDs seen by the agents must be reproducible too (e.g. a recorded Trello
+session or a local board backend).
+"""
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llm import CONTEXT_WINDOW_USAGE_RATIO, DEFAULT_CONTEXT_WINDOW_SIZE, LLM_CONTEXT_WINDOW_SIZES
+from crewai.llms.base_llm import BaseLLM
+
+from .llm import PROMPT_EXCERPT_LENGTH, LLMWrapper, normalize_prompt, prompt_hash
+
+
+class LLMFixtureMissing(LookupError):
+    """Raised in replay mode for a prompt that was never recorded."""
+
+
+class LLMFixtures:
+    """Recorded completions, loaded from and appended to a JSON lines file."""
+
+    _instances: dict[str, "LLMFixtures"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fixtures: dict[tuple[str, str], dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        fixture = json.loads(line)
+                        # The first recording of a prompt wins, so replays are stable
+                        self._fixtures.setdefault((fixture["model"], fixture["prompt_hash"]), fixture)
+
+    @classmethod
+    def open(cls, path: str) -> "LLMFixtures":
+        """Returns the shared fixtures of a file, so all crews record into one store."""
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def __len__(self) -> int:
+        return len(self._fixtures)
+
+    def get(self, model: str, messages) -> dict | None:
+        return self._fixtures.get((model, prompt_hash(messages)))
+
+    def add(self, model: str, messages, response: str, usage: dict, latency_ms: int):
+        fixture = {
+            "model": model,
+            "prompt_hash": prompt_hash(messages),
+            "prompt_excerpt": normalize_prompt(messages)[-PROMPT_EXCERPT_LENGTH:],
+            "response": response,
+            "usage": usage,
+            "latency_ms": latency_ms,
+        }
+        with self._lock:
+            key = (model, fixture["prompt_hash"])
+            if key in self._fixtures:
+                return
+            self._fixtures[key] = fixture
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(fixture) + "\n")
+
+
+def _usage_counts(usage_data: dict[str, Any]) -> dict[str, int]:
+    return {
+        "prompt_tokens": usage_data.get("prompt_tokens") or usage_data.get("input_tokens") or 0,
+        "completion_tokens": usage_data.get("completion_tokens") or usage_data.get("output_tokens") or 0,
+        "cached_tokens": usage_data.get("cached_tokens") or usage_data.get("cached_prompt_tokens") or 0,
+    }
+
+
+class RecordingLLM(LLMWrapper):
+    """Calls the live LLM and records every text completion into the fixtures."""
+
+    def __init__(self, inner: BaseLLM, fixtures: LLMFixtures):
+        super().__init__(inner)
+        self.fixtures = fixtures
+        self._call_usage = threading.local()
+        inner._track_token_usage_internal = self._capture_usage(inner._track_token_usage_internal)
+
+    def _capture_usage(self, track):
+        def tracker(usage_data: dict[str, Any]) -> None:
+            track(usage_data)
+            self._call_usage.counts = _usage_counts(usage_data)
+            # Forward to whoever meters this LLM
+            self._track_token_usage_internal(usage_data)
+
+        return tracker
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        self._call_usage.counts = None
+        started_at = time.perf_counter()
+        response = self._inner.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+        latency_ms = int((time.perf_counter() - started_at) * 1000)
+
+        # Native tool calls and structured responses are not replayable as text
+        if isinstance(response, str):
+            usage = self._call_usage.counts or _usage_counts({})
+            self.fixtures.add(self.model, messages, response, usage, latency_ms)
+        return response
+
+
+class ReplayLLM(BaseLLM):
+    """
+    Serves recorded completions instead of calling OpenAI.
+
+    `latency` delays every call: a number of seconds, or "recorded" to wait as
+    long as the original call took.
+    """
+
+    def __init__(self, model: str, fixtures: LLMFixtures, latency: float | str = 0):
+        super().__init__(model=model, temperature=None, provider="openai")
+        self.fixtures = fixtures
+        self.latency = latency if latency == "recorded" else float(latency)
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        self._emit_call_started_event(
+            messages=messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+        fixture = self.fixtures.get(self.model, messages)
+        if fixture is None:
+            error = LLMFixtureMissing(
+                f"No recorded {self.model} completion for prompt {prompt_hash(messages)} in {self.fixtures.path}: "
+                f"...{normalize_prompt(messages)[-200:]}"
+            )
+            self._emit_call_failed_event(error=str(error), from_task=from_task, from_agent=from_agent)
+            raise error
+
+        delay = fixture["latency_ms"] / 1000 if self.latency == "recorded" else self.latency
+        if delay:
+            time.sleep(delay)
+
+        self._track_token_usage_internal({**fixture["usage"], "cache_hit": True})
+        self._emit_call_completed_event(
+            response=fixture["response"],
+            call_type=LLMCallType.LLM_CALL,
+            from_task=from_task,
+            from_agent=from_agent,
+            messages=messages,
+        )
+        return fixture["response"]
+
+    # Answer like the live OpenAI models, so agents build the same prompts as when recording
+    def supports_function_calling(self) -> bool:
+        return True
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return int(LLM_CONTEXT_WINDOW_SIZES.get(self.model, DEFAULT_CONTEXT_WINDOW_SIZE) * CONTEXT_WINDOW_USAGE_RATIO)
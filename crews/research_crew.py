@@ -1,11 +1,14 @@
-from crewai import Crew, Agent, Task, LLM
+from crewai import Crew, Agent
 from dotenv import load_dotenv
 from crewai_tools import ScrapeWebsiteTool, SerperDevTool
 import os
 
+from .llm import build_llm
+from .task import TracedTask
+
 load_dotenv()
 
-llm = LLM(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
+llm = build_llm("gpt-4o-mini", stage="research")
 
 # Tools - will only be used when needed
 scrape_website_tool = ScrapeWebsiteTool()
@@ -65,20 +68,6 @@ project_analyzer = Agent(
     allow_delegation=False
 )
 
-team_assessor = Agent(
-    role="Team Capability Assessor",
-    goal="Assess team capabilities against project needs, researching only when skills are unclear",
-    backstory="""Expert technical recruiter and team lead who evaluates team fit.
-    You understand common technical skills and only research when:
-    - Unfamiliar technologies are mentioned
-    - New frameworks or tools need investigation
-    - Industry-specific skills need clarification""",
-    tools=[serper_tool],  # Only search tool, no scraping
-    llm=llm,
-    verbose=True,
-    allow_delegation=False
-)
-
 research_synthesizer = Agent(
     role="Research Synthesizer",
     goal="Consolidate all findings into comprehensive foundation document",
@@ -92,7 +81,8 @@ research_synthesizer = Agent(
 
 # ================================ Tasks ================================
 
-evaluate_research_needs_task = Task(
+evaluate_research_needs_task = TracedTask(
+    name="evaluate_research_needs_task",
     description="""
     Analyze the project description and determine what research is actually needed.
 
@@ -163,7 +153,8 @@ evaluate_research_needs_task = Task(
     expected_output="JSON object with research_recommendation, reasoning, information_gaps, research_topics, and estimated_completeness"
 )
 
-conditional_industry_research_task = Task(
+conditional_industry_research_task = TracedTask(
+    name="conditional_industry_research_task",
     description="""
     Based on the research coordinator's recommendation, conduct targeted industry research.
 
@@ -208,7 +199,8 @@ conditional_industry_research_task = Task(
     context=[evaluate_research_needs_task]
 )
 
-conditional_project_analysis_task = Task(
+conditional_project_analysis_task = TracedTask(
+    name="conditional_project_analysis_task",
     description="""
     Analyze project scope, using web research only if critical gaps exist.
 
@@ -257,63 +249,15 @@ conditional_project_analysis_task = Task(
     context=[evaluate_research_needs_task, conditional_industry_research_task]
 )
 
-team_assessment_task = Task(
-    description="""
-    Assess team capabilities, researching unfamiliar technologies only when necessary.
-
-    Team Members: {team_members}
-    Project Requirements: {{output from conditional_project_analysis_task}}
-    Research Recommendation: {{output from evaluate_research_needs_task}}
-
-    TEAM ANALYSIS:
-
-    1. **Skills Inventory**:
-       - List each member's skills and experience level
-       - Match skills to project requirements
-       - Identify coverage (who can do what)
-
-    2. **Gap Analysis**:
-       - Compare team skills to project needs
-       - Identify missing capabilities
-       - Prioritize gaps (Critical/Important/Nice-to-have)
-
-    3. **Research ONLY If**:
-       - Unfamiliar technology mentioned in project (e.g., "We need Elixir experts")
-       - New framework that team hasn't used (check if training is feasible)
-       - Industry-specific skills that need clarification
-
-    4. **Recommendations**:
-       - Task distribution based on skills
-       - Training needs
-       - Hiring recommendations (if any)
-       - Team structure
-
-    OUTPUT FORMAT:
-
-    "TEAM ASSESSMENT [Using: Team Info {{"+ Tech Research" if searches used}}]"
-
-    Then provide:
-    - Individual skill analysis
-    - Skills gap analysis with priorities
-    - Capacity analysis
-    - Recommendations
-
-    DO NOT search for common technologies (React, Node.js, Python, etc.)
-    ONLY research truly unfamiliar or cutting-edge technologies.
-    """,
-    agent=team_assessor,
-    expected_output="Team capability assessment with skills gaps, capacity analysis, and recommendations",
-    context=[evaluate_research_needs_task, conditional_project_analysis_task]
-)
-
-research_synthesis_task = Task(
+research_synthesis_task = TracedTask(
+    name="research_synthesis_task",
     description="""
     Synthesize all findings into comprehensive project foundation document.
 
-    Research Recommendation: {{output from evaluate_research_needs_task}}
-    Industry Research: {{output from conditional_industry_research_task}}
-    Project Analysis: {{output from conditional_project_analysis_task}}
-    Team Assessment: {{output from team_assessment_task}}
+    Research Recommendation: {research_recommendation}
+    Industry Research: {industry_research}
+    Project Analysis: {project_analysis}
+    Team Assessment (computed from the team's skills; use it as is): {team_assessment}
 
     Create complete project foundation document with these sections:
 
@@ -337,7 +281,7 @@ research_synthesis_task = Task(
     (All identified dependencies)
 
     ## 5. TEAM ASSESSMENT & RECOMMENDATIONS
-    (Complete team analysis)
+    (The team assessment above, with its gaps and recommendations)
 
     ## 6. RESOURCE REQUIREMENTS
     (Development, infrastructure, tools)
@@ -358,31 +302,30 @@ research_synthesis_task = Task(
     """,
     agent=research_synthesizer,
     expected_output="Complete project foundation document with all 8 sections, noting research level used",
-    context=[
-        evaluate_research_needs_task,
-        conditional_industry_research_task,
-        conditional_project_analysis_task,
-        team_assessment_task
-    ]
 )
 
 # ================================ Crew ================================
+# The team assessment between the analysis and the synthesis is computed locally (planning/team.py)
 research_crew= Crew(
     agents=[
         research_coordinator,
         industry_researcher,
         project_analyzer,
-        team_assessor,
-        research_synthesizer
     ],
     tasks=[
         evaluate_research_needs_task,
         conditional_industry_research_task,
         conditional_project_analysis_task,
-        team_assessment_task,
-        research_synthesis_task
     ],
     verbose=True,
     memory=False,
     cache=False
 )
+
+research_synthesis_crew = Crew(
+    agents=[research_synthesizer],
+    tasks=[research_synthesis_task],
+    verbose=True,
+    memory=False,
+    cache=False
+)
@@ -0,0 +1,175 @@
+"""
+Streaming of planned tasks from the planning model to the execution crew.
+
+While card_specifications_task streams its completion, `PlannedTaskParser`
+picks each complete task object out of the partial JSON, and `TaskStream` hands
+the tasks through a bounded queue to whoever expands them into cards and
+creates those, so card creation overlaps with generation. The queue bound
+applies backpressure: when execution falls behind, reading the model's stream
+pauses instead of buffering the plan.
+"""
+import contextlib
+import json
+import logging
+import queue
+import threading
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from crewai.events import BaseEventListener
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from pydantic import ValidationError
+
+from .planning_crew import PlannedTask
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class PlannedTaskParser:
+    """
+    Incremental JSON scanner that returns each task object as soon as it is closed.
+
+    Tasks are the objects directly inside the first array of the output, which
+    covers both `{"tasks": [...]}` and a bare array. Text before the JSON
+    (e.g. "Final Answer:") is skipped; consumed text is dropped, so memory
+    stays bounded by the size of one task.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._array_depth: Optional[int] = None
+        self._task_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> list[PlannedTask]:
+        self._text += chunk
+        text = self._text
+        task_texts = []
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._task_start = index
+            elif char in "}]":
+                if self._array_depth is not None:
+                    if char == "}" and self._task_start is not None and self._depth == self._array_depth + 1:
+                        task_texts.append(text[self._task_start:index + 1])
+                        self._task_start = None
+                    elif char == "]" and self._depth == self._array_depth:
+                        self._array_depth = None
+                self._depth = max(self._depth - 1, 0)
+
+        # Keep only the task that is still open
+        keep_from = self._task_start if self._task_start is not None else len(text)
+        self._text = text[keep_from:]
+        self._pos = len(self._text)
+        if self._task_start is not None:
+            self._task_start = 0
+
+        return [task for task in map(self._parse_task, task_texts) if task is not None]
+
+    @staticmethod
+    def _parse_task(task_text: str) -> Optional[PlannedTask]:
+        try:
+            return PlannedTask.model_validate(json.loads(task_text))
+        except (ValueError, ValidationError) as e:
+            # The complete output is parsed again after planning; the task is picked up (or dropped) there
+            logger.warning("Skipping streamed planned task that does not parse: %s", e)
+            return None
+
+
+class TaskStream:
+    """
+    Bounded queue of the planned tasks a crew task's streamed completions produce.
+
+    Each thread gets its own parser, so concurrent runs of the task (one per
+    workstream) can stream into the same queue. Task IDs are prefixed with the
+    namespace the chunk was streamed under, as they are only unique per run.
+    """
+
+    def __init__(self, task_name: str, maxsize: int = 0):
+        self.task_name = task_name
+        self.received: list[PlannedTask] = []
+        self._lock = threading.Lock()
+        self._parsers: dict[int, PlannedTaskParser] = {}
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def feed(self, chunk: str, namespace: Optional[str] = None):
+        with self._lock:
+            parser = self._parsers.setdefault(threading.get_ident(), PlannedTaskParser())
+        for task in parser.feed(chunk):
+            if namespace:
+                task.id = f"{namespace}:{task.id}"
+                task.depends_on = [f"{namespace}:{dependency}" for dependency in task.depends_on]
+            with self._lock:
+                # A retried completion repeats the tasks that were already streamed
+                if task in self.received:
+                    continue
+                self.received.append(task)
+            self._queue.put(task)
+
+    def close(self):
+        self._queue.put(_END)
+
+    def __iter__(self) -> Iterator[PlannedTask]:
+        while (task := self._queue.get()) is not _END:
+            yield task
+
+
+_active_stream: ContextVar[Optional[TaskStream]] = ContextVar("active_task_stream", default=None)
+_stream_namespace: ContextVar[Optional[str]] = ContextVar("task_stream_namespace", default=None)
+
+
+class PlanStreamListener(BaseEventListener):
+    """
+    Feeds streamed completion chunks to the task stream of the current context.
+
+    crewai delivers stream chunk events synchronously in the thread making the
+    LLM call, so the stream set by `streaming()` is visible to the handler and
+    chunks arrive in order.
+    """
+
+    @contextlib.contextmanager
+    def streaming(self, stream: Optional[TaskStream]):
+        token = _active_stream.set(stream)
+        try:
+            yield stream
+        finally:
+            _active_stream.reset(token)
+
+    @contextlib.contextmanager
+    def namespace(self, name: str):
+        """Prefixes the IDs of the tasks streamed in this context, e.g. with the workstream name."""
+        token = _stream_namespace.set(name)
+        try:
+            yield
+        finally:
+            _stream_namespace.reset(token)
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def on_chunk(source, event):
+            stream = _active_stream.get()
+            if stream is None or event.task_name != stream.task_name or not event.chunk:
+                return
+            stream.feed(event.chunk, _stream_namespace.get())
+
+
+plan_stream_listener = PlanStreamListener()
@@ -0,0 +1,13 @@
+from crewai import Task
+
+from pm_master.tracing import tracer
+
+
+class TracedTask(Task):
+    """Crew task that runs inside a tracing span, so its LLM and tool calls nest under it."""
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        agent = agent or self.agent
+        with tracer.start_as_current_span(f"task.{self.name or 'unnamed'}") as span:
+            span.set_attribute("crew.agent_role", agent.role if agent else "")
+            return super().execute_sync(agent=agent, context=context, tools=tools)
@@ -0,0 +1,201 @@
+import json
+
+from django.test import SimpleTestCase
+
+from crews.plan import (
+    PlanExpander,
+    PlanParseError,
+    expand_compact_plan,
+    merge_compact_plans,
+    parse_compact_plan,
+    schedule_compact_plan,
+    validate_plan,
+)
+from crews.planning_crew import CardSpecification, CardSpecifications, CompactPlan, Label, PlannedTask
+from planning.calendar import WorkingCalendar
+
+BOARD_LISTS = [{"id": "list-todo", "name": "To Do", "pos": 2}, {"id": "list-backlog", "name": "Backlog", "pos": 1}]
+TIMELINE = "2025-03-03 to 2025-03-28"
+
+
+def card(**fields):
+    return CardSpecification(**{
+        "list_id": "list-todo",
+        "card_name": "API",
+        "description": "",
+        "start_date": "2025-03-04",
+        "end_date": "2025-03-06",
+        "labels": [Label(name="High Priority", color="orange")],
+        "checklist_items": ["Endpoints respond"],
+        **fields,
+    })
+
+
+def task(id, title, depends_on=(), **fields):
+    return {"id": id, "title": title, "category": "Backend", "priority": "High", "depends_on": list(depends_on), **fields}
+
+
+class ParseCompactPlanTests(SimpleTestCase):
+    def test_valid_json_and_models(self):
+        plan = CompactPlan.model_validate({"tasks": [task("1", "API")]})
+        self.assertEqual(parse_compact_plan(plan.model_dump_json()), plan)
+        self.assertEqual(parse_compact_plan(plan), plan)
+
+    def test_fenced_and_truncated_output_is_repaired(self):
+        output = "Here is the plan:\n```json\n" + json.dumps({"tasks": [task("1", "API"), task("2", "Auth", ["1"])]})[:-3]
+        plan = parse_compact_plan(output)
+        self.assertEqual([t.title for t in plan.tasks], ["API", "Auth"])
+
+    def test_the_tasks_array_is_found_under_another_key(self):
+        self.assertEqual(len(parse_compact_plan({"plan": [task("1", "API")]}).tasks), 1)
+        self.assertEqual(len(parse_compact_plan([task("1", "API")]).tasks), 1)
+
+    def test_a_malformed_task_is_dropped(self):
+        with self.assertLogs("crews.plan", "WARNING"):
+            plan = parse_compact_plan(json.dumps({"tasks": [task("1", "API"), {"id": "2"}]}) + ",")
+        self.assertEqual([t.id for t in plan.tasks], ["1"])
+
+    def test_output_without_a_valid_task_fails(self):
+        with self.assertRaises(PlanParseError):
+            parse_compact_plan("I could not plan this project.")
+        with self.assertLogs("crews.plan", "WARNING"), self.assertRaises(PlanParseError):
+            parse_compact_plan({"tasks": [{"title": "No ID"}]})
+
+
+class MergeCompactPlansTests(SimpleTestCase):
+    def test_tasks_with_the_same_title_are_merged(self):
+        merged = merge_compact_plans([
+            CompactPlan.model_validate({"tasks": [task("b1", "Set up CI", criteria=["Tests run"]), task("b2", "API", ["b1"])]}),
+            CompactPlan.model_validate({"tasks": [
+                task("f1", "set up CI!", ["b2"], criteria=["Tests run", "Deploys"]),
+                task("f2", "Pages", ["f1", "b1"]),
+            ]}),
+        ])
+        self.assertEqual([t.id for t in merged.tasks], ["b1", "b2", "f2"])
+        # The duplicate adds its dependencies and criteria to the kept task, without cycles on itself
+        self.assertEqual(merged.tasks[0].depends_on, ["b2"])
+        self.assertEqual(merged.tasks[0].criteria, ["Tests run", "Deploys"])
+        # Dependencies on the duplicate point to the kept task, once
+        self.assertEqual(merged.tasks[2].depends_on, ["b1"])
+
+
+class PlanExpanderTests(SimpleTestCase):
+    def expander(self):
+        return PlanExpander(BOARD_LISTS, TIMELINE)
+
+    def test_cards_take_their_list_labels_and_dates_from_the_task(self):
+        [card] = self.expander().add(PlannedTask.model_validate(
+            task("1", "API", priority="critical", category="Frontend", estimate_days=3, summary="Build it", criteria=["Works"]),
+        ))
+        self.assertEqual(card.list_id, "list-todo")
+        self.assertEqual([(label.name, label.color) for label in card.labels], [("Critical Priority", "red"), ("Frontend", "purple")])
+        # Mon to Wed: three working days from the start of the timeline
+        self.assertEqual((card.start_date, card.end_date), ("2025-03-03", "2025-03-05"))
+        self.assertEqual(card.description, "Build it\n\nEstimate: 3 working day(s).")
+        self.assertEqual((card.checklist_items, card.task_id), (["Works"], "1"))
+
+    def test_unknown_priorities_and_categories_fall_back(self):
+        [card] = self.expander().add(PlannedTask.model_validate(task("1", "Docs", priority="whenever", category="Legal")))
+        self.assertEqual(card.list_id, "list-backlog")
+        self.assertEqual([label.color for label in card.labels], ["yellow", "blue"])
+
+    def test_a_task_waits_for_its_dependencies(self):
+        expander = self.expander()
+        self.assertEqual(expander.add(PlannedTask.model_validate(task("2", "Auth", ["1"], estimate_days=1))), [])
+        cards = expander.add(PlannedTask.model_validate(task("1", "API", estimate_days=4)))
+        self.assertEqual([card.task_id for card in cards], ["1", "2"])
+        # Auth starts the working day after the API is done, past the weekend
+        self.assertEqual(cards[1].start_date, "2025-03-07")
+        self.assertTrue(cards[1].description.endswith("Depends on: API."))
+
+    def test_flush_expands_tasks_whose_dependencies_never_arrived(self):
+        expander = self.expander()
+        expander.add(PlannedTask.model_validate(task("2", "Auth", ["missing"])))
+        expander.add(PlannedTask.model_validate(task("3", "Login", ["2"])))
+        self.assertEqual([card.task_id for card in expander.flush()], ["2", "3"])
+        self.assertEqual([card.start_date for _, card in expander.expanded], ["2025-03-03", "2025-03-04"])
+
+
+class ScheduleCompactPlanTests(SimpleTestCase):
+    def plan(self, *tasks):
+        return CompactPlan.model_validate({"tasks": list(tasks)})
+
+    def test_cards_follow_the_critical_path(self):
+        plan = self.plan(task("1", "API", estimate_days=3), task("2", "Auth", ["1"], estimate_days=2), task("3", "Docs", estimate_days=1))
+        schedule = schedule_compact_plan(plan, TIMELINE)
+        self.assertEqual((schedule.duration, schedule.critical_path), (5, ["1", "2"]))
+        cards = expand_compact_plan(plan, BOARD_LISTS, TIMELINE).card_specifications
+        self.assertEqual([(c.task_id, c.start_date, c.end_date) for c in cards], [
+            ("1", "2025-03-03", "2025-03-05"),
+            ("2", "2025-03-06", "2025-03-07"),
+            ("3", "2025-03-03", "2025-03-03"),
+        ])
+        self.assertIn("Slack: 4 working day(s).", cards[2].description)
+
+    def test_a_duplicate_task_id_keeps_the_first_task_schedule(self):
+        plan = self.plan(task("1", "API", estimate_days=2), task("2", "Auth", ["1"]), task("1", "API again", ["2"], estimate_days=5))
+        schedule = schedule_compact_plan(plan, TIMELINE)
+        self.assertEqual(schedule.duration, 3)
+        self.assertEqual(schedule.dropped_dependencies, [])
+
+
+class ValidatePlanTests(SimpleTestCase):
+    def validate(self, *cards, **options):
+        return validate_plan(CardSpecifications(card_specifications=list(cards)), BOARD_LISTS, TIMELINE, **options)
+
+    def codes(self, validation):
+        return [(violation.card_index, violation.field, violation.code, violation.repaired) for violation in validation.violations]
+
+    def test_a_valid_plan(self):
+        validation = self.validate(card(), calendar=WorkingCalendar())
+        self.assertTrue(validation.is_valid)
+        self.assertEqual(validation.as_dict(), {"valid": True, "violations": []})
+
+    def test_every_violation_is_reported_at_once(self):
+        validation = self.validate(
+            card(),
+            card(card_name=" ", list_id="Doing", start_date="2025-03-10", end_date="2025-03-07", checklist_items=[]),
+            card(start_date="03/04/2025", labels=[Label(name="Backend", color="teal")], checklist_items=["Done", " "]),
+        )
+        self.assertEqual(self.codes(validation), [
+            (1, "card_name", "empty", False),
+            (1, "list_id", "unknown_list", False),
+            (1, "end_date", "end_before_start", False),
+            (1, "checklist_items", "empty_checklist", False),
+            (2, "start_date", "invalid_date", False),
+            (2, "labels", "invalid_color", False),
+            (2, "checklist_items", "blank_item", False),
+        ])
+        self.assertEqual([c.card_name for c in validation.valid_cards().card_specifications], ["API"])
+
+    def test_trivial_problems_are_repaired_on_a_copy(self):
+        original = CardSpecifications(card_specifications=[card(
+            list_id="backlog", start_date="2025-02-26", end_date="2025-03-02",
+            labels=[Label(name="Backend", color=" Purple")], checklist_items=["Done", ""],
+        )])
+        validation = validate_plan(original, BOARD_LISTS, TIMELINE, repair=True)
+        self.assertTrue(validation.is_valid)
+        self.assertTrue(all(violation.repaired for violation in validation.violations))
+        [repaired] = validation.card_specs.card_specifications
+        self.assertEqual(repaired.list_id, "list-backlog")
+        self.assertEqual((repaired.start_date, repaired.end_date), ("2025-03-03", "2025-03-03"))
+        self.assertEqual(repaired.labels[0].color, "purple")
+        self.assertEqual(repaired.checklist_items, ["Done"])
+        self.assertEqual(original.card_specifications[0].list_id, "backlog")
+
+    def test_an_unknown_list_falls_back_to_the_first_list(self):
+        validation = self.validate(card(list_id="Doing"), repair=True)
+        self.assertEqual(validation.card_specs.card_specifications[0].list_id, "list-backlog")
+
+    def test_dates_move_to_working_days(self):
+        # Sat 2025-03-08 .. Sun 2025-03-09
+        calendar = WorkingCalendar()
+        validation = self.validate(card(start_date="2025-03-08", end_date="2025-03-09"), calendar=calendar)
+        self.assertEqual(self.codes(validation), [
+            (0, "start_date", "non_working_day", False),
+            (0, "end_date", "non_working_day", False),
+        ])
+        repaired = self.validate(card(start_date="2025-03-08", end_date="2025-03-09"), calendar=calendar, repair=True)
+        [moved] = repaired.card_specs.card_specifications
+        # The end does not move back before the new start
+        self.assertEqual((moved.start_date, moved.end_date), ("2025-03-10", "2025-03-10"))
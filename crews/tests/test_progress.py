@@ -0,0 +1,74 @@
+import contextvars
+from types import SimpleNamespace
+from unittest import mock
+
+from crewai.events.types.flow_events import MethodExecutionFinishedEvent, MethodExecutionStartedEvent
+from django.test import SimpleTestCase
+
+from crews.progress import FlowProgressListener
+
+
+class RecordingBus:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_type):
+        def register(handler):
+            self.handlers[event_type] = handler
+            return handler
+        return register
+
+
+@mock.patch("crews.progress.reset_events")
+@mock.patch("crews.progress.publish_event")
+class FlowProgressListenerTests(SimpleTestCase):
+    def setUp(self):
+        self.listener = FlowProgressListener()
+        self.bus = RecordingBus()
+        self.listener.setup_listeners(self.bus)
+
+    def events(self, publish_event):
+        return [(project_id, event, data.get("run_id")) for (project_id, event, data), _ in publish_event.call_args_list]
+
+    def test_concurrent_runs_keep_their_events_apart(self, publish_event, reset_events):
+        flows = [SimpleNamespace(flow_id="flow-1"), SimpleNamespace(flow_id="flow-2")]
+        # Each run starts from its own context, as each flow runs in its own task or thread
+        contexts = [contextvars.copy_context() for _ in flows]
+        for context, flow, project_id in zip(contexts, flows, ["p1", "p2"]):
+            context.run(self.listener.begin_run, flow, project_id, f"run-{project_id}")
+
+        contexts[1].run(self.listener.llm_call_finished, "gpt-4o", "Planner", 120, 300)
+        contexts[0].run(self.listener.card_created, "card1", {"card_name": "API"})
+        self.bus.handlers[MethodExecutionStartedEvent](flows[1], SimpleNamespace(method_name="plan"))
+        self.bus.handlers[MethodExecutionFinishedEvent](flows[0], SimpleNamespace(method_name="research"))
+        # Outside of any run
+        self.listener.llm_call_finished("gpt-4o", "Planner", 120, 300)
+        self.bus.handlers[MethodExecutionStartedEvent](SimpleNamespace(flow_id="unknown"), SimpleNamespace(method_name="plan"))
+
+        self.assertEqual(self.events(publish_event), [
+            ("p1", "flow_started", "run-p1"),
+            ("p2", "flow_started", "run-p2"),
+            ("p2", "llm_call", "run-p2"),
+            ("p1", "card_created", "run-p1"),
+            ("p2", "stage_started", "run-p2"),
+            ("p1", "stage_finished", "run-p1"),
+        ])
+
+        publish_event.reset_mock()
+        contexts[0].run(self.listener.end_run, flows[0])
+        contexts[1].run(self.listener.end_run, flows[1], RuntimeError("failed"))
+        self.assertEqual(self.events(publish_event), [("p1", "flow_finished", "run-p1"), ("p2", "flow_failed", "run-p2")])
+        finished, failed = [data for (_, _, data), _ in publish_event.call_args_list]
+        self.assertEqual((finished["cards_created"], finished["llm_calls"]), (1, 0))
+        self.assertEqual((failed["cards_created"], failed["llm_calls"], failed["total_tokens"]), (0, 1, 300))
+
+    def test_nothing_is_reported_after_the_run_ends(self, publish_event, reset_events):
+        flow = SimpleNamespace(flow_id="flow-1")
+        context = contextvars.copy_context()
+        context.run(self.listener.begin_run, flow, "p1", "run-1")
+        context.run(self.listener.end_run, flow)
+        publish_event.reset_mock()
+
+        context.run(self.listener.card_created, "card1", {})
+        self.bus.handlers[MethodExecutionStartedEvent](flow, SimpleNamespace(method_name="plan"))
+        publish_event.assert_not_called()
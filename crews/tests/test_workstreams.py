@@ -0,0 +1,61 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from crews import workstreams
+from crews.plan import PlanParseError
+
+
+def crew_output(raw):
+    return SimpleNamespace(raw=raw, tasks_output=[SimpleNamespace(pydantic=None, raw=raw)])
+
+
+def task(id, title, depends_on=()):
+    return {"id": id, "title": title, "category": "Backend", "priority": "High", "depends_on": list(depends_on)}
+
+
+class PlanWorkstreamsTests(SimpleTestCase):
+    def plan(self, results):
+        """Plans the workstreams of `results`, each run returning its raw output or raising its exception."""
+        outline = json.dumps({"workstreams": [{"name": name, "scope": ""} for name in results]})
+
+        async def kickoff(inputs):
+            result = results[inputs["workstream"]]
+            if isinstance(result, BaseException):
+                raise result
+            return crew_output(result)
+
+        crew = mock.Mock()
+        crew.copy.return_value.kickoff_async = kickoff
+        with mock.patch.multiple(
+            workstreams,
+            board_structure_crew=mock.Mock(kickoff_async=mock.AsyncMock(return_value=crew_output(""))),
+            workstream_outline_crew=mock.Mock(kickoff_async=mock.AsyncMock(return_value=crew_output(outline))),
+            workstream_crew=crew,
+        ):
+            return asyncio.run(workstreams.plan_workstreams({}))
+
+    def test_task_ids_are_namespaced_by_workstream(self):
+        plan = self.plan({
+            "Backend": json.dumps({"tasks": [task("1", "API"), task("2", "Auth", ["1"])]}),
+            "Frontend": json.dumps({"tasks": [task("1", "Pages")]}),
+        })
+        self.assertEqual([t.id for t in plan.tasks], ["Backend:1", "Backend:2", "Frontend:1"])
+        self.assertEqual(plan.tasks[1].depends_on, ["Backend:1"])
+
+    def test_a_crashed_or_unparseable_workstream_only_loses_its_own_cards(self):
+        with self.assertLogs("crews.workstreams", "WARNING") as logs:
+            plan = self.plan({
+                "Backend": json.dumps({"tasks": [task("1", "API")]}),
+                "Frontend": TimeoutError("LLM timed out"),
+                "Testing": "no plan here",
+            })
+        self.assertEqual([t.id for t in plan.tasks], ["Backend:1"])
+        self.assertEqual(len(logs.records), 2)
+
+    def test_fails_when_no_workstream_produced_a_plan(self):
+        with self.assertLogs("crews.workstreams", "WARNING"), self.assertRaises(PlanParseError):
+            self.plan({"Backend": RuntimeError("tool failed"), "Frontend": "[]"})
@@ -0,0 +1,63 @@
+"""
+Map-reduce planning for large projects (PLANNING_MODE=workstreams).
+
+Instead of one completion that has to hold every task and card, the project is
+outlined into workstreams and each workstream's tasks are planned by its own
+crew run, all at once. Planning takes about as long as the slowest workstream,
+no single completion has to fit the whole plan, and a workstream that fails
+only loses its own cards.
+"""
+import asyncio
+import json
+import logging
+
+from .plan import PlanParseError, merge_compact_plans, parse_compact_plan, parse_workstream_outline
+from .planning_crew import CompactPlan, board_structure_crew, workstream_crew, workstream_outline_crew
+from .streaming import plan_stream_listener
+
+logger = logging.getLogger(__name__)
+
+
+async def plan_workstreams(inputs: dict) -> CompactPlan:
+    """Creates the board lists, outlines the workstreams and plans them concurrently; returns the merged plan."""
+    # The board structure and the outline don't depend on each other; the lists only have to exist before cards are created
+    _, outline_output = await asyncio.gather(
+        board_structure_crew.kickoff_async(inputs=inputs),
+        workstream_outline_crew.kickoff_async(inputs=inputs),
+    )
+    workstreams = parse_workstream_outline(outline_output.tasks_output[-1].pydantic or outline_output.raw)
+    names = [workstream.name for workstream in workstreams]
+    logger.info("Planning %s workstreams: %s", len(workstreams), ", ".join(names))
+
+    async def plan_workstream(workstream):
+        # Each run gets its own crew copy; the namespace keeps streamed task IDs apart
+        with plan_stream_listener.namespace(workstream.name):
+            return await workstream_crew.copy().kickoff_async(inputs={
+                **inputs,
+                "workstream": workstream.name,
+                "workstream_scope": workstream.scope or f"Everything {workstream.name} in this project.",
+                "other_workstreams": json.dumps([name for name in names if name != workstream.name]),
+            })
+
+    # A crashed crew run (LLM error, timeout, tool exception) is returned rather than raised
+    outputs = await asyncio.gather(*map(plan_workstream, workstreams), return_exceptions=True)
+
+    parts = []
+    for workstream, output in zip(workstreams, outputs):
+        if isinstance(output, BaseException):
+            logger.warning("Dropping workstream %s: %s", workstream.name, output, exc_info=output)
+            continue
+        task_output = output.tasks_output[-1]
+        try:
+            plan = parse_compact_plan(task_output.pydantic or task_output.raw)
+        except PlanParseError as e:
+            logger.warning("Dropping workstream %s: %s", workstream.name, e)
+            continue
+        # Task IDs are only unique within a workstream
+        for task in plan.tasks:
+            task.id = f"{workstream.name}:{task.id}"
+            task.depends_on = [f"{workstream.name}:{dependency}" for dependency in task.depends_on]
+        parts.append(plan)
+    if not parts:
+        raise PlanParseError(f"None of the {len(workstreams)} workstreams produced a plan")
+    return merge_compact_plans(parts)
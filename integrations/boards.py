@@ -0,0 +1,33 @@
+import contextlib
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .local_board import local_board
+from .trello import TrelloIntegration
+
+_board_override = ContextVar("board_override", default=None)
+
+
+def get_board_integration():
+    """
+    Returns the board backend selected by BOARD_BACKEND: Trello, or the in-memory local board.
+
+    Inside `use_board_integration` the given backend is returned instead.
+    """
+    override = _board_override.get()
+    if override is not None:
+        return override
+    if settings.BOARD_BACKEND == "local":
+        return local_board
+    return TrelloIntegration()
+
+
+@contextlib.contextmanager
+def use_board_integration(integration):
+    """Routes board operations in this context (and tasks and threads started from it) to `integration`."""
+    token = _board_override.set(integration)
+    try:
+        yield integration
+    finally:
+        _board_override.reset(token)
@@ -0,0 +1,154 @@
+"""
+Record/replay of Trello HTTP traffic.
+
+A cassette hooks `requests.Session.send`, underneath py-trello, so the real
+TrelloIntegration code path runs unchanged. In record mode every Trello request
+is sent and its response appended to a JSON lines file with the time it took.
+In replay mode responses are served from the file in recorded order, optionally
+waiting the recorded time scaled by `speed` (1 = original timings, 0 = none).
+
+API keys and tokens are stripped from recorded URLs and are not part of the match.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from django.conf import settings
+from requests.structures import CaseInsensitiveDict
+
+TRELLO_HOSTS = ("trello.com", "api.trello.com")
+SECRET_PARAMS = {"key", "token"}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode for a request the cassette has no (more) recordings of."""
+
+
+def _is_trello(url: str) -> bool:
+    return urlsplit(url).hostname in TRELLO_HOSTS
+
+
+def _public_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query) if name not in SECRET_PARAMS)
+    return f"{parts.path}?{urlencode(query)}" if query else parts.path
+
+
+def _form_body(body) -> str:
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return urlencode(sorted(parse_qsl(body, keep_blank_values=True)))
+
+
+def _match_key(method: str, url: str, body: str) -> tuple[str, str, str]:
+    return method.upper(), url, body
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._recordings: dict[tuple, deque] = defaultdict(deque)
+        self._original_send = None
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    request = interaction["request"]
+                    key = _match_key(request["method"], request["url"], request["body"])
+                    self._recordings[key].append(interaction["response"])
+
+    def _record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float):
+        interaction = {
+            "request": {
+                "method": request.method,
+                "url": _public_url(request.url),
+                "body": _form_body(request.body),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "content_type": response.headers.get("Content-Type", ""),
+                "body": response.text,
+                "elapsed": round(elapsed, 4),
+            },
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction) + "\n")
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = _match_key(request.method, _public_url(request.url), _form_body(request.body))
+        with self._lock:
+            recordings = self._recordings.get(key)
+            recorded = recordings.popleft() if recordings else None
+        if recorded is None:
+            raise CassetteMiss(f"No recorded response for {key[0]} {key[1]} in {self.path}", request=request)
+
+        if self.speed:
+            time.sleep(recorded["elapsed"] * self.speed)
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict({"Content-Type": recorded["content_type"]})
+        response._content = recorded["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def install(self):
+        """Starts intercepting Trello requests made through `requests` in this process."""
+        if self._original_send is not None:
+            return self
+        original_send = self._original_send = requests.Session.send
+        cassette = self
+
+        def send(session, request, **kwargs):
+            if not _is_trello(request.url):
+                return original_send(session, request, **kwargs)
+            if cassette.mode == "replay":
+                return cassette._replay(request)
+            started_at = time.perf_counter()
+            response = original_send(session, request, **kwargs)
+            cassette._record(request, response, time.perf_counter() - started_at)
+            return response
+
+        requests.Session.send = send
+        return self
+
+    def uninstall(self):
+        if self._original_send is not None:
+            requests.Session.send = self._original_send
+            self._original_send = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+        return False
+
+
+def install_from_settings() -> Cassette | None:
+    """Installs the cassette configured by TRELLO_CASSETTE_MODE, if any."""
+    mode = getattr(settings, "TRELLO_CASSETTE_MODE", "off")
+    if mode == "off":
+        return None
+    return Cassette(settings.TRELLO_CASSETTE, mode=mode, speed=settings.TRELLO_CASSETTE_SPEED).install()
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+from datetime import date
+from typing import Optional
 from pydantic import BaseModel
 
+TRELLO_LABEL_COLORS = {"yellow", "purple", "blue", "red", "green", "orange", "black", "sky", "pink", "lime"}
+
 
 class TeamMember(BaseModel):
     name: str
@@ -20,7 +24,7 @@ class Card(BaseModel):
     name: str
     description: str
     due_date: str
-    assignee: TeamMember
+    assignee: Optional[TeamMember] = None
 
 
 class List(BaseModel):
@@ -44,7 +48,7 @@ class Integration(ABC):
         pass
 
     @abstractmethod
-    def create_list(self, project_id: str, list_name: str):
+    def create_list(self, board_id: str, list_name: str, position: int):
         pass
 
     @abstractmethod
@@ -52,9 +56,10 @@ class Integration(ABC):
         self,
         list_id: str,
         card_name: str,
-        card_description: str,
-        card_due_date: str,
-        card_assignee: TeamMember,
+        description: str,
+        team_member_ids: list[str],
+        start_date: date,
+        end_date: date,
     ):
         pass
 
@@ -0,0 +1,301 @@
+"""
+In-memory board backend for dry runs and load tests.
+
+`LocalBoardIntegration` stores boards, lists, cards, checklists and labels in
+process memory and exposes the same methods, arguments and Trello-shaped
+results as `TrelloIntegration`, so the crews' tools and the project API run
+against it unchanged. IDs are sequential, which keeps runs reproducible.
+"""
+import itertools
+import threading
+from collections import Counter
+from datetime import date
+
+from .index import TRELLO_LABEL_COLORS, Card, Integration, List, Project, TeamMember
+
+
+class BoardObjectNotFound(LookupError):
+    pass
+
+
+def _member_field(member, field: str):
+    return member[field] if isinstance(member, dict) else getattr(member, field)
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+class LocalBoardIntegration(Integration):
+    def __init__(self):
+        super().__init__(api_key=None)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drops all boards and operation counts."""
+        with self._lock:
+            self._ids = itertools.count(1)
+            self.boards: dict[str, dict] = {}
+            self.lists: dict[str, dict] = {}
+            self.cards: dict[str, dict] = {}
+            self.checklists: dict[str, dict] = {}
+            self.labels: dict[str, dict] = {}
+            self.members: dict[str, list[dict]] = {}
+            self.operations = Counter()
+
+    def _new_id(self) -> str:
+        return f"{next(self._ids):024x}"
+
+    def _get(self, objects: dict, object_id: str, kind: str) -> dict:
+        obj = objects.get(object_id)
+        if obj is None:
+            raise BoardObjectNotFound(f"{kind} {object_id} not found")
+        return obj
+
+    # ============================ Boards ============================
+
+    def create_board(self, board_name: str, description, team_members: list[TeamMember]):
+        with self._lock:
+            self.operations["create_board"] += 1
+            board = {"id": self._new_id(), "name": board_name, "desc": description, "closed": False}
+            self.boards[board["id"]] = board
+            self.members[board["id"]] = []
+            return dict(board)
+
+    def invite_team_members(self, board_id: str, team_members: list[TeamMember]):
+        member_mapping = {}
+        with self._lock:
+            self.operations["invite_team_members"] += 1
+            members = self.members.setdefault(self._get(self.boards, board_id, "Board")["id"], [])
+            for member in team_members:
+                email = _member_field(member, "email")
+                existing = next((m for m in members if m["email"] == email), None)
+                if existing is None:
+                    existing = {"id": self._new_id(), "fullName": _member_field(member, "name"), "email": email}
+                    members.append(existing)
+                member_mapping[email] = existing["id"]
+        return member_mapping
+
+    def get_team_members(self, board_id: str):
+        with self._lock:
+            self.operations["get_team_members"] += 1
+            return [dict(member) for member in self.members.get(board_id, [])]
+
+    def update_board(self, board_id: str, board_name: str, description: str):
+        with self._lock:
+            self.operations["update_board"] += 1
+            board = self._get(self.boards, board_id, "Board")
+            board.update(name=board_name, desc=description)
+            return dict(board)
+
+    def delete_board(self, board_id: str):
+        with self._lock:
+            self.operations["delete_board"] += 1
+            board = self._get(self.boards, board_id, "Board")
+            list_ids = {list_id for list_id, list_obj in self.lists.items() if list_obj["idBoard"] == board_id}
+            card_ids = {card_id for card_id, card in self.cards.items() if card["idList"] in list_ids}
+            for card_id in card_ids:
+                self._delete_card(card_id)
+            for list_id in list_ids:
+                del self.lists[list_id]
+            self.members.pop(board_id, None)
+            del self.boards[board_id]
+            return dict(board)
+
+    # ============================ Lists ============================
+
+    def create_list(self, board_id: str, list_name: str, position: int):
+        with self._lock:
+            self.operations["create_list"] += 1
+            self._get(self.boards, board_id, "Board")
+            list_obj = {"id": self._new_id(), "name": list_name, "idBoard": board_id, "pos": position, "closed": False}
+            self.lists[list_obj["id"]] = list_obj
+            return dict(list_obj)
+
+    def get_lists(self, board_id: str):
+        with self._lock:
+            self.operations["get_lists"] += 1
+            self._get(self.boards, board_id, "Board")
+            lists = [list_obj for list_obj in self.lists.values() if list_obj["idBoard"] == board_id and not list_obj["closed"]]
+            return [dict(list_obj) for list_obj in sorted(lists, key=lambda list_obj: float(list_obj["pos"]))]
+
+    def update_list(self, list_id: str, list_name: str):
+        with self._lock:
+            self.operations["update_list"] += 1
+            list_obj = self._get(self.lists, list_id, "List")
+            list_obj["name"] = list_name
+            return dict(list_obj)
+
+    def delete_list(self, list_id: str):
+        # Trello archives lists rather than deleting them
+        with self._lock:
+            self.operations["delete_list"] += 1
+            self._get(self.lists, list_id, "List")["closed"] = True
+
+    # ============================ Cards ============================
+
+    def create_card(self, list_id: str, card_name: str, description: str, team_member_ids: list[str], start_date: date, end_date: date):
+        with self._lock:
+            self.operations["create_card"] += 1
+            self._get(self.lists, list_id, "List")
+            card = {
+                "id": self._new_id(),
+                "name": card_name,
+                "desc": description,
+                "idList": list_id,
+                "idMembers": list(team_member_ids or []),
+                "start": _isoformat(start_date),
+                "due": _isoformat(end_date),
+                "idLabels": [],
+                "idChecklists": [],
+            }
+            self.cards[card["id"]] = card
+            return dict(card)
+
+    def update_card(self, card_id: str, card_name: str, description: str, team_member_ids: list[str], start_date: date, end_date: date):
+        with self._lock:
+            self.operations["update_card"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            card.update(
+                name=card_name,
+                desc=description,
+                idMembers=list(team_member_ids or []),
+                start=_isoformat(start_date),
+                due=_isoformat(end_date),
+            )
+            return dict(card)
+
+    def update_card_dates(self, card_id: str, start_date: date, end_date: date):
+        with self._lock:
+            self.operations["update_card_dates"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            card.update(start=_isoformat(start_date), due=_isoformat(end_date))
+            return dict(card)
+
+    def _delete_card(self, card_id: str):
+        card = self.cards.pop(card_id)
+        for checklist_id in card["idChecklists"]:
+            self.checklists.pop(checklist_id, None)
+
+    def delete_card(self, card_id: str):
+        with self._lock:
+            self.operations["delete_card"] += 1
+            self._get(self.cards, card_id, "Card")
+            self._delete_card(card_id)
+
+    def move_card_to_list(self, card_id: str, list_id: str):
+        with self._lock:
+            self.operations["move_card_to_list"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            self._get(self.lists, list_id, "List")
+            card["idList"] = list_id
+            return dict(card)
+
+    # ============================ Labels ============================
+
+    def create_label(self, card_id: str, label_name: str, color: str):
+        with self._lock:
+            self.operations["create_label"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            if color not in TRELLO_LABEL_COLORS:
+                raise ValueError(f"Invalid label color: {color}")
+            label = {"id": self._new_id(), "name": label_name, "color": color}
+            self.labels[label["id"]] = label
+            card["idLabels"].append(label["id"])
+            return dict(label)
+
+    def update_label(self, label_id: str, label_name: str, color: str):
+        with self._lock:
+            self.operations["update_label"] += 1
+            label = self._get(self.labels, label_id, "Label")
+            label.update(name=label_name, color=color)
+            return dict(label)
+
+    def delete_label(self, label_id: str):
+        with self._lock:
+            self.operations["delete_label"] += 1
+            self._get(self.labels, label_id, "Label")
+            del self.labels[label_id]
+            for card in self.cards.values():
+                if label_id in card["idLabels"]:
+                    card["idLabels"].remove(label_id)
+
+    def add_label_to_card(self, card_id: str, label_id: str):
+        with self._lock:
+            self.operations["add_label_to_card"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            self._get(self.labels, label_id, "Label")
+            if label_id not in card["idLabels"]:
+                card["idLabels"].append(label_id)
+
+    def remove_label_from_card(self, card_id: str, label_id: str):
+        with self._lock:
+            self.operations["remove_label_from_card"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            if label_id in card["idLabels"]:
+                card["idLabels"].remove(label_id)
+
+    # ============================ Checklists ============================
+
+    def create_checklist(self, card_id: str, checklist_name: str):
+        with self._lock:
+            self.operations["create_checklist"] += 1
+            card = self._get(self.cards, card_id, "Card")
+            checklist = {"id": self._new_id(), "name": checklist_name, "idCard": card_id, "checkItems": []}
+            self.checklists[checklist["id"]] = checklist
+            card["idChecklists"].append(checklist["id"])
+            return dict(checklist)
+
+    def update_checklist(self, checklist_id: str, checklist_name: str):
+        with self._lock:
+            self.operations["update_checklist"] += 1
+            checklist = self._get(self.checklists, checklist_id, "Checklist")
+            checklist["name"] = checklist_name
+            return dict(checklist)
+
+    def delete_checklist(self, checklist_id: str):
+        with self._lock:
+            self.operations["delete_checklist"] += 1
+            checklist = self._get(self.checklists, checklist_id, "Checklist")
+            del self.checklists[checklist_id]
+            card = self.cards.get(checklist["idCard"])
+            if card is not None:
+                card["idChecklists"].remove(checklist_id)
+
+    def add_item_to_checklist(self, checklist_id: str, item_name: str):
+        with self._lock:
+            self.operations["add_item_to_checklist"] += 1
+            checklist = self._get(self.checklists, checklist_id, "Checklist")
+            item = {"id": self._new_id(), "name": item_name, "state": "incomplete", "idChecklist": checklist_id}
+            checklist["checkItems"].append(item)
+            return dict(item)
+
+    # ============================ Integration ============================
+
+    def create_project(self, project_name: str, project_description: str, project_timeline: str, team_members: list[TeamMember]):
+        board = self.create_board(project_name, project_description, team_members)
+        self.invite_team_members(board["id"], team_members)
+        return board["id"]
+
+    def get_project(self, project_id: str) -> Project:
+        with self._lock:
+            board = self._get(self.boards, project_id, "Board")
+            return Project(name=board["name"], description=board["desc"] or "", timeline="", team_members=[])
+
+    def get_list(self, list_id: str) -> List:
+        with self._lock:
+            list_obj = self._get(self.lists, list_id, "List")
+            cards = [self._card_model(card) for card in self.cards.values() if card["idList"] == list_id]
+            return List(name=list_obj["name"], cards=cards)
+
+    def get_card(self, card_id: str) -> Card:
+        with self._lock:
+            return self._card_model(self._get(self.cards, card_id, "Card"))
+
+    @staticmethod
+    def _card_model(card: dict) -> Card:
+        return Card(name=card["name"], description=card["desc"] or "", due_date=card["due"] or "", assignee=None)
+
+
+local_board = LocalBoardIntegration()
@@ -0,0 +1,35 @@
+"""
+Client-side rate limiting of board API requests.
+
+Trello allows 100 requests per 10 seconds per token and answers 429 beyond
+that. `RateLimiter` is a token bucket shared by every thread of the process:
+a burst of up to `burst` requests goes out at once, after which requests are
+spaced to `rate` per second. A request that has to wait reserves its slot
+before sleeping, so concurrent callers are served in arrival order without
+polling.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket of `burst` tokens refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token, waiting for one if the bucket is empty; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from integrations.cassette import Cassette, CassetteMiss
+
+
+def response(request, status_code=200, body=b'{"id": "card1"}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response.headers["Content-Type"] = "application/json"
+    response._content = body
+    response.request = request
+    return response
+
+
+class CassetteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "trello", "cassette.jsonl")
+        # Stands in for the network underneath the cassette
+        patcher = mock.patch("requests.Session.send", autospec=True, side_effect=lambda session, request, **kwargs: response(request))
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_card(self, token="secret"):
+        return requests.post(
+            "https://api.trello.com/1/cards", params={"token": token, "key": "apikey"}, data={"name": "API", "idList": "list1"},
+        )
+
+    def test_recorded_traffic_replays_without_the_network(self):
+        with Cassette(self.path, mode="record"):
+            self.create_card()
+        self.assertEqual(self.send.call_count, 1)
+        with open(self.path, encoding="utf-8") as f:
+            [interaction] = [json.loads(line) for line in f]
+        # Keys and tokens are not recorded
+        self.assertEqual(interaction["request"], {"method": "POST", "url": "/1/cards", "body": "idList=list1&name=API"})
+
+        with Cassette(self.path, mode="replay", speed=0):
+            replayed = self.create_card(token="another")
+            self.assertEqual((replayed.status_code, replayed.json()), (200, {"id": "card1"}))
+            # Each recording is served once
+            with self.assertRaises(CassetteMiss):
+                self.create_card()
+        self.assertEqual(self.send.call_count, 1)
+
+    def test_other_hosts_pass_through(self):
+        empty = os.path.join(self.directory, "empty.jsonl")
+        open(empty, "w").close()
+        with Cassette(empty, mode="replay"):
+            self.assertEqual(requests.get("https://example.com/health").status_code, 200)
+        self.assertEqual(self.send.call_count, 1)
+
+    def test_uninstall_restores_send(self):
+        send = requests.Session.send
+        with Cassette(self.path, mode="record"):
+            self.assertIsNot(requests.Session.send, send)
+        self.assertIs(requests.Session.send, send)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Cassette(self.path, mode="rewind")
@@ -0,0 +1,68 @@
+from datetime import date
+
+from django.test import SimpleTestCase, override_settings
+
+from integrations.boards import get_board_integration, use_board_integration
+from integrations.local_board import BoardObjectNotFound, LocalBoardIntegration, local_board
+from integrations.trello import TrelloIntegration
+
+TEAM = [{"name": "Ann", "email": "ann@example.com"}, {"name": "Bo", "email": "bo@example.com"}]
+
+
+class LocalBoardTests(SimpleTestCase):
+    def setUp(self):
+        self.board = LocalBoardIntegration()
+        self.board_id = self.board.create_project("Shop", "Web shop", "", TEAM)
+
+    def test_members_are_invited_once(self):
+        first = self.board.invite_team_members(self.board_id, TEAM)
+        self.assertEqual(self.board.invite_team_members(self.board_id, TEAM[:1]), {"ann@example.com": first["ann@example.com"]})
+        self.assertEqual([member["fullName"] for member in self.board.get_team_members(self.board_id)], ["Ann", "Bo"])
+
+    def test_cards_have_trello_shaped_fields(self):
+        backlog = self.board.create_list(self.board_id, "Backlog", 2)
+        todo = self.board.create_list(self.board_id, "To Do", 1)
+        card = self.board.create_card(backlog["id"], "API", "Endpoints", ["m1"], date(2025, 3, 3), date(2025, 3, 5))
+        self.assertEqual((card["idMembers"], card["start"], card["due"]), (["m1"], "2025-03-03", "2025-03-05"))
+        self.board.move_card_to_list(card["id"], todo["id"])
+        self.board.update_card_dates(card["id"], date(2025, 3, 4), None)
+        self.assertEqual([list_obj["name"] for list_obj in self.board.get_lists(self.board_id)], ["To Do", "Backlog"])
+        [model] = self.board.get_list(todo["id"]).cards
+        self.assertEqual((model.name, model.due_date), ("API", ""))
+        self.assertEqual(self.board.cards[card["id"]]["start"], "2025-03-04")
+
+    def test_labels_and_checklists_follow_their_card(self):
+        list_obj = self.board.create_list(self.board_id, "To Do", 1)
+        card = self.board.create_card(list_obj["id"], "API", "", [], None, None)
+        label = self.board.create_label(card["id"], "High Priority", "orange")
+        checklist = self.board.create_checklist(card["id"], "Acceptance criteria")
+        self.board.add_item_to_checklist(checklist["id"], "Endpoints respond")
+        with self.assertRaises(ValueError):
+            self.board.create_label(card["id"], "Backend", "teal")
+
+        self.board.delete_label(label["id"])
+        self.assertEqual(self.board.cards[card["id"]]["idLabels"], [])
+        self.board.delete_board(self.board_id)
+        self.assertEqual((self.board.cards, self.board.checklists, self.board.lists), ({}, {}, {}))
+
+    def test_archived_lists_and_missing_objects(self):
+        list_obj = self.board.create_list(self.board_id, "Done", 3)
+        self.board.delete_list(list_obj["id"])
+        self.assertEqual(self.board.get_lists(self.board_id), [])
+        with self.assertRaises(BoardObjectNotFound):
+            self.board.get_card("missing")
+        self.assertEqual(self.board.operations["create_list"], 1)
+
+
+class BoardBackendTests(SimpleTestCase):
+    @override_settings(BOARD_BACKEND="local")
+    def test_the_backend_follows_the_setting(self):
+        self.assertIs(get_board_integration(), local_board)
+        with override_settings(BOARD_BACKEND="trello"):
+            self.assertIsInstance(get_board_integration(), TrelloIntegration)
+
+    def test_an_override_applies_within_its_context(self):
+        board = LocalBoardIntegration()
+        with use_board_integration(board):
+            self.assertIs(get_board_integration(), board)
+        self.assertIsNot(get_board_integration(), board)
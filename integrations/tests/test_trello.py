@@ -0,0 +1,54 @@
+from datetime import date
+from unittest import mock
+from urllib.parse import parse_qs
+
+import requests
+from django.test import SimpleTestCase
+
+from integrations.trello import TrelloIntegration
+
+
+def card_response(request, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"id": "card1"}'
+    response.request = request
+    return response
+
+
+@mock.patch("integrations.trello.rate_limiter", None)
+class TrelloCardTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("requests.Session.send", autospec=True, side_effect=lambda session, request, **kwargs: card_response(request))
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sent(self):
+        request = self.send.call_args.args[1]
+        return request.method, request.url.split("?")[0], parse_qs(request.body)
+
+    def test_create_card_sends_members_and_dates(self):
+        card = TrelloIntegration().create_card(
+            "list1", "Build API", "Endpoints", ["member1", None, "member2"], date(2025, 3, 3), date(2025, 3, 5),
+        )
+        self.assertEqual(card, {"id": "card1"})
+        method, url, data = self.sent()
+        self.assertEqual((method, url), ("POST", "https://trello.com/1/cards"))
+        self.assertEqual(data["idMembers"], ["member1,member2"])
+        self.assertEqual((data["start"], data["due"]), (["2025-03-03"], ["2025-03-05"]))
+        self.assertEqual(data["idList"], ["list1"])
+
+    def test_update_card_sends_members_and_dates(self):
+        TrelloIntegration().update_card("card1", "Build API", "Endpoints", ["member1"], None, date(2025, 3, 5))
+        method, url, data = self.sent()
+        self.assertEqual((method, url), ("PUT", "https://trello.com/1/cards/card1"))
+        self.assertEqual(data["idMembers"], ["member1"])
+        self.assertEqual(data["due"], ["2025-03-05"])
+        # Unset fields are left out
+        self.assertNotIn("start", data)
+
+    def test_update_card_dates(self):
+        TrelloIntegration().update_card_dates("card1", date(2025, 3, 3), date(2025, 3, 5))
+        method, url, data = self.sent()
+        self.assertEqual((method, url), ("PUT", "https://trello.com/1/cards/card1"))
+        self.assertEqual(data, {"start": ["2025-03-03"], "due": ["2025-03-05"]})
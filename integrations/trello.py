@@ -1,11 +1,22 @@
+import functools
+import time
 from dotenv import load_dotenv
 from os import getenv
 from trello import TrelloApi
+import requests
+from requests import HTTPError
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date
 
+from django.conf import settings
+
 from project.models import ProjectMember
+from pm_master.metrics import trello_request_duration_seconds, trello_requests_total
+from pm_master.tracing import tracer
+
+from .cassette import install_from_settings
+from .rate_limit import RateLimiter
 
 load_dotenv()
 
@@ -21,7 +32,68 @@ class TeamMember(BaseModel):
 trello = TrelloApi(getenv("TRELLO_API_KEY"))
 trello.set_token(getenv("TRELLO_API_TOKEN"))
 
+# Record or replay Trello traffic when TRELLO_CASSETTE_MODE is set
+cassette = install_from_settings()
+
+# Shared by every thread, so concurrent card creation and date pushes stay within Trello's limit together.
+# Replayed traffic never reaches Trello.
+rate_limiter = (
+    RateLimiter(rate=settings.TRELLO_RATE_LIMIT / 10, burst=settings.TRELLO_RATE_LIMIT)
+    if settings.TRELLO_RATE_LIMIT > 0 and settings.TRELLO_CASSETTE_MODE != "replay" else None
+)
+
+
+TRELLO_CARDS_URL = "https://trello.com/1/cards"
+
+
+def _member_ids(team_member_ids) -> str:
+    # Members that were never invited to the board have no Trello ID
+    return ",".join(member_id for member_id in team_member_ids or [] if member_id)
+
+
+def _card_request(method: str, url: str, data: dict):
+    """
+    Sends a card request to Trello directly, since py-trello's cards.new and
+    cards.update cannot set the start date. Fields set to None are left out.
+    """
+    response = requests.request(method, url, params={"key": trello._apikey, "token": trello._token}, data=data)
+    return trello.cards.raise_or_json(response)
+
+
+def trello_operation(method):
+    """
+    Runs a Trello API operation inside a child span of the current trace, after
+    waiting for the rate limiter, and records its latency and status code.
+    """
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        status_code = "200"
+        with tracer.start_as_current_span(f"trello.{operation}") as span:
+            span.set_attribute("trello.operation", operation)
+            if rate_limiter is not None:
+                span.set_attribute("trello.rate_limit_wait_seconds", rate_limiter.acquire())
+            # The latency metric leaves out the wait for the rate limiter
+            started_at = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            except HTTPError as e:
+                status_code = str(e.response.status_code) if e.response is not None else "error"
+                raise
+            except Exception:
+                status_code = "error"
+                raise
+            finally:
+                span.set_attribute("http.status_code", status_code)
+                trello_request_duration_seconds.observe(time.perf_counter() - started_at, operation=operation)
+                trello_requests_total.inc(operation=operation, status_code=status_code)
+
+    return wrapper
+
+
 class TrelloIntegration:
+    @trello_operation
     def create_board(self, board_name: str, description, team_members: list[TeamMember]):
         board = trello.boards.new(name=board_name, desc=description,defaultLists=None)
         # Invite all team members to the board
@@ -30,6 +102,7 @@ class TrelloIntegration:
         # update the database model with the member id
         return board
 
+    @trello_operation
     def invite_team_members(self, board_id:str, team_members: list[TeamMember]):
         """
         Invites team members to a Trello board and returns their Trello member IDs.
@@ -59,6 +132,7 @@ class TrelloIntegration:
                 member_mapping[member["email"]] = None
 
         return member_mapping
+    @trello_operation
     def get_team_members(self, board_id:str):
         members = trello.boards.get_members(board_id)
 
@@ -66,58 +140,96 @@ class TrelloIntegration:
 
 
         return members
+    @trello_operation
     def update_board(self, board_id:str, board_name:str, description:str):
         board = trello.boards.update(board_id, name=board_name, desc=description)
         return board
+    @trello_operation
     def delete_board(self, board_id:str):
        board = trello.boards.delete(board_id)
        return board
 
+    @trello_operation
     def create_list(self, board_id: str, list_name: str, position:int):
         list = trello.lists.new(name=list_name, idBoard=board_id, pos=position)
         print("list created: ", list)
         return list
+    @trello_operation
+    def get_lists(self, board_id:str):
+        lists = trello.boards.get_list(board_id, filter="open")
+        return lists
+    @trello_operation
     def update_list(self, list_id:str, list_name:str):
         list = trello.lists.update(list_id, name=list_name)
         return list
+    @trello_operation
     def delete_list(self, list_id:str):
         trello.lists.delete(list_id)
 
+    @trello_operation
     def create_card(self, list_id:str, card_name:str, description:str, team_member_ids:list[str], start_date:date, end_date:date):
-        card = trello.cards.new(name=card_name, desc=description, idList=list_id, due=end_date)
+        card = _card_request("POST", TRELLO_CARDS_URL, {
+            "name": card_name,
+            "desc": description,
+            "idList": list_id,
+            "idMembers": _member_ids(team_member_ids),
+            "start": start_date,
+            "due": end_date,
+        })
         return card
+    @trello_operation
     def update_card(self, card_id:str, card_name:str, description:str, team_member_ids:list[str], start_date:date, end_date:date):
-        card = trello.cards.update(card_id, name=card_name, desc=description, due=end_date)
+        card = _card_request("PUT", f"{TRELLO_CARDS_URL}/{card_id}", {
+            "name": card_name,
+            "desc": description,
+            "idMembers": _member_ids(team_member_ids),
+            "start": start_date,
+            "due": end_date,
+        })
         return card
+    @trello_operation
+    def update_card_dates(self, card_id:str, start_date:date, end_date:date):
+        return _card_request("PUT", f"{TRELLO_CARDS_URL}/{card_id}", {"start": start_date, "due": end_date})
+    @trello_operation
     def delete_card(self, card_id:str):
         trello.cards.delete(card_id)
+    @trello_operation
     def create_label(self, card_id:str, label_name:str, color:str):
         label = trello.cards.new_label(card_id, name=label_name, color=color)
         return label
 
+    @trello_operation
     def update_label(self, label_id:str, label_name:str, color:str):
         label = trello.cards.update_label(label_id, name=label_name, color=color)
         return label
+    @trello_operation
     def delete_label(self, label_id:str):
         trello.cards.delete_label(label_id)
+    @trello_operation
     def add_label_to_card(self, card_id:str, label_id:str):
         trello.cards.add_label(card_id, label_id)
+    @trello_operation
     def remove_label_from_card(self, card_id:str, label_id:str):
         trello.cards.remove_label(card_id, label_id)
 
+    @trello_operation
     def move_card_to_list(self, card_id:str, list_id:str):
       return  trello.cards.move_to_list(card_id, list_id)
 
+    @trello_operation
     def create_checklist(self, card_id:str, checklist_name:str):
         checklist = trello.cards.new_checklist(card_id, name=checklist_name)
         return checklist
+    @trello_operation
     def update_checklist(self, checklist_id:str, checklist_name:str):
         checklist = trello.cards.update_checklist(checklist_id, name=checklist_name)
         return checklist
+    @trello_operation
     def delete_checklist(self, checklist_id:str):
         trello.cards.delete_checklist(checklist_id)
+    @trello_operation
     def add_item_to_checklist(self, checklist_id:str, item_name:str):
         """Add an item to an existing checklist"""
-        item = trello.checklists.new_checkitem(checklist_id, name=item_name)
+        item = trello.checklists.new_checkItem(checklist_id, name=item_name)
         return item
 
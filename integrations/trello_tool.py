@@ -1,13 +1,23 @@
 from crewai.tools import BaseTool
 from typing import Type, Optional
 from pydantic import BaseModel, Field
-from .trello import TrelloIntegration, TeamMember
-from datetime import date, datetime
+from .boards import get_board_integration
+from .trello import TeamMember
+from datetime import date
 import json
 
+from crews.ledger import card_ledger
+from crews.progress import progress_listener
+from planning.calendar import parse_dates, to_dates
 
-# Initialize Trello Integration
-trello_integration = TrelloIntegration()
+
+def parse_card_dates(start_date: Optional[str], end_date: Optional[str]) -> list[Optional[date]]:
+    """Parses both card dates in one pass; a date that is given but not YYYY-MM-DD is an error."""
+    parsed = to_dates(parse_dates([start_date, end_date]))
+    for value, parsed_date in zip((start_date, end_date), parsed):
+        if value and parsed_date is None:
+            raise ValueError(f"{value!r} is not a YYYY-MM-DD date")
+    return parsed
 
 
 # ================================ INPUT SCHEMAS ================================
@@ -160,7 +170,7 @@ class RemoveLabelFromCardInput(BaseModel):
 #             team_members_data = json.loads(team_members_json)
 #             team_members = [TeamMember(**member) for member in team_members_data]
 
-#             board = trello_integration.create_board(
+#             board = get_board_integration().create_board(
 #                 board_name=board_name,
 #                 description=description,
 #                 team_members=team_members
@@ -178,7 +188,7 @@ class TrelloCreateListTool(BaseTool):
 
     def _run(self, board_id: str, list_name: str, position: int = 1) -> str:
         try:
-            list_obj = trello_integration.create_list(board_id=board_id, list_name=list_name, position=position)
+            list_obj = get_board_integration().create_list(board_id=board_id, list_name=list_name, position=position)
             return f"✅ Successfully created list '{list_name}' (ID: {list_obj['id']}) on board {board_id}"
         except Exception as e:
             return f"❌ Error creating list: {str(e)}"
@@ -191,7 +201,7 @@ class TrelloUpdateListTool(BaseTool):
 
     def _run(self, list_id: str, list_name: str) -> str:
         try:
-            list_obj = trello_integration.update_list(list_id=list_id, list_name=list_name)
+            list_obj = get_board_integration().update_list(list_id=list_id, list_name=list_name)
             return f"✅ Successfully updated list {list_id} to '{list_name}'"
         except Exception as e:
             return f"❌ Error updating list: {str(e)}"
@@ -204,7 +214,7 @@ class TrelloDeleteListTool(BaseTool):
 
     def _run(self, list_id: str) -> str:
         try:
-            trello_integration.delete_list(list_id=list_id)
+            get_board_integration().delete_list(list_id=list_id)
             return f"✅ Successfully deleted list {list_id}"
         except Exception as e:
             return f"❌ Error deleting list: {str(e)}"
@@ -230,10 +240,9 @@ class TrelloCreateCardTool(BaseTool):
             member_ids = json.loads(team_member_ids)
 
             # Parse dates
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+            start_date_obj, end_date_obj = parse_card_dates(start_date, end_date)
 
-            card = trello_integration.create_card(
+            card = get_board_integration().create_card(
                 list_id=list_id,
                 card_name=card_name,
                 description=description,
@@ -241,6 +250,21 @@ class TrelloCreateCardTool(BaseTool):
                 start_date=start_date_obj,
                 end_date=end_date_obj
             )
+            # Recorded before the tool returns, so the run cannot be flushed without it
+            card_ledger.record(card["id"], {
+                "list_id": list_id,
+                "card_name": card_name,
+                "description": description,
+                "team_member_ids": member_ids,
+                "start_date": start_date_obj,
+                "end_date": end_date_obj,
+            })
+            progress_listener.card_created(card["id"], {
+                "list_id": list_id,
+                "card_name": card_name,
+                "start_date": start_date,
+                "end_date": end_date,
+            })
             return f"✅ Successfully created card '{card_name}' (ID: {card['id']}) in list {list_id}"
         except Exception as e:
             return f"❌ Error creating card: {str(e)}"
@@ -262,10 +286,9 @@ class TrelloUpdateCardTool(BaseTool):
     ) -> str:
         try:
             member_ids = json.loads(team_member_ids)
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+            start_date_obj, end_date_obj = parse_card_dates(start_date, end_date)
 
-            card = trello_integration.update_card(
+            card = get_board_integration().update_card(
                 card_id=card_id,
                 card_name=card_name,
                 description=description,
@@ -285,7 +308,7 @@ class TrelloDeleteCardTool(BaseTool):
 
     def _run(self, card_id: str) -> str:
         try:
-            trello_integration.delete_card(card_id=card_id)
+            get_board_integration().delete_card(card_id=card_id)
             return f"✅ Successfully deleted card {card_id}"
         except Exception as e:
             return f"❌ Error deleting card: {str(e)}"
@@ -299,7 +322,7 @@ class TrelloMoveCardTool(BaseTool):
 
     def _run(self, card_id: str, list_id: str) -> str:
         try:
-            card = trello_integration.move_card_to_list(card_id=card_id, list_id=list_id)
+            card = get_board_integration().move_card_to_list(card_id=card_id, list_id=list_id)
             return f"✅ Successfully moved card {card_id} to list {list_id}"
         except Exception as e:
             return f"❌ Error moving card: {str(e)}"
@@ -312,7 +335,7 @@ class TrelloCreateChecklistTool(BaseTool):
 
     def _run(self, card_id: str, checklist_name: str) -> str:
         try:
-            checklist = trello_integration.create_checklist(card_id=card_id, checklist_name=checklist_name)
+            checklist = get_board_integration().create_checklist(card_id=card_id, checklist_name=checklist_name)
             return f"✅ Successfully created checklist '{checklist_name}' (ID: {checklist['id']}) on card {card_id}"
         except Exception as e:
             return f"❌ Error creating checklist: {str(e)}"
@@ -325,7 +348,7 @@ class TrelloUpdateChecklistTool(BaseTool):
 
     def _run(self, checklist_id: str, checklist_name: str) -> str:
         try:
-            checklist = trello_integration.update_checklist(checklist_id=checklist_id, checklist_name=checklist_name)
+            checklist = get_board_integration().update_checklist(checklist_id=checklist_id, checklist_name=checklist_name)
             return f"✅ Successfully updated checklist {checklist_id} to '{checklist_name}'"
         except Exception as e:
             return f"❌ Error updating checklist: {str(e)}"
@@ -338,7 +361,7 @@ class TrelloDeleteChecklistTool(BaseTool):
 
     def _run(self, checklist_id: str) -> str:
         try:
-            trello_integration.delete_checklist(checklist_id=checklist_id)
+            get_board_integration().delete_checklist(checklist_id=checklist_id)
             return f"✅ Successfully deleted checklist {checklist_id}"
         except Exception as e:
             return f"❌ Error deleting checklist: {str(e)}"
@@ -351,7 +374,7 @@ class TrelloAddChecklistItemTool(BaseTool):
 
     def _run(self, checklist_id: str, item_name: str) -> str:
         try:
-            trello_integration.add_item_to_checklist(checklist_id=checklist_id, item_name=item_name)
+            get_board_integration().add_item_to_checklist(checklist_id=checklist_id, item_name=item_name)
             return f"✅ Successfully added item '{item_name}' to checklist {checklist_id}"
         except Exception as e:
             return f"❌ Error adding checklist item: {str(e)}"
@@ -364,7 +387,7 @@ class TrelloCreateLabelTool(BaseTool):
 
     def _run(self, card_id: str, label_name: str, color: str = "blue") -> str:
         try:
-            label = trello_integration.create_label(card_id=card_id, label_name=label_name, color=color)
+            label = get_board_integration().create_label(card_id=card_id, label_name=label_name, color=color)
             return f"✅ Successfully created {color} label '{label_name}' (ID: {label['id']}) on card {card_id}"
         except Exception as e:
             return f"❌ Error creating label: {str(e)}"
@@ -377,7 +400,7 @@ class TrelloUpdateLabelTool(BaseTool):
 
     def _run(self, label_id: str, label_name: str, color: str) -> str:
         try:
-            label = trello_integration.update_label(label_id=label_id, label_name=label_name, color=color)
+            label = get_board_integration().update_label(label_id=label_id, label_name=label_name, color=color)
             return f"✅ Successfully updated label {label_id} to '{label_name}' ({color})"
         except Exception as e:
             return f"❌ Error updating label: {str(e)}"
@@ -390,7 +413,7 @@ class TrelloDeleteLabelTool(BaseTool):
 
     def _run(self, label_id: str) -> str:
         try:
-            trello_integration.delete_label(label_id=label_id)
+            get_board_integration().delete_label(label_id=label_id)
             return f"✅ Successfully deleted label {label_id}"
         except Exception as e:
             return f"❌ Error deleting label: {str(e)}"
@@ -403,7 +426,7 @@ class TrelloAddLabelToCardTool(BaseTool):
 
     def _run(self, card_id: str, label_id: str) -> str:
         try:
-            trello_integration.add_label_to_card(card_id=card_id, label_id=label_id)
+            get_board_integration().add_label_to_card(card_id=card_id, label_id=label_id)
             return f"✅ Successfully added label {label_id} to card {card_id}"
         except Exception as e:
             return f"❌ Error adding label to card: {str(e)}"
@@ -417,7 +440,7 @@ class TrelloRemoveLabelFromCardTool(BaseTool):
 
     def _run(self, card_id: str, label_id: str) -> str:
         try:
-            trello_integration.remove_label_from_card(card_id=card_id, label_id=label_id)
+            get_board_integration().remove_label_from_card(card_id=card_id, label_id=label_id)
             return f"✅ Successfully removed label {label_id} from card {card_id}"
         except Exception as e:
             return f"❌ Error removing label from card: {str(e)}"
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0004_alter_organization_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='holidays',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
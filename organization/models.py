@@ -5,6 +5,12 @@ from django.utils import timezone
 from datetime import timedelta
 from uuid import uuid4
 
+from planning.calendar import WorkingCalendar, calendar_for
+
+
+def working_calendar(holidays=()) -> WorkingCalendar:
+    """The configured working week (SCHEDULE_WEEKMASK) with `holidays` off"""
+    return calendar_for(settings.SCHEDULE_WEEKMASK, holidays)
 
 
 class Organization(models.Model):
@@ -16,10 +22,15 @@ class Organization(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     is_deleted = models.BooleanField(default=False)
+    # Dates (YYYY-MM-DD) that are not working days for the organization's projects
+    holidays = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return self.name
 
+    def working_calendar(self) -> WorkingCalendar:
+        return working_calendar(self.holidays)
+
 class User(AbstractUser):
     is_verified = models.BooleanField(default=False)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True)
@@ -0,0 +1,73 @@
+"""
+Capacity-aware assignment of planned tasks to team members by skill match.
+
+`TaskAssigner` scores a batch of tasks against the team's TF-IDF index
+(`MemberIndex`), which gives the task x member match in one sparse product.
+Tasks are then assigned longest first to the member with the best match minus
+a load penalty, among the members that still have capacity for the task, so work follows skills without piling onto one person. The
+assigner keeps its load between calls, so tasks can also be assigned one at a
+time as they stream in.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from .matching import MemberIndex
+
+# How much a member's used share of capacity weighs against a better skill match
+LOAD_WEIGHT = 0.5
+
+@dataclass
+class PlannedWork:
+    id: str
+    text: str
+    days: int
+
+
+class TaskAssigner:
+    """
+    Assigns work to `members` (dicts with "skills" and "role"), able to take `capacity_days` working days each
+    (one number for everybody, or one per member).
+    """
+
+    def __init__(self, members: Sequence[dict], capacity_days: Union[int, Sequence[int]],
+                 index: Optional[MemberIndex] = None):
+        self.members = list(members)
+        # A prebuilt index must be over the same members, in the same order
+        self.index = index if index is not None else MemberIndex(self.members)
+        # A member whose time off covers the whole window has no capacity and only gets work nobody else has room for
+        self.capacity = np.broadcast_to(np.asarray(capacity_days, dtype=float), len(self.members)).copy()
+        self.load = np.zeros(len(self.members))
+        self.assignments: dict[str, int] = {}
+
+    def match_scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Task x member TF-IDF cosine similarity."""
+        return self.index.scores(texts)
+
+    def assign(self, work: Sequence[PlannedWork]) -> list[Optional[dict]]:
+        """Assigns each piece of work to one member; returns the members in the order of `work`."""
+        if not self.members:
+            return [None] * len(work)
+        pending = [item for item in dict((item.id, item) for item in work).values() if item.id not in self.assignments]
+        scores = self.match_scores([item.text for item in pending])
+        # Longest first: the big tasks pick from the most free capacity
+        for row in sorted(range(len(pending)), key=lambda row: -pending[row].days):
+            item = pending[row]
+            days = max(item.days, 1)
+            utility = scores[row] - LOAD_WEIGHT * self.load / np.maximum(self.capacity, 1)
+            fits = self.capacity - self.load >= days
+            if fits.any():
+                utility = np.where(fits, utility, -np.inf)
+            member = int(np.argmax(utility))
+            self.load[member] += days
+            self.assignments[item.id] = member
+        return [self.members[self.assignments[item.id]] for item in work]
+
+    def utilization(self) -> dict[str, float]:
+        """Share of each member's capacity that is assigned, by name."""
+        return {
+            member.get("name") or member.get("email") or str(index): round(float(load / max(capacity, 1)), 3)
+            for index, (member, load, capacity) in enumerate(zip(self.members, self.load, self.capacity))
+        }
+
@@ -0,0 +1,162 @@
+"""
+Working-day calendars with vectorized date arithmetic.
+
+A `WorkingCalendar` is a NumPy weekmask plus a set of holidays (an
+organization's), compiled once into a `np.busdaycalendar`. Converting a whole
+plan between working-day offsets and dates, counting working days, rolling
+dates off weekends and holidays or shifting every date of a plan is then a
+single `busday_offset` / `busday_count` / `is_busday` call over an array,
+instead of a Python loop over `datetime` objects.
+
+A member's availability is the organization's calendar with the member's
+time off added as holidays (`for_member`), so capacity and dates can be
+computed per member with the same operations. `calendar_for` shares one
+compiled calendar per weekmask and set of holidays.
+"""
+import functools
+import re
+from datetime import date
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# NumPy weekmask of the days that count as working days
+DEFAULT_WEEKMASK = "Mon Tue Wed Thu Fri"
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+DateLike = Union[date, str, np.datetime64]
+
+
+def parse_dates(values: Iterable[Optional[DateLike]]) -> np.ndarray:
+    """Day array of the values; missing or malformed values (anything but a YYYY-MM-DD date) become NaT."""
+    cleaned = []
+    for value in values:
+        if isinstance(value, str):
+            value = value.strip()
+            value = value if ISO_DATE.fullmatch(value) else None
+        cleaned.append("NaT" if value is None else value)
+    try:
+        return np.array(cleaned, dtype="datetime64[D]")
+    except ValueError:
+        # Well-formed but impossible dates, such as 2025-02-30
+        return np.array([_parse_one(value) for value in cleaned], dtype="datetime64[D]")
+
+
+def _parse_one(value) -> np.datetime64:
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def parse_date(value: Optional[DateLike]) -> Optional[date]:
+    """The date of a YYYY-MM-DD value, or None."""
+    return to_dates(parse_dates([value]))[0]
+
+
+def to_dates(days: np.ndarray) -> list[Optional[date]]:
+    """Python dates of a day array; NaT becomes None."""
+    return [None if np.isnat(day) else day.item() for day in np.asarray(days, dtype="datetime64[D]")]
+
+
+class WorkingCalendar:
+    """Working days given by a NumPy `weekmask` ("Mon Tue Wed Thu Fri" or "1111100") and `holidays`."""
+
+    def __init__(self, weekmask: str = DEFAULT_WEEKMASK, holidays: Iterable[DateLike] = ()):
+        self.weekmask = weekmask
+        holidays = parse_dates(holidays)
+        self.holidays = np.unique(holidays[~np.isnat(holidays)])
+        self._calendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    def with_time_off(self, ranges: Iterable[tuple[DateLike, DateLike]]) -> "WorkingCalendar":
+        """This calendar with every day of the (start, end) ranges, both included, off as well."""
+        days = [self.holidays]
+        for start, end in ranges:
+            start, end = parse_dates([start, end])
+            if not np.isnat(start) and not np.isnat(end) and start <= end:
+                days.append(np.arange(start, end + 1))
+        if len(days) == 1:
+            return self
+        return WorkingCalendar(self.weekmask, np.concatenate(days))
+
+    def for_member(self, member: dict) -> "WorkingCalendar":
+        """The working days of a member (a dict whose "time_off" lists {"start_date", "end_date"} ranges)."""
+        return self.with_time_off(
+            (time_off.get("start_date"), time_off.get("end_date"))
+            for time_off in member.get("time_off") or [] if isinstance(time_off, dict)
+        )
+
+    def is_working_day(self, days: Sequence[DateLike]) -> np.ndarray:
+        """Whether each date is a working day (False for NaT)."""
+        days = parse_dates(days)
+        working = np.zeros(len(days), dtype=bool)
+        known = ~np.isnat(days)
+        working[known] = np.is_busday(days[known], busdaycal=self._calendar)
+        return working
+
+    def offset(self, start: DateLike, offsets: Sequence[int]) -> np.ndarray:
+        """The days `offsets` working days after `start` (rolled forward to a working day)."""
+        return np.busday_offset(
+            parse_dates([start])[0], np.asarray(offsets, dtype=np.int64), roll="forward", busdaycal=self._calendar,
+        )
+
+    def dates(self, start: DateLike, offsets: Sequence[int]) -> list[date]:
+        """`offset` as Python dates."""
+        return to_dates(self.offset(start, offsets))
+
+    def offsets(self, start: DateLike, days: Sequence[DateLike]) -> np.ndarray:
+        """Working days from `start` to each date, the inverse of `offset` (negative before the start)."""
+        return np.busday_count(parse_dates([start])[0], parse_dates(days), busdaycal=self._calendar)
+
+    def count(self, start: DateLike, end: DateLike) -> int:
+        """Working days from `start` to `end`, both included."""
+        start, end = parse_dates([start, end])
+        return max(int(np.busday_count(start, end + 1, busdaycal=self._calendar)), 0)
+
+    def roll(self, days: Sequence[DateLike], direction: str = "forward") -> np.ndarray:
+        """Each date moved to the next ("forward") or previous ("backward") working day if it is not one."""
+        return np.busday_offset(parse_dates(days), 0, roll=direction, busdaycal=self._calendar)
+
+    def shift(self, days: Sequence[DateLike], working_days: Union[int, Sequence[int]]) -> np.ndarray:
+        """Each date moved by `working_days` working days (after rolling it forward to a working day); NaT stays."""
+        return np.busday_offset(
+            parse_dates(days), np.asarray(working_days, dtype=np.int64), roll="forward", busdaycal=self._calendar,
+        )
+
+    def rebase(self, days: Sequence[DateLike], start: DateLike, new_start: DateLike,
+               roll: str = "forward") -> np.ndarray:
+        """
+        Each date moved from a timeline starting at `start` to one starting at `new_start`, keeping its
+        offset in working days (a date off a working day is first rolled `roll`); NaT stays.
+        """
+        days = parse_dates(days)
+        rebased = days.copy()
+        known = ~np.isnat(days)
+        rebased[known] = self.offset(new_start, self.offsets(start, self.roll(days[known], roll)))
+        return rebased
+
+    def rebase_spans(self, starts: Sequence[DateLike], ends: Sequence[DateLike], start: DateLike,
+                     new_start: DateLike) -> tuple[np.ndarray, np.ndarray]:
+        """
+        `rebase` of start..end spans: starts off a working day roll forward and ends backward, and a span
+        that falls on days off only (whose start rolled past its end) ends on its new start.
+        """
+        new_starts = self.rebase(starts, start, new_start, roll="forward")
+        new_ends = self.rebase(ends, start, new_start, roll="backward")
+        inverted = new_ends < new_starts
+        new_ends[inverted] = new_starts[inverted]
+        return new_starts, new_ends
+
+
+default_calendar = WorkingCalendar()
+
+
+def calendar_for(weekmask: str, holidays: Iterable[DateLike] = ()) -> WorkingCalendar:
+    """The calendar of `weekmask` with `holidays` off, compiled once and shared between callers."""
+    return _calendar(weekmask, tuple(sorted({str(day) for day in holidays or () if day})))
+
+
+@functools.lru_cache(maxsize=256)
+def _calendar(weekmask: str, holidays: tuple[str, ...]) -> WorkingCalendar:
+    return WorkingCalendar(weekmask, holidays)
@@ -0,0 +1,112 @@
+"""
+Reachability index of a task dependency graph.
+
+`DependencyGraph` orders the graph topologically once and stores, for every
+task, the set of its transitive prerequisites and the set of the tasks it
+transitively blocks, each as one Python int with a bit per task (like the
+skill bitsets of `planning/skills.py`). The closure is built with one OR per
+edge in each direction. Afterwards "does A have to finish before B?" is a
+single bit test, the size of either set is a popcount, and listing a set
+unpacks its bits with NumPy, so the queries do not walk the graph however
+large the plan is.
+"""
+from typing import Hashable, Iterable, Sequence
+
+import numpy as np
+
+from .schedule import topological_order
+
+
+def bit_positions(bits: int) -> np.ndarray:
+    """Positions of the set bits of a non-negative int, in increasing order."""
+    if not bits:
+        return np.array([], dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+class DependencyGraph:
+    """Dependencies between `nodes`; each edge is a (node, dependency) pair: node cannot start before dependency is done."""
+
+    def __init__(self, nodes: Iterable[Hashable], edges: Iterable[tuple[Hashable, Hashable]]):
+        self.nodes = list(dict.fromkeys(nodes))
+        self._positions = {node: position for position, node in enumerate(self.nodes)}
+        dependencies: dict[Hashable, list[Hashable]] = {node: [] for node in self.nodes}
+        for node, dependency in edges:
+            if node in dependencies:
+                dependencies[node].append(dependency)
+
+        # Cycles and edges to unknown nodes are dropped, as the scheduler drops them
+        order, self.dropped = topological_order(dependencies)
+        dropped = set(self.dropped)
+        self.order = [self._positions[node] for node in order]
+        self._rank = np.empty(len(self.nodes), dtype=np.int64)
+        self._rank[self.order] = np.arange(len(self.order))
+        self.dependencies: list[list[int]] = [
+            [self._positions[dependency] for dependency in dict.fromkeys(dependencies[node])
+             if (node, dependency) not in dropped]
+            for node in self.nodes
+        ]
+        self.dependents: list[list[int]] = [[] for _ in self.nodes]
+        for position, node_dependencies in enumerate(self.dependencies):
+            for dependency in node_dependencies:
+                self.dependents[dependency].append(position)
+
+        self._prerequisites = [0] * len(self.nodes)
+        for position in self.order:
+            bits = 0
+            for dependency in self.dependencies[position]:
+                bits |= self._prerequisites[dependency] | 1 << dependency
+            self._prerequisites[position] = bits
+        self._blocked = [0] * len(self.nodes)
+        for position in reversed(self.order):
+            bits = 0
+            for dependent in self.dependents[position]:
+                bits |= self._blocked[dependent] | 1 << dependent
+            self._blocked[position] = bits
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._positions
+
+    def position(self, node: Hashable) -> int:
+        return self._positions[node]
+
+    def requires(self, node: Hashable, prerequisite: Hashable) -> bool:
+        """Whether `prerequisite` has to finish, directly or through other tasks, before `node` can start."""
+        return bool(self._prerequisites[self._positions[node]] >> self._positions[prerequisite] & 1)
+
+    def prerequisite_bits(self, node: Hashable) -> int:
+        return self._prerequisites[self._positions[node]]
+
+    def blocked_bits(self, node: Hashable) -> int:
+        return self._blocked[self._positions[node]]
+
+    def nodes_of(self, bits: int) -> list[Hashable]:
+        """The nodes of a bitset, in input order."""
+        return [self.nodes[position] for position in bit_positions(bits)]
+
+    def prerequisites(self, node: Hashable) -> list[Hashable]:
+        """Everything that has to finish before `node` can start."""
+        return self.nodes_of(self.prerequisite_bits(node))
+
+    def blocks(self, node: Hashable) -> list[Hashable]:
+        """Everything that cannot start before `node` is done."""
+        return self.nodes_of(self.blocked_bits(node))
+
+    def direct_dependencies(self, node: Hashable) -> list[Hashable]:
+        return [self.nodes[position] for position in self.dependencies[self._positions[node]]]
+
+    def direct_dependents(self, node: Hashable) -> list[Hashable]:
+        return [self.nodes[position] for position in self.dependents[self._positions[node]]]
+
+    def ordered_positions(self, bits: int) -> np.ndarray:
+        """Positions of a bitset's nodes, sorted so every node comes after its dependencies."""
+        positions = bit_positions(bits)
+        return positions[np.argsort(self._rank[positions], kind="stable")]
+
+    def in_order(self, nodes: Sequence[Hashable]) -> list[Hashable]:
+        """`nodes` sorted so every node comes after its dependencies."""
+        return sorted(nodes, key=lambda node: self._rank[self._positions[node]])
@@ -0,0 +1,161 @@
+"""
+Sparse TF-IDF index of team members for ranking who fits a task.
+
+Each member is a document made of their skills and the meaningful words of
+their role. A skill counts as its normalized name and as its parts, so
+"pytest-django" also matches a task about "django", and plurals are folded
+("tests" matches "test"). Terms are weighted by inverse document frequency
+over the team: a skill everybody has says little about who should take a
+task, a skill one member has says a lot.
+
+The member x term matrix is kept in compressed sparse column form (per term,
+the members that have it and their weights). A batch of task texts becomes
+one sparse task x term matrix in coordinate form, and the task x member cosine
+scores are a single sparse product: every task term is expanded into the
+members holding that term with `np.repeat`, and the products are summed with
+`np.add.at`. No embedding service is involved; ranking hundreds of tasks
+takes milliseconds.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .skills import SKILL_ALIASES, TOKEN, normalize_skill
+
+# Role words that say nothing about which tasks fit the member
+ROLE_STOPWORDS = frozenset({
+    "and", "of", "the", "developer", "engineer", "senior", "junior", "lead", "principal", "staff",
+    "intern", "specialist", "manager",
+})
+
+_PART = re.compile(r"[a-z0-9+#]+")
+
+
+def _fold(term: str) -> str:
+    """Folds the plural of single words ("tests" -> "test"); phrases are kept as they are."""
+    if " " not in term and len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def _with_parts(term: str) -> list[str]:
+    """The term and, for a compound like "pytest-django" or "ci/cd", its parts."""
+    terms = [_fold(term)]
+    if " " not in term:
+        parts = [part for part in _PART.findall(term) if len(part) > 1]
+        if len(parts) > 1:
+            terms += [_fold(part) for part in parts]
+    return terms
+
+
+def member_terms(member: dict) -> Counter:
+    """Term counts of a member (a dict with "skills" and "role")."""
+    counts = Counter()
+    for skill in member.get("skills") or []:
+        if isinstance(skill, str) and (normalized := normalize_skill(skill)):
+            counts.update(_with_parts(normalized))
+    counts.update(
+        _fold(word) for word in TOKEN.findall((member.get("role") or "").casefold()) if word not in ROLE_STOPWORDS
+    )
+    return counts
+
+
+def text_terms(text: str) -> Counter:
+    """Term counts of a task text: its words and runs of two or three words, aliases resolved."""
+    words = TOKEN.findall(text.casefold())
+    terms = []
+    for size in (1, 2, 3):
+        for start in range(len(words) - size + 1):
+            term = " ".join(words[start:start + size])
+            term = SKILL_ALIASES.get(term, term)
+            if term.isalnum():
+                terms.append(_fold(term))
+            else:
+                terms += _with_parts(term)
+    return Counter(terms)
+
+
+@dataclass
+class MemberMatch:
+    # Position of the member in the index
+    index: int
+    member: dict
+    score: float
+
+
+class MemberIndex:
+    """TF-IDF index over `members` (dicts with "skills" and "role")."""
+
+    def __init__(self, members: Sequence[dict]):
+        self.members = list(members)
+        documents = [member_terms(member) for member in self.members]
+        self.vocabulary = sorted(set().union(*documents)) if documents else []
+        self._term_index = {term: index for index, term in enumerate(self.vocabulary)}
+
+        # Coordinate form first: one entry per (member, term)
+        rows = np.array([row for row, terms in enumerate(documents) for _ in terms], dtype=np.int64)
+        cols = np.array([self._term_index[term] for terms in documents for term in terms], dtype=np.int64)
+        counts = np.array([count for terms in documents for count in terms.values()], dtype=float)
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        # Smoothed IDF, so a term every member has still counts a little
+        self.idf = np.log((1 + len(self.members)) / (1 + document_frequency)) + 1.0
+        weights = (1.0 + np.log(counts)) * self.idf[cols]
+        weights /= _segment_norms(rows, weights, len(self.members))[rows]
+
+        # Compressed sparse columns: the members holding term t are _members[_term_ptr[t]:_term_ptr[t + 1]]
+        order = np.lexsort((rows, cols))
+        self._members = rows[order]
+        self._weights = weights[order]
+        self._term_ptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Task x member cosine similarity of the texts' TF-IDF vectors with the members'."""
+        rows, cols, counts = [], [], []
+        for row, text in enumerate(texts):
+            for term, count in text_terms(text).items():
+                col = self._term_index.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    counts.append(count)
+        scores = np.zeros((len(texts), len(self.members)))
+        if not rows:
+            return scores
+        rows, cols = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+        weights = (1.0 + np.log(np.array(counts, dtype=float))) * self.idf[cols]
+        weights /= _segment_norms(rows, weights, len(texts))[rows]
+
+        # Sparse product: each task term pairs with every member that has the term
+        starts, ends = self._term_ptr[cols], self._term_ptr[cols + 1]
+        fan_out = ends - starts
+        first = np.cumsum(fan_out) - fan_out
+        positions = np.arange(fan_out.sum()) - np.repeat(first, fan_out) + np.repeat(starts, fan_out)
+        np.add.at(
+            scores,
+            (np.repeat(rows, fan_out), self._members[positions]),
+            np.repeat(weights, fan_out) * self._weights[positions],
+        )
+        return scores
+
+    def rank(self, texts: Sequence[str], limit: int = 3) -> list[list[MemberMatch]]:
+        """Best matching members of each text, best first; members without any matching term are left out."""
+        scores = self.scores(texts)
+        ranked = []
+        for row in scores:
+            best = np.argsort(-row, kind="stable")[:limit]
+            ranked.append([
+                MemberMatch(index=int(index), member=self.members[index], score=round(float(row[index]), 4))
+                for index in best if row[index] > 0
+            ])
+        return ranked
+
+
+def _segment_norms(rows: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=size))
+    return np.where(norms > 0, norms, 1.0)
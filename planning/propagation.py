@@ -0,0 +1,129 @@
+"""
+Incremental delay propagation over a dependency graph.
+
+When a card's dates move, only the cards it blocks (its descendants in the
+`DependencyGraph` reachability index) can be affected, so only that subgraph
+is visited, in topological order. A card moves only if a dependency that
+moved now ends on or after its start: it then starts on the working day after
+its latest dependency ends and keeps its length in working days. Cards whose
+slack absorbs the delay, and everything downstream of them, keep their dates,
+so the result is the minimal set of date changes. A card brought forward
+pulls nothing in; dependents never move earlier.
+
+Dates are converted to working-day offsets on a `WorkingCalendar` for the
+affected cards and their direct dependencies in one call, the pass is integer
+arithmetic, and the moved cards are converted back in one call. Cards without
+dates neither move nor hold up their dependents.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Hashable, Optional
+
+import numpy as np
+
+from .calendar import DateLike, WorkingCalendar, default_calendar, parse_dates, to_dates
+from .graph import DependencyGraph
+
+
+@dataclass
+class DateChange:
+    node: Hashable
+    previous_start: Optional[date]
+    previous_end: Optional[date]
+    start: Optional[date]
+    end: Optional[date]
+    # Working days the card moved by (the moved card itself: by its end)
+    shift: int
+
+
+def _involved_positions(graph: DependencyGraph, moved: int, affected: np.ndarray) -> np.ndarray:
+    """Every date the pass reads: the affected cards, their direct dependencies and the moved card."""
+    return np.unique(np.concatenate((
+        [moved], affected,
+        np.array([dependency for position in affected for dependency in graph.dependencies[position]], dtype=np.int64),
+    ))).astype(np.int64)
+
+
+def propagation_inputs(graph: DependencyGraph, node: Hashable) -> list[Hashable]:
+    """
+    The nodes whose dates `propagate_delay` reads when `node` moves; the dates of every other node can be
+    left out (NaT).
+    """
+    affected = graph.ordered_positions(graph.blocked_bits(node))
+    return [graph.nodes[position] for position in _involved_positions(graph, graph.position(node), affected)]
+
+
+def propagate_delay(graph: DependencyGraph, starts: np.ndarray, ends: np.ndarray, node: Hashable,
+                    start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                    calendar: WorkingCalendar = default_calendar) -> list[DateChange]:
+    """
+    Date changes after `node` moves to `start`..`end`; `starts` and `ends` are day arrays aligned with
+    `graph.nodes`. Without `end`, the card keeps its length in working days; without `start`, it keeps
+    its start. The changes come in topological order, the moved card first.
+    """
+    starts, ends = parse_dates(starts), parse_dates(ends)
+    moved = graph.position(node)
+    new_start, new_end = parse_dates([start, end])
+    if np.isnat(new_start):
+        new_start = starts[moved]
+    elif np.isnat(new_end) and not np.isnat(ends[moved]) and not np.isnat(starts[moved]):
+        length = calendar.offsets(calendar.roll([starts[moved]], "forward")[0], calendar.roll([ends[moved]], "backward"))[0]
+        new_end = calendar.offset(new_start, [max(int(length), 0)])[0]
+    if np.isnat(new_end):
+        # A card without a start has no length; it ends on its new start at the earliest
+        new_end = ends[moved] if np.isnat(new_start) or ends[moved] >= new_start else new_start
+
+    affected = graph.ordered_positions(graph.blocked_bits(node))
+    involved = _involved_positions(graph, moved, affected)
+    involved_starts, involved_ends = starts[involved].copy(), ends[involved].copy()
+    slot = {int(position): index for index, position in enumerate(involved)}
+    involved_starts[slot[moved]], involved_ends[slot[moved]] = new_start, new_end
+
+    base = new_start if not np.isnat(new_start) else new_end
+    if np.isnat(base):
+        return []
+    # Working-day offsets; a start off a working day counts as the next one, an end as the previous one
+    known = ~(np.isnat(involved_starts) | np.isnat(involved_ends))
+    start_offsets = np.zeros(len(involved), dtype=np.int64)
+    end_offsets = np.zeros(len(involved), dtype=np.int64)
+    start_offsets[known] = calendar.offsets(base, calendar.roll(involved_starts[known], "forward"))
+    end_offsets[known] = calendar.offsets(base, calendar.roll(involved_ends[known], "backward"))
+
+    changed = np.zeros(len(involved), dtype=bool)
+    changed[slot[moved]] = starts[moved] != new_start or ends[moved] != new_end
+    shifts = np.zeros(len(involved), dtype=np.int64)
+    for position in affected:
+        index = slot[int(position)]
+        if not known[index]:
+            continue
+        dependencies = [slot[dependency] for dependency in graph.dependencies[position]]
+        if not any(changed[dependency] for dependency in dependencies):
+            continue
+        earliest_start = max(
+            (end_offsets[dependency] + 1 for dependency in dependencies if known[dependency]),
+            default=start_offsets[index],
+        )
+        if earliest_start > start_offsets[index]:
+            shifts[index] = earliest_start - start_offsets[index]
+            start_offsets[index] += shifts[index]
+            end_offsets[index] += shifts[index]
+            changed[index] = True
+
+    shifted = [index for index in (slot[int(position)] for position in affected) if changed[index]]
+    new_dates = to_dates(calendar.offset(base, np.concatenate((start_offsets[shifted], end_offsets[shifted]))))
+    previous_start, previous_end = to_dates(np.array([starts[moved], ends[moved]]))
+    changes = []
+    if changed[slot[moved]]:
+        changes.append(DateChange(
+            node=node, previous_start=previous_start, previous_end=previous_end,
+            start=to_dates(np.array([new_start]))[0], end=to_dates(np.array([new_end]))[0],
+            shift=int(calendar.offsets(previous_end, [new_end])[0]) if previous_end else 0,
+        ))
+    for order, index in enumerate(shifted):
+        position = int(involved[index])
+        previous_start, previous_end = to_dates(np.array([starts[position], ends[position]]))
+        changes.append(DateChange(
+            node=graph.nodes[position], previous_start=previous_start, previous_end=previous_end,
+            start=new_dates[order], end=new_dates[len(shifted) + order], shift=int(shifts[index]),
+        ))
+    return changes
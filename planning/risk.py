@@ -0,0 +1,228 @@
+"""
+Monte Carlo schedule risk of a plan.
+
+Each task's duration is drawn from a PERT (scaled beta) distribution over its
+three-point estimate: optimistic, most likely and pessimistic working days.
+When only the most likely estimate is known, the others default to fixed
+factors of it, skewed towards overruns as software estimates are. The
+samples form one tasks x samples array. The forward pass of the critical-path
+method then runs once per task over every sample at the same time, and the
+backward pass once per dependency. Samples are processed in chunks to bound
+memory.
+
+The result is the distribution of the project duration, with percentile
+completion dates on a `WorkingCalendar`, and each task's criticality index:
+the share of samples in which the task has no slack.
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .calendar import WorkingCalendar, default_calendar
+from .schedule import topological_order
+
+# Three-point defaults as factors of the most likely estimate
+OPTIMISTIC_FACTOR = 0.75
+PESSIMISTIC_FACTOR = 2.0
+# Weight of the most likely estimate in the PERT distribution
+PERT_WEIGHT = 4.0
+DEFAULT_SAMPLES = 20000
+PERCENTILES = (50, 80, 95)
+# Samples simulated at once; bounds the tasks x samples arrays
+CHUNK_SIZE = 4096
+# Resolution of the tabulated duration distributions
+QUANTILE_POINTS = 1 << 16
+# Distinct distribution shapes worth tabulating; beyond that, variates come from NumPy's beta sampler
+MAX_TABULATED_SHAPES = 8
+# Slack (in working days) under which a task counts as critical in a sample
+CRITICAL_TOLERANCE = 1e-9
+
+
+@dataclass
+class RiskTask:
+    id: str
+    most_likely: float
+    optimistic: Optional[float] = None
+    pessimistic: Optional[float] = None
+    depends_on: Sequence[str] = ()
+
+
+@dataclass
+class ScheduleRisk:
+    start: date
+    samples: int
+    # Working days to finish the project if every task takes its most likely estimate
+    planned_duration: float
+    planned_finish: date
+    mean_duration: float
+    # Percentile -> working days and completion date
+    durations: dict[int, float] = field(default_factory=dict)
+    finishes: dict[int, date] = field(default_factory=dict)
+    # Task ID -> share of samples in which the task is on the critical path
+    criticality: dict[str, float] = field(default_factory=dict)
+    deadline: Optional[date] = None
+    # Share of samples that finish by the deadline
+    on_time_probability: Optional[float] = None
+    dropped_dependencies: list[tuple[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "start_date": self.start.isoformat(),
+            "samples": self.samples,
+            "planned": {"duration_days": round(self.planned_duration, 2), "finish_date": self.planned_finish.isoformat()},
+            "mean_duration_days": round(self.mean_duration, 2),
+            "completion": {
+                f"P{percentile}": {
+                    "duration_days": round(self.durations[percentile], 2),
+                    "finish_date": self.finishes[percentile].isoformat(),
+                }
+                for percentile in self.durations
+            },
+            "deadline": self.deadline.isoformat() if self.deadline else None,
+            "on_time_probability": self.on_time_probability,
+            "criticality": [
+                {"id": task_id, "index": index}
+                for task_id, index in sorted(self.criticality.items(), key=lambda item: -item[1])
+            ],
+            "dropped_dependencies": [list(edge) for edge in self.dropped_dependencies],
+        }
+
+
+def three_point(tasks: Sequence[RiskTask]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Optimistic, most likely and pessimistic estimates, with the defaults filled in and put in order."""
+    most_likely = np.array([max(float(task.most_likely), 0.0) for task in tasks])
+    optimistic = np.array([
+        task.optimistic if task.optimistic is not None else OPTIMISTIC_FACTOR * task.most_likely for task in tasks
+    ], dtype=float)
+    pessimistic = np.array([
+        task.pessimistic if task.pessimistic is not None else PESSIMISTIC_FACTOR * task.most_likely for task in tasks
+    ], dtype=float)
+    optimistic = np.clip(optimistic, 0.0, most_likely)
+    pessimistic = np.maximum(pessimistic, most_likely)
+    return optimistic, most_likely, pessimistic
+
+
+class PertSampler:
+    """
+    Tasks x samples durations from the PERT distribution of each task's three-point estimate.
+
+    With few distinct shapes (with the default factors every task has the
+    same one), beta variates are drawn by inverse transform: uniforms index a
+    fine quantile table of each shape, built once per sampler. That is one
+    gather per sample, many times faster than NumPy's beta sampler. With
+    per-task estimates nearly every task has its own shape, and tabulating
+    each would cost more than it saves, so those are drawn with `rng.beta`.
+    """
+
+    def __init__(self, optimistic: np.ndarray, most_likely: np.ndarray, pessimistic: np.ndarray):
+        self.optimistic = optimistic
+        self.spread = pessimistic - optimistic
+        safe_spread = np.where(self.spread > 0, self.spread, 1.0)
+        self.alpha = 1.0 + PERT_WEIGHT * (most_likely - optimistic) / safe_spread
+        self.beta = 1.0 + PERT_WEIGHT * (pessimistic - most_likely) / safe_spread
+        shapes, shape_of_task = np.unique(
+            np.round(np.stack([self.alpha, self.beta], axis=1), 6), axis=0, return_inverse=True,
+        )
+        self._tables = None
+        if len(shapes) <= MAX_TABULATED_SHAPES:
+            self._tables = np.concatenate([_beta_quantiles(alpha, beta) for alpha, beta in shapes])
+            self._table_offsets = (shape_of_task.ravel() * QUANTILE_POINTS)[:, np.newaxis]
+
+    def sample(self, rng: np.random.Generator, samples: int) -> np.ndarray:
+        tasks = len(self.optimistic)
+        if self._tables is not None:
+            index = (rng.random((tasks, samples)) * QUANTILE_POINTS).astype(np.intp)
+            index += self._table_offsets
+            draws = self._tables[index]
+        else:
+            draws = rng.beta(self.alpha[:, np.newaxis], self.beta[:, np.newaxis], size=(tasks, samples))
+        # Tasks without spread take their estimate: optimistic is the most likely there
+        draws *= self.spread[:, np.newaxis]
+        draws += self.optimistic[:, np.newaxis]
+        return draws
+
+
+def _beta_quantiles(alpha: float, beta: float) -> np.ndarray:
+    """
+    Quantiles of Beta(alpha, beta) at the midpoints of QUANTILE_POINTS even probability bins
+    (both shapes are at least 1, so the density is finite).
+    """
+    grid = np.linspace(0.0, 1.0, QUANTILE_POINTS * 4 + 1)
+    density = grid ** (alpha - 1) * (1 - grid) ** (beta - 1)
+    cdf = np.concatenate(([0.0], np.cumsum((density[1:] + density[:-1]) / 2)))
+    return np.interp((np.arange(QUANTILE_POINTS) + 0.5) / QUANTILE_POINTS, cdf / cdf[-1], grid)
+
+
+def _forward(durations: np.ndarray, order: list[int], predecessors: list[list[int]]) -> np.ndarray:
+    """Finish offsets of every task (row of `durations`) in every sample (column)."""
+    finish = np.empty_like(durations)
+    for task in order:
+        if predecessors[task]:
+            np.add(finish[predecessors[task]].max(axis=0), durations[task], out=finish[task])
+        else:
+            finish[task] = durations[task]
+    return finish
+
+
+def simulate_schedule(tasks: Sequence[RiskTask], start: date, calendar: WorkingCalendar = default_calendar,
+                      samples: int = DEFAULT_SAMPLES, deadline: Optional[date] = None,
+                      seed: Optional[int] = None) -> ScheduleRisk:
+    """Simulates the plan `samples` (at least 1) times from `start` on `calendar`; `seed` makes the result reproducible."""
+    if samples < 1:
+        raise ValueError(f"samples must be at least 1, not {samples}")
+    tasks = list({task.id: task for task in tasks}.values())
+    position = {task.id: index for index, task in enumerate(tasks)}
+    order_ids, dropped = topological_order({task.id: list(task.depends_on) for task in tasks})
+    dropped_edges = set(dropped)
+    order = [position[task_id] for task_id in order_ids]
+    predecessors = [
+        [position[dependency] for dependency in dict.fromkeys(task.depends_on) if (task.id, dependency) not in dropped_edges]
+        for task in tasks
+    ]
+
+    optimistic, most_likely, pessimistic = three_point(tasks)
+    planned = _forward(most_likely[:, np.newaxis], order, predecessors)
+    planned_duration = float(planned.max()) if tasks else 0.0
+
+    rng = np.random.default_rng(seed)
+    sampler = PertSampler(optimistic, most_likely, pessimistic)
+    project_durations = np.zeros(samples)
+    critical_counts = np.zeros(len(tasks))
+    for chunk_start in range(0, samples, CHUNK_SIZE) if tasks else ():
+        size = min(CHUNK_SIZE, samples - chunk_start)
+        durations = sampler.sample(rng, size)
+        finish = _forward(durations, order, predecessors)
+        project = finish.max(axis=0)
+        project_durations[chunk_start:chunk_start + size] = project
+
+        # Backward pass: a task's latest finish is the earliest latest start of its successors
+        latest_finish = np.repeat(project[np.newaxis, :], len(tasks), axis=0)
+        for task in reversed(order):
+            latest_start = latest_finish[task] - durations[task]
+            for predecessor in predecessors[task]:
+                np.minimum(latest_finish[predecessor], latest_start, out=latest_finish[predecessor])
+        critical_counts += (latest_finish - finish <= CRITICAL_TOLERANCE).sum(axis=1)
+
+    durations = {percentile: float(np.percentile(project_durations, percentile)) for percentile in PERCENTILES}
+    # A duration of d working days ends on the ceil(d)-th working day
+    offsets = [max(math.ceil(days - 1e-9) - 1, 0) for days in [planned_duration, *durations.values()]]
+    finish_dates = calendar.dates(start, offsets)
+    risk = ScheduleRisk(
+        start=calendar.dates(start, [0])[0],
+        samples=samples,
+        planned_duration=planned_duration,
+        planned_finish=finish_dates[0],
+        mean_duration=float(project_durations.mean()) if samples else 0.0,
+        durations=durations,
+        finishes=dict(zip(durations, finish_dates[1:])),
+        criticality={task.id: round(float(count / samples), 4) for task, count in zip(tasks, critical_counts)},
+        deadline=deadline,
+        dropped_dependencies=dropped,
+    )
+    if deadline is not None:
+        available = calendar.count(risk.start, deadline)
+        risk.on_time_probability = round(float((project_durations <= available + 1e-9).mean()), 4)
+    return risk
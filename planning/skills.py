@@ -0,0 +1,190 @@
+"""
+Interned skill vocabulary with bitset coverage queries.
+
+Team skills are free-form strings ("React.js", "reactjs", "react", listed
+twice). `SkillTaxonomy` normalizes them (case, punctuation, known aliases)
+and gives every distinct skill a stable integer ID, so a set of skills is one
+Python int with a bit per skill. Coverage, gaps and overlap between members,
+the team and a task are then single AND/OR operations. `TeamSkills` answers
+those queries for a team and renders the compact summary the prompts use
+instead of each member's raw list. Each team gets its own taxonomy, so what
+a task is found to require depends only on that team and never on the
+teams the process handled before.
+"""
+import re
+import threading
+from typing import Iterable, Optional, Sequence
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+# Spellings that mean the same skill; keys and values are normalized
+SKILL_ALIASES = {
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "next.js": "nextjs",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "k8s": "kubernetes",
+    "expressjs": "express.js",
+    "tailwindcss": "tailwind",
+    "gcp": "google cloud",
+    "amazon web services": "aws",
+    "ci cd": "ci/cd",
+    "ci": "ci/cd",
+    "restful": "rest api",
+    "restful api": "rest api",
+    "websockets": "websocket",
+    "ml": "machine learning",
+    "llms": "llm",
+}
+
+
+def normalize_skill(name: str) -> str:
+    """Lower case, punctuation-separated words, with aliases resolved."""
+    normalized = " ".join(TOKEN.findall(name.casefold()))
+    return SKILL_ALIASES.get(normalized, normalized)
+
+
+def mentions(text: str) -> set[str]:
+    """Every normalized skill name the text could be mentioning: its words and runs of two or three words."""
+    words = TOKEN.findall(text.casefold())
+    candidates = set(words)
+    candidates.update(" ".join(words[start:start + size]) for size in (2, 3) for start in range(len(words) - size + 1))
+    return {SKILL_ALIASES.get(candidate, candidate) for candidate in candidates}
+
+
+class SkillTaxonomy:
+    """
+    Vocabulary of normalized skills; IDs are assigned in first-seen order and never change.
+    With a `limit`, skills beyond the first `limit` are not interned.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> Optional[int]:
+        skill = normalize_skill(name)
+        if not skill:
+            return None
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(skill)
+                if skill_id is None:
+                    if self.limit is not None and len(self._names) >= self.limit:
+                        return None
+                    skill_id = self._ids[skill] = len(self._names)
+                    self._names.append(skill)
+        return skill_id
+
+    def id(self, name: str) -> Optional[int]:
+        """ID of an already known skill, without adding it."""
+        return self._ids.get(normalize_skill(name))
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def bits(self, skills: Iterable[str]) -> int:
+        """Bitset of the skills, interning the new ones; duplicates and spellings collapse."""
+        bits = 0
+        for skill in skills or ():
+            if isinstance(skill, str) and (skill_id := self.intern(skill)) is not None:
+                bits |= 1 << skill_id
+        return bits
+
+    @staticmethod
+    def ids(bits: int) -> list[int]:
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(low.bit_length() - 1)
+            bits ^= low
+        return ids
+
+    def names(self, bits: int) -> list[str]:
+        return [self._names[skill_id] for skill_id in self.ids(bits)]
+
+    def mentioned(self, text: str, within: int = -1) -> int:
+        """Bitset of the known skills (limited to `within`) that the text mentions, aliases included."""
+        bits = 0
+        for candidate in mentions(text):
+            skill_id = self._ids.get(candidate)
+            if skill_id is not None:
+                bits |= 1 << skill_id
+        return bits & within
+
+
+# Shared by the project members' skill bitsets; bounded, as it lives as long as the process
+SHARED_TAXONOMY_LIMIT = 4096
+skill_taxonomy = SkillTaxonomy(limit=SHARED_TAXONOMY_LIMIT)
+
+
+class TeamSkills:
+    """Skill bitsets of a team's members (dicts with "name", "role" and "skills"), in a taxonomy of the team's own by default."""
+
+    def __init__(self, members: Sequence[dict], taxonomy: Optional[SkillTaxonomy] = None):
+        self.members = list(members)
+        self.taxonomy = taxonomy if taxonomy is not None else SkillTaxonomy()
+        self.member_bits = [self.taxonomy.bits(member.get("skills") or []) for member in self.members]
+        self.team_bits = 0
+        for bits in self.member_bits:
+            self.team_bits |= bits
+
+    def required(self, text: str) -> int:
+        """Skills the text mentions, out of every skill the team's taxonomy knows."""
+        return self.taxonomy.mentioned(text)
+
+    def coverage(self, required: int) -> float:
+        """Share of the required skills at least one member has (1.0 when nothing is required)."""
+        if not required:
+            return 1.0
+        return (required & self.team_bits).bit_count() / required.bit_count()
+
+    def gaps(self, required: int) -> list[str]:
+        """Required skills nobody on the team has."""
+        return self.taxonomy.names(required & ~self.team_bits)
+
+    def overlap(self, first: int, second: int) -> list[str]:
+        """Skills two members share, by member index."""
+        return self.taxonomy.names(self.member_bits[first] & self.member_bits[second])
+
+    def members_with(self, skills: int) -> list[dict]:
+        """Members that have all of `skills`."""
+        return [member for member, bits in zip(self.members, self.member_bits) if bits & skills == skills]
+
+    def single_points(self) -> list[str]:
+        """Skills only one member has."""
+        seen, repeated = 0, 0
+        for bits in self.member_bits:
+            repeated |= seen & bits
+            seen |= bits
+        return self.taxonomy.names(seen & ~repeated)
+
+    def summary(self) -> str:
+        """
+        Compact team description for prompts: each member once, then each skill once with the members who have it.
+
+        e.g. "Members: 1 Jane (Frontend Developer); 2 Jim (Backend Developer)
+        Skills: react [1]; python [2]; docker [1, 2]"
+        """
+        members = "; ".join(
+            f"{index} {member.get('name') or member.get('email') or 'Member'} ({member.get('role') or 'no role'})"
+            for index, member in enumerate(self.members, start=1)
+        )
+        skills = []
+        for skill_id in self.taxonomy.ids(self.team_bits):
+            holders = [str(index) for index, bits in enumerate(self.member_bits, start=1) if bits >> skill_id & 1]
+            skills.append(f"{self.taxonomy.name(skill_id)} [{', '.join(holders)}]")
+        return f"Members: {members}\nSkills: {'; '.join(skills) or 'none listed'}"
@@ -0,0 +1,150 @@
+"""
+Deterministic team skill-gap analysis.
+
+The technologies a project needs are the known technologies (the keyword
+dictionary below, plus anything a team member lists) that the project
+description or the project analysis mentions. Against the team's skill
+bitsets that gives coverage, prioritized gaps, each member's share of the
+covered technologies and the skills only one member holds, all from set
+operations. `TeamAssessment.render` writes the team section the research
+synthesizer used to get from an LLM.
+"""
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from .skills import SkillTaxonomy, TeamSkills
+
+# Technologies recognized in project texts, by area; names are normalized skills (see SKILL_ALIASES)
+TECHNOLOGY_AREAS = {
+    "Frontend": [
+        "react", "nextjs", "vue", "angular", "svelte", "typescript", "javascript", "tailwind", "css", "html",
+        "redux",
+    ],
+    "Backend": [
+        "python", "django", "fastapi", "flask", "nodejs", "express.js", "java", "spring boot", "golang", "ruby",
+        "rails", "php", "laravel", "graphql", "rest api", "websocket", "celery",
+    ],
+    "Database": ["postgresql", "mysql", "mongodb", "redis", "sqlite", "elasticsearch", "dynamodb", "cassandra"],
+    "DevOps": [
+        "docker", "kubernetes", "aws", "azure", "google cloud", "terraform", "ci/cd", "github actions", "nginx",
+        "linux", "prometheus", "grafana",
+    ],
+    "Messaging": ["rabbitmq", "kafka"],
+    "AI/ML": ["openai", "anthropic", "langchain", "llm", "machine learning", "pytorch", "tensorflow", "rag"],
+    "Mobile": ["react native", "flutter", "swift", "kotlin", "ios", "android"],
+    "Testing": ["pytest", "jest", "cypress", "playwright", "selenium"],
+    "Integrations": ["stripe", "trello", "oauth", "jwt"],
+}
+
+
+def _technology_bits(taxonomy: SkillTaxonomy) -> tuple[int, dict[str, int]]:
+    areas = {area: taxonomy.bits(technologies) for area, technologies in TECHNOLOGY_AREAS.items()}
+    known = 0
+    for bits in areas.values():
+        known |= bits
+    return known, areas
+
+
+@dataclass
+class MemberAssessment:
+    name: str
+    role: str
+    relevant_skills: list[str]
+    # Share of the covered technologies this member carries (each split between its holders)
+    load: float
+    sole_holder_of: list[str] = field(default_factory=list)
+
+
+@dataclass
+class TeamAssessment:
+    required: list[str]
+    coverage: float
+    critical_gaps: list[str]
+    important_gaps: list[str]
+    area_coverage: dict[str, tuple[int, int]]
+    members: list[MemberAssessment]
+    unused_skills: list[str]
+    capacity_days: Optional[int] = None
+
+    def render(self) -> str:
+        """The team section for the research synthesizer."""
+        lines = ["TEAM ASSESSMENT [Using: Team Info, computed locally]", ""]
+        lines.append(f"Required technologies ({len(self.required)}): {', '.join(self.required) or 'none identified'}")
+        lines.append(f"Team coverage: {self.coverage:.0%}")
+        if self.area_coverage:
+            lines.append("Coverage by area: " + "; ".join(
+                f"{area} {covered}/{required}" for area, (covered, required) in self.area_coverage.items()
+            ))
+
+        lines += ["", "Skills gaps:"]
+        lines.append(f"- Critical (named in the project description): {', '.join(self.critical_gaps) or 'none'}")
+        lines.append(f"- Important (from the project analysis): {', '.join(self.important_gaps) or 'none'}")
+
+        lines += ["", "Individual skill analysis:"]
+        for member in self.members:
+            line = f"- {member.name} ({member.role}): {', '.join(member.relevant_skills) or 'no required skills'}"
+            line += f"; carries {member.load:.0%} of the covered technologies"
+            if member.sole_holder_of:
+                line += f"; only holder of {', '.join(member.sole_holder_of)}"
+            lines.append(line)
+
+        if self.capacity_days is not None:
+            lines += ["", f"Capacity: {len(self.members)} members x {self.capacity_days} working days = "
+                          f"{len(self.members) * self.capacity_days} person-days"]
+
+        lines += ["", "Recommendations:"]
+        recommendations = []
+        if self.critical_gaps:
+            recommendations.append(f"Hire or contract for {', '.join(self.critical_gaps)} before the work that needs it starts")
+        if self.important_gaps:
+            recommendations.append(f"Plan training or spikes for {', '.join(self.important_gaps)}")
+        sole = sorted({skill for member in self.members for skill in member.sole_holder_of})
+        if sole:
+            recommendations.append(f"Cross-train on {', '.join(sole)}, which only one member holds")
+        overloaded = [member.name for member in self.members if self.members and member.load > 2 / len(self.members)]
+        if overloaded:
+            recommendations.append(f"Spread the work of {', '.join(overloaded)}, who carry a large share of the stack")
+        if self.unused_skills:
+            recommendations.append(f"Team skills the project does not use: {', '.join(self.unused_skills)}")
+        lines += [f"- {recommendation}" for recommendation in recommendations] or ["- Team covers the project as planned"]
+        return "\n".join(lines)
+
+
+def assess_team(members: Sequence[dict], project_description: str, project_analysis: str = "",
+                capacity_days: Optional[int] = None, taxonomy: Optional[SkillTaxonomy] = None) -> TeamAssessment:
+    """Compares the team's skills with the technologies the project description and analysis mention."""
+    team = TeamSkills(members, taxonomy)
+    taxonomy = team.taxonomy
+    known, areas = _technology_bits(taxonomy)
+    recognized = known | team.team_bits
+    described = taxonomy.mentioned(project_description or "", within=recognized)
+    analysed = taxonomy.mentioned(project_analysis or "", within=recognized)
+    required = described | analysed
+    covered = required & team.team_bits
+
+    holders = {skill_id: sum(bits >> skill_id & 1 for bits in team.member_bits) for skill_id in taxonomy.ids(covered)}
+    member_assessments = []
+    for member, bits in zip(team.members, team.member_bits):
+        relevant = bits & required
+        load = sum(1 / holders[skill_id] for skill_id in taxonomy.ids(relevant))
+        member_assessments.append(MemberAssessment(
+            name=member.get("name") or member.get("email") or "Member",
+            role=member.get("role") or "",
+            relevant_skills=taxonomy.names(relevant),
+            load=load / len(holders) if holders else 0.0,
+            sole_holder_of=[taxonomy.name(skill_id) for skill_id in taxonomy.ids(relevant) if holders[skill_id] == 1],
+        ))
+
+    return TeamAssessment(
+        required=taxonomy.names(required),
+        coverage=team.coverage(required),
+        critical_gaps=taxonomy.names(described & ~team.team_bits),
+        important_gaps=taxonomy.names(analysed & ~described & ~team.team_bits),
+        area_coverage={
+            area: ((required & bits & team.team_bits).bit_count(), (required & bits).bit_count())
+            for area, bits in areas.items() if required & bits
+        },
+        members=member_assessments,
+        unused_skills=taxonomy.names(team.team_bits & ~required),
+        capacity_days=capacity_days,
+    )
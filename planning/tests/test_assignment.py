@@ -0,0 +1,37 @@
+import unittest
+
+from planning.assignment import PlannedWork, TaskAssigner
+
+TEAM = [
+    {"name": "Ann", "role": "Backend Developer", "skills": ["Python", "Django", "PostgreSQL"]},
+    {"name": "Bo", "role": "Frontend Developer", "skills": ["React", "CSS"]},
+]
+
+
+class TaskAssignerTests(unittest.TestCase):
+    def test_work_follows_skills(self):
+        assigner = TaskAssigner(TEAM, 20)
+        members = assigner.assign([
+            PlannedWork("1", "Django models in PostgreSQL", 2),
+            PlannedWork("2", "React checkout page with CSS", 2),
+        ])
+        self.assertEqual([member["name"] for member in members], ["Ann", "Bo"])
+        self.assertEqual(assigner.utilization(), {"Ann": 0.1, "Bo": 0.1})
+
+    def test_a_full_member_only_gets_work_nobody_else_has_room_for(self):
+        assigner = TaskAssigner(TEAM, [3, 10])
+        members = assigner.assign([PlannedWork("1", "Django API", 3), PlannedWork("2", "Django admin", 2)])
+        self.assertEqual([member["name"] for member in members], ["Ann", "Bo"])
+        # Nobody has room left for ten days: the best match takes it
+        [member] = assigner.assign([PlannedWork("3", "Django migrations", 10)])
+        self.assertEqual(member["name"], "Ann")
+
+    def test_the_load_is_kept_between_calls_and_work_is_assigned_once(self):
+        assigner = TaskAssigner(TEAM, 10)
+        [first] = assigner.assign([PlannedWork("1", "Python service", 4)])
+        [again] = assigner.assign([PlannedWork("1", "Python service", 4)])
+        self.assertIs(first, again)
+        self.assertEqual(assigner.load.tolist(), [4.0, 0.0])
+
+    def test_no_team(self):
+        self.assertEqual(TaskAssigner([], 10).assign([PlannedWork("1", "API", 1)]), [None])
@@ -0,0 +1,59 @@
+import unittest
+from datetime import date
+
+import numpy as np
+
+from planning.calendar import WorkingCalendar, calendar_for, parse_dates, to_dates
+
+
+class ParseDatesTests(unittest.TestCase):
+    def test_malformed_and_impossible_dates_become_nat(self):
+        days = parse_dates(["2025-03-03", "03/04/2025", None, "", "2025-02-30", date(2025, 3, 5)])
+        self.assertEqual(to_dates(days), [date(2025, 3, 3), None, None, None, None, date(2025, 3, 5)])
+
+
+class WorkingCalendarTests(unittest.TestCase):
+    def setUp(self):
+        # Mon 2025-03-03 .. Fri 2025-03-07, with Wednesday off
+        self.calendar = WorkingCalendar(holidays=["2025-03-05"])
+
+    def test_offset_skips_weekends_and_holidays(self):
+        self.assertEqual(
+            self.calendar.dates("2025-03-03", [0, 1, 2, 3, 4]),
+            [date(2025, 3, 3), date(2025, 3, 4), date(2025, 3, 6), date(2025, 3, 7), date(2025, 3, 10)],
+        )
+
+    def test_offsets_invert_offset(self):
+        days = self.calendar.offset("2025-03-03", [0, 3, 7, 12])
+        np.testing.assert_array_equal(self.calendar.offsets("2025-03-03", days), [0, 3, 7, 12])
+
+    def test_count_includes_both_ends(self):
+        self.assertEqual(self.calendar.count("2025-03-03", "2025-03-09"), 4)
+        self.assertEqual(self.calendar.count("2025-03-09", "2025-03-03"), 0)
+
+    def test_member_time_off_is_added_to_the_holidays(self):
+        member = {"time_off": [{"start_date": "2025-03-06", "end_date": "2025-03-07"}, "not a range"]}
+        self.assertEqual(self.calendar.for_member(member).count("2025-03-03", "2025-03-07"), 2)
+        self.assertIs(self.calendar.for_member({}), self.calendar)
+
+    def test_rebase_keeps_the_working_day_offset(self):
+        rebased = WorkingCalendar().rebase(["2025-03-05", None], "2025-03-03", "2025-04-07")
+        self.assertEqual(to_dates(rebased), [date(2025, 4, 9), None])
+
+    def test_rebase_spans_of_a_card_dated_on_a_weekend(self):
+        # Rebased on their own, the start rolls forward to Monday and the end back to Friday
+        calendar = WorkingCalendar()
+        starts = calendar.rebase(["2025-03-08"], "2025-03-03", "2025-04-07", roll="forward")
+        ends = calendar.rebase(["2025-03-08"], "2025-03-03", "2025-04-07", roll="backward")
+        self.assertEqual(to_dates(starts) + to_dates(ends), [date(2025, 4, 14), date(2025, 4, 11)])
+
+        starts, ends = calendar.rebase_spans(
+            ["2025-03-08", "2025-03-04", None], ["2025-03-08", "2025-03-11", "2025-03-06"], "2025-03-03", "2025-04-07",
+        )
+        self.assertEqual(to_dates(starts), [date(2025, 4, 14), date(2025, 4, 8), None])
+        self.assertEqual(to_dates(ends), [date(2025, 4, 14), date(2025, 4, 15), date(2025, 4, 10)])
+
+    def test_calendar_for_shares_calendars_with_the_same_holidays(self):
+        first = calendar_for("1111100", ["2025-03-05", "2025-03-04"])
+        self.assertIs(calendar_for("1111100", ["2025-03-04", "2025-03-05", "2025-03-04"]), first)
+        self.assertIsNot(calendar_for("1111110", ["2025-03-04", "2025-03-05"]), first)
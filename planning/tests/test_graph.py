@@ -0,0 +1,47 @@
+import unittest
+
+from planning.graph import DependencyGraph, bit_positions
+
+
+class BitPositionsTests(unittest.TestCase):
+    def test_positions_of_set_bits(self):
+        self.assertEqual(bit_positions(0).tolist(), [])
+        self.assertEqual(bit_positions(0b1010_0001).tolist(), [0, 5, 7])
+        self.assertEqual(bit_positions(1 << 200 | 1 << 3).tolist(), [3, 200])
+
+
+class DependencyGraphTests(unittest.TestCase):
+    def setUp(self):
+        #   1 -> 2 -> 4
+        #   1 -> 3 -> 4 -> 5
+        self.graph = DependencyGraph([1, 2, 3, 4, 5], [(2, 1), (3, 1), (4, 2), (4, 3), (5, 4)])
+
+    def test_transitive_prerequisites_and_blocked_cards(self):
+        self.assertEqual(self.graph.prerequisites(5), [1, 2, 3, 4])
+        self.assertEqual(self.graph.blocks(2), [4, 5])
+        self.assertEqual(self.graph.blocks(5), [])
+        self.assertTrue(self.graph.requires(5, 1))
+        self.assertFalse(self.graph.requires(2, 3))
+
+    def test_direct_neighbours(self):
+        self.assertEqual(self.graph.direct_dependencies(4), [2, 3])
+        self.assertEqual(self.graph.direct_dependents(1), [2, 3])
+
+    def test_order(self):
+        self.assertEqual(self.graph.in_order([5, 3, 1, 4]), [1, 3, 4, 5])
+        positions = self.graph.ordered_positions(self.graph.blocked_bits(1))
+        self.assertEqual([self.graph.nodes[position] for position in positions], [2, 3, 4, 5])
+
+    def test_cycles_and_unknown_dependencies_are_dropped(self):
+        graph = DependencyGraph(["a", "b", "c"], [("a", "c"), ("b", "a"), ("c", "b"), ("c", "missing"), ("x", "a")])
+        self.assertEqual(graph.dropped, [("c", "missing"), ("a", "c")])
+        self.assertEqual(graph.prerequisites("c"), ["a", "b"])
+        self.assertEqual(graph.blocks("c"), [])
+        self.assertFalse(graph.requires("a", "c"))
+        self.assertNotIn("x", graph)
+
+    def test_duplicate_nodes_and_edges_collapse(self):
+        graph = DependencyGraph(["a", "b", "a"], [("b", "a"), ("b", "a")])
+        self.assertEqual(len(graph), 2)
+        self.assertEqual(graph.direct_dependencies("b"), ["a"])
+        self.assertEqual(graph.direct_dependents("a"), ["b"])
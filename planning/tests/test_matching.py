@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from planning.matching import MemberIndex, member_terms, text_terms
+
+TEAM = [
+    {"name": "Ann", "role": "Senior Backend Developer", "skills": ["Python", "pytest-django", "Docker"]},
+    {"name": "Bo", "role": "Frontend Engineer", "skills": ["ReactJS", "CSS", "Docker"]},
+    {"name": "Cy", "role": "DevOps", "skills": ["Kubernetes", "CI/CD", "Docker"]},
+]
+
+
+class MemberTermsTests(unittest.TestCase):
+    def test_skills_count_with_their_parts_and_role_words(self):
+        terms = member_terms(TEAM[0])
+        self.assertEqual({"pytest-django", "pytest", "django", "python", "docker", "backend"}, set(terms))
+
+    def test_task_texts_fold_plurals_and_resolve_aliases(self):
+        terms = text_terms("Write tests for the K8s deployments")
+        self.assertIn("test", terms)
+        self.assertIn("deployment", terms)
+        # "k8s" becomes the same term as the skill "Kubernetes"
+        self.assertIn("kubernete", set(terms) & set(member_terms(TEAM[2])))
+
+
+class MemberIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = MemberIndex(TEAM)
+
+    def test_scores_match_a_dense_tf_idf_cosine(self):
+        texts = ["Django API with tests", "React pages and CSS", "Kubernetes CI pipeline with Docker", "Write the press release"]
+        vocabulary = self.index.vocabulary
+
+        def vectors(documents):
+            matrix = np.zeros((len(documents), len(vocabulary)))
+            for row, terms in enumerate(documents):
+                for term, count in terms.items():
+                    if term in vocabulary:
+                        matrix[row, vocabulary.index(term)] = (1 + np.log(count)) * self.index.idf[vocabulary.index(term)]
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            return matrix / np.where(norms > 0, norms, 1)
+
+        expected = vectors([text_terms(text) for text in texts]) @ vectors([member_terms(member) for member in TEAM]).T
+        np.testing.assert_allclose(self.index.scores(texts), expected)
+
+    def test_rank_puts_the_best_match_first(self):
+        django, react, unrelated = self.index.rank(["Django API tests", "React checkout page", "Press release"], limit=2)
+        self.assertEqual([match.member["name"] for match in django], ["Ann"])
+        self.assertEqual(react[0].member["name"], "Bo")
+        self.assertEqual(unrelated, [])
+
+    def test_a_skill_everybody_has_weighs_less(self):
+        [docker, kubernetes] = self.index.scores(["Docker", "Kubernetes"])
+        self.assertLess(docker[2], kubernetes[2])
+
+    def test_no_members(self):
+        self.assertEqual(MemberIndex([]).scores(["Django"]).shape, (1, 0))
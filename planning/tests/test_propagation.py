@@ -0,0 +1,61 @@
+import unittest
+from datetime import date
+
+from planning.calendar import parse_dates
+from planning.graph import DependencyGraph
+from planning.propagation import propagate_delay, propagation_inputs
+
+
+class PropagateDelayTests(unittest.TestCase):
+    def setUp(self):
+        # A (Mon-Wed) blocks B (Thu-Fri) and C (next Wed-Thu, two days of slack); B and C block D
+        self.graph = DependencyGraph(["A", "B", "C", "D"], [("B", "A"), ("C", "A"), ("D", "B"), ("D", "C")])
+        self.starts = parse_dates(["2025-03-03", "2025-03-06", "2025-03-12", "2025-03-14"])
+        self.ends = parse_dates(["2025-03-05", "2025-03-07", "2025-03-13", "2025-03-14"])
+
+    def dates(self, changes):
+        return {change.node: (change.start, change.end, change.shift) for change in changes}
+
+    def test_a_delay_moves_dependents_as_far_as_their_slack_does_not_absorb(self):
+        changes = propagate_delay(self.graph, self.starts, self.ends, "A", end="2025-03-07")
+        self.assertEqual([change.node for change in changes], ["A", "B"])
+        self.assertEqual(self.dates(changes), {
+            "A": (date(2025, 3, 3), date(2025, 3, 7), 2),
+            "B": (date(2025, 3, 10), date(2025, 3, 11), 2),
+        })
+
+    def test_a_longer_delay_reaches_the_end_of_the_graph(self):
+        changes = propagate_delay(self.graph, self.starts, self.ends, "A", end="2025-03-12")
+        self.assertEqual(self.dates(changes)["C"], (date(2025, 3, 13), date(2025, 3, 14), 1))
+        self.assertEqual(self.dates(changes)["D"], (date(2025, 3, 17), date(2025, 3, 17), 1))
+
+    def test_a_start_only_move_keeps_the_card_length(self):
+        changes = propagate_delay(self.graph, self.starts, self.ends, "A", start="2025-03-10")
+        self.assertEqual(self.dates(changes)["A"], (date(2025, 3, 10), date(2025, 3, 12), 5))
+        self.assertEqual(self.dates(changes)["B"], (date(2025, 3, 13), date(2025, 3, 14), 5))
+
+    def test_an_end_only_move_keeps_the_start(self):
+        changes = propagate_delay(self.graph, self.starts, self.ends, "B", end="2025-03-10")
+        self.assertEqual(self.dates(changes)["B"][:2], (date(2025, 3, 6), date(2025, 3, 10)))
+
+    def test_bringing_a_card_forward_pulls_nothing_in(self):
+        changes = propagate_delay(self.graph, self.starts, self.ends, "A", start="2025-02-24", end="2025-02-26")
+        self.assertEqual([change.node for change in changes], ["A"])
+
+    def test_unchanged_dates_change_nothing(self):
+        self.assertEqual(propagate_delay(self.graph, self.starts, self.ends, "A", end="2025-03-05"), [])
+
+    def test_cards_without_dates(self):
+        starts = parse_dates([None, "2025-03-06", None, None])
+        ends = parse_dates(["2025-03-05", "2025-03-07", None, None])
+        # Only an end: the start stays unknown
+        changes = propagate_delay(self.graph, starts, ends, "A", end="2025-03-10")
+        self.assertEqual((changes[0].start, changes[0].end), (None, date(2025, 3, 10)))
+        # Only a start: the card has no length and ends on its new start at the earliest
+        changes = propagate_delay(self.graph, starts, ends, "A", start="2025-03-12")
+        self.assertEqual((changes[0].start, changes[0].end), (date(2025, 3, 12), date(2025, 3, 12)))
+
+    def test_propagation_inputs_are_the_cards_downstream_and_their_dependencies(self):
+        graph = DependencyGraph(["A", "B", "C", "D", "E"], [("B", "A"), ("C", "B"), ("C", "E"), ("D", "E")])
+        self.assertEqual(propagation_inputs(graph, "B"), ["B", "C", "E"])
+        self.assertEqual(propagation_inputs(graph, "D"), ["D"])
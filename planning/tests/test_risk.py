@@ -0,0 +1,67 @@
+import unittest
+from datetime import date
+
+import numpy as np
+
+from planning.risk import MAX_TABULATED_SHAPES, PertSampler, RiskTask, simulate_schedule, three_point
+
+
+class PertSamplerTests(unittest.TestCase):
+    def assert_pert_moments(self, optimistic, most_likely, pessimistic):
+        sampler = PertSampler(np.array(optimistic), np.array(most_likely), np.array(pessimistic))
+        draws = sampler.sample(np.random.default_rng(1), 50000)
+        mean = (np.array(optimistic) + 4 * np.array(most_likely) + np.array(pessimistic)) / 6
+        np.testing.assert_allclose(draws.mean(axis=1), mean, rtol=0.01)
+        self.assertTrue((draws >= np.array(optimistic)[:, np.newaxis]).all())
+        self.assertTrue((draws <= np.array(pessimistic)[:, np.newaxis]).all())
+        return sampler
+
+    def test_few_shapes_are_tabulated(self):
+        sampler = self.assert_pert_moments([1.5, 3.0], [2.0, 4.0], [4.0, 8.0])
+        self.assertIsNotNone(sampler._tables)
+
+    def test_many_shapes_use_the_beta_sampler(self):
+        count = MAX_TABULATED_SHAPES + 1
+        most_likely = np.arange(1, count + 1, dtype=float)
+        sampler = self.assert_pert_moments(list(most_likely * 0.5), list(most_likely), list(most_likely * (1.5 + most_likely / 10)))
+        self.assertIsNone(sampler._tables)
+
+    def test_tasks_without_spread_take_their_estimate(self):
+        sampler = PertSampler(np.array([3.0]), np.array([3.0]), np.array([3.0]))
+        self.assertTrue((sampler.sample(np.random.default_rng(), 100) == 3.0).all())
+
+
+class SimulateScheduleTests(unittest.TestCase):
+    def test_three_point_defaults_and_order(self):
+        optimistic, most_likely, pessimistic = three_point([RiskTask("a", 4), RiskTask("b", 2, optimistic=3, pessimistic=1)])
+        self.assertEqual(optimistic.tolist(), [3.0, 2.0])
+        self.assertEqual(pessimistic.tolist(), [8.0, 2.0])
+
+    def test_fixed_estimates_give_the_planned_schedule(self):
+        tasks = [RiskTask("a", 2, 2, 2), RiskTask("b", 3, 3, 3, depends_on=["a"]), RiskTask("c", 1, 1, 1, depends_on=["a"])]
+        risk = simulate_schedule(tasks, date(2025, 3, 3), samples=1000, deadline=date(2025, 3, 7), seed=1)
+        self.assertEqual(risk.planned_duration, 5)
+        self.assertEqual(risk.planned_finish, date(2025, 3, 7))
+        self.assertEqual(risk.finishes, {50: date(2025, 3, 7), 80: date(2025, 3, 7), 95: date(2025, 3, 7)})
+        self.assertEqual(risk.on_time_probability, 1.0)
+        self.assertEqual(risk.criticality, {"a": 1.0, "b": 1.0, "c": 0.0})
+
+    def test_a_seed_makes_the_result_reproducible(self):
+        tasks = [RiskTask(str(index), 1 + index % 4, depends_on=[str(index - 1)] if index else []) for index in range(20)]
+        first = simulate_schedule(tasks, date(2025, 3, 3), samples=5000, seed=7)
+        second = simulate_schedule(tasks, date(2025, 3, 3), samples=5000, seed=7)
+        self.assertEqual(first.durations, second.durations)
+        self.assertLess(first.durations[50], first.durations[95])
+        self.assertGreater(first.mean_duration, first.planned_duration)
+
+    def test_cycles_are_dropped(self):
+        tasks = [RiskTask("a", 1, depends_on=["b"]), RiskTask("b", 1, depends_on=["a", "missing"])]
+        risk = simulate_schedule(tasks, date(2025, 3, 3), samples=1000, seed=1)
+        self.assertEqual(risk.dropped_dependencies, [("b", "missing"), ("a", "b")])
+        self.assertEqual(risk.planned_duration, 2)
+
+    def test_at_least_one_sample(self):
+        with self.assertRaises(ValueError):
+            simulate_schedule([RiskTask("a", 1)], date(2025, 3, 3), samples=0)
+        risk = simulate_schedule([RiskTask("a", 1)], date(2025, 3, 3), samples=1, seed=1)
+        self.assertEqual(risk.samples, 1)
@@ -0,0 +1,53 @@
+import unittest
+from datetime import date
+
+from planning.calendar import WorkingCalendar
+from planning.schedule import schedule_tasks, topological_order
+
+
+class TopologicalOrderTests(unittest.TestCase):
+    def test_ties_keep_the_input_order(self):
+        order, dropped = topological_order({"c": [], "a": ["c"], "b": [], "d": ["a", "b"]})
+        self.assertEqual(order, ["c", "a", "b", "d"])
+        self.assertEqual(dropped, [])
+
+    def test_unknown_and_self_dependencies_are_dropped(self):
+        order, dropped = topological_order({"a": ["missing", "a"], "b": ["a"]})
+        self.assertEqual(order, ["a", "b"])
+        self.assertEqual(dropped, [("a", "missing"), ("a", "a")])
+
+    def test_a_cycle_is_broken_at_its_first_task(self):
+        order, dropped = topological_order({"a": ["c"], "b": ["a"], "c": ["b"], "d": ["c"]})
+        self.assertEqual(order, ["a", "b", "c", "d"])
+        self.assertEqual(dropped, [("a", "c")])
+
+
+class ScheduleTasksTests(unittest.TestCase):
+    def test_critical_path_and_slack(self):
+        schedule = schedule_tasks(
+            {"design": 2, "build": 3, "docs": 1, "release": 1},
+            {"build": ["design"], "docs": ["design"], "release": ["build", "docs"]},
+            date(2025, 3, 3),
+        )
+        self.assertEqual(schedule.duration, 6)
+        self.assertEqual(schedule.finish, date(2025, 3, 10))
+        self.assertEqual(schedule.critical_path, ["design", "build", "release"])
+        self.assertEqual(schedule.tasks["docs"].slack, 2)
+        self.assertEqual((schedule.tasks["build"].start, schedule.tasks["build"].end), (date(2025, 3, 5), date(2025, 3, 7)))
+        # Over the weekend
+        self.assertEqual(schedule.tasks["release"].start, date(2025, 3, 10))
+
+    def test_holidays_and_a_weekend_start(self):
+        schedule = schedule_tasks({"a": 2}, {}, date(2025, 3, 8), WorkingCalendar(holidays=["2025-03-10"]))
+        self.assertEqual(schedule.start, date(2025, 3, 11))
+        self.assertEqual(schedule.finish, date(2025, 3, 12))
+
+    def test_cycles_are_dropped_and_every_task_is_scheduled(self):
+        schedule = schedule_tasks({"a": 1, "b": 1}, {"a": ["b"], "b": ["a", "unknown"]}, date(2025, 3, 3))
+        self.assertEqual(set(schedule.tasks), {"a", "b"})
+        self.assertEqual(schedule.dropped_dependencies, [("b", "unknown"), ("a", "b")])
+        self.assertEqual(schedule.tasks["b"].start, date(2025, 3, 4))
+
+    def test_durations_below_one_day_take_one_day(self):
+        schedule = schedule_tasks({"a": 0}, {}, date(2025, 3, 3))
+        self.assertEqual(schedule.duration, 1)
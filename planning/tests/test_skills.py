@@ -0,0 +1,59 @@
+import unittest
+
+from planning.skills import SkillTaxonomy, TeamSkills, normalize_skill
+
+
+class SkillTaxonomyTests(unittest.TestCase):
+    def test_spellings_collapse_to_one_skill(self):
+        self.assertEqual(normalize_skill(" React.js "), "react")
+        self.assertEqual(normalize_skill("Node.JS"), "nodejs")
+        taxonomy = SkillTaxonomy()
+        bits = taxonomy.bits(["ReactJS", "react", "Postgres", "", None])
+        self.assertEqual(taxonomy.names(bits), ["react", "postgresql"])
+        self.assertEqual(taxonomy.id("react.js"), 0)
+
+    def test_the_limit_stops_interning(self):
+        taxonomy = SkillTaxonomy(limit=2)
+        bits = taxonomy.bits(["Python", "Django", "Docker"])
+        self.assertEqual(taxonomy.names(bits), ["python", "django"])
+        self.assertIsNone(taxonomy.intern("Docker"))
+        self.assertEqual(taxonomy.intern("python"), 0)
+
+    def test_mentions_match_known_skills_and_phrases(self):
+        taxonomy = SkillTaxonomy()
+        taxonomy.bits(["Machine Learning", "Python", "AWS"])
+        mentioned = taxonomy.mentioned("Train the ML model in python on Amazon Web Services")
+        self.assertEqual(taxonomy.names(mentioned), ["machine learning", "python", "aws"])
+        self.assertEqual(taxonomy.names(taxonomy.mentioned("Python on AWS", within=0b100)), ["aws"])
+
+
+class TeamSkillsTests(unittest.TestCase):
+    def setUp(self):
+        self.team = TeamSkills([
+            {"name": "Ann", "role": "Backend Developer", "skills": ["Python", "Docker"]},
+            {"name": "Bo", "role": "Frontend Developer", "skills": ["React", "docker", "Figma"]},
+        ])
+
+    def test_coverage_and_gaps(self):
+        required = self.team.taxonomy.bits(["Python", "React", "Kubernetes"])
+        self.assertAlmostEqual(self.team.coverage(required), 2 / 3)
+        self.assertEqual(self.team.gaps(required), ["kubernetes"])
+        self.assertEqual(self.team.coverage(0), 1.0)
+
+    def test_members_and_shared_skills(self):
+        self.assertEqual(self.team.overlap(0, 1), ["docker"])
+        self.assertEqual(self.team.single_points(), ["python", "react", "figma"])
+        docker = self.team.taxonomy.bits(["Docker"])
+        self.assertEqual([member["name"] for member in self.team.members_with(docker)], ["Ann", "Bo"])
+
+    def test_each_team_has_its_own_taxonomy(self):
+        other = TeamSkills([{"name": "Cy", "skills": ["Kubernetes"]}])
+        self.assertEqual(self.team.required("Deploy to Kubernetes"), 0)
+        self.assertEqual(other.taxonomy.names(other.required("Deploy to Kubernetes")), ["kubernetes"])
+
+    def test_summary_lists_each_skill_once(self):
+        self.assertEqual(
+            self.team.summary(),
+            "Members: 1 Ann (Backend Developer); 2 Bo (Frontend Developer)\n"
+            "Skills: python [1]; docker [1, 2]; react [2]; figma [2]",
+        )
@@ -0,0 +1,67 @@
+import unittest
+from datetime import date
+
+import numpy as np
+
+from planning.workload import WorkloadCard, WorkloadMatrix
+
+
+class WorkloadMatrixTests(unittest.TestCase):
+    def setUp(self):
+        self.members = [
+            {"id": 1, "name": "Ann"},
+            {"id": 2, "name": "Bo", "time_off": [{"start_date": "2025-03-12", "end_date": "2025-03-13"}]},
+        ]
+
+    def matrix(self, cards=()):
+        matrix = WorkloadMatrix(self.members, "2025-03-03", "2025-03-16")
+        matrix.set_cards(cards)
+        return matrix
+
+    def test_load_falls_on_working_days_only(self):
+        matrix = self.matrix([WorkloadCard("a", 1, "2025-03-06", "2025-03-11")])
+        self.assertEqual(matrix.load[0, 3:9].tolist(), [1, 1, 0, 0, 1, 1])
+        self.assertFalse(matrix.over_allocated().any())
+
+    def test_overlapping_cards_over_allocate_across_a_weekend(self):
+        matrix = self.matrix([
+            WorkloadCard("a", 1, "2025-03-06", "2025-03-11"),
+            WorkloadCard("b", 1, "2025-03-07", "2025-03-10"),
+        ])
+        [allocation] = matrix.over_allocations()
+        self.assertEqual((allocation.start, allocation.end, allocation.days), (date(2025, 3, 7), date(2025, 3, 10), 2))
+        self.assertEqual(allocation.peak_load, 2.0)
+
+    def test_a_card_through_time_off_over_allocates(self):
+        matrix = self.matrix([WorkloadCard("a", 2, "2025-03-11", "2025-03-14")])
+        [allocation] = matrix.over_allocations()
+        self.assertEqual(allocation.member["id"], 2)
+        self.assertEqual((allocation.start, allocation.end, allocation.days), (date(2025, 3, 12), date(2025, 3, 13), 2))
+        # Time off is not reported with the member
+        self.assertNotIn("time_off", matrix.as_dict()["over_allocations"][0]["member"])
+        self.assertEqual(matrix.heatmap("2025-03-12", "2025-03-12")["members"][1]["utilization"], [None])
+
+    def test_incremental_updates_match_a_rebuild(self):
+        cards = [
+            WorkloadCard("a", 1, "2025-03-03", "2025-03-07"),
+            WorkloadCard("b", 2, "2025-03-05", "2025-03-12"),
+            WorkloadCard("c", 1, "2025-03-10", None),
+        ]
+        matrix = self.matrix(cards)
+        moved = WorkloadCard("b", 1, "2025-03-04", "2025-03-05")
+        matrix.update(moved)
+        matrix.remove("c")
+        np.testing.assert_array_equal(matrix.load, self.matrix([cards[0], moved]).load)
+        self.assertEqual(len(matrix), 2)
+
+    def test_cards_that_cannot_be_placed(self):
+        matrix = self.matrix([
+            WorkloadCard("unassigned", None, "2025-03-03", "2025-03-04"),
+            WorkloadCard("undated", 1, None, None),
+            WorkloadCard("outside", 1, "2025-04-01", "2025-04-02"),
+            WorkloadCard("clipped", 1, "2025-02-20", "2025-03-03"),
+        ])
+        self.assertEqual(matrix.unplaced, {"unassigned", "undated", "outside"})
+        self.assertEqual(matrix.load[0].sum(), 1)
+        matrix.update(WorkloadCard("undated", 1, "2025-03-04", "2025-03-04"))
+        self.assertEqual(matrix.unplaced, {"unassigned", "outside"})
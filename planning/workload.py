@@ -0,0 +1,199 @@
+"""
+Per-member daily workload of dated, assigned cards.
+
+A `WorkloadMatrix` holds a member x day load array over a date window: each
+card adds one unit of load to its assignee on every working day from its start
+to its end date. Capacity is a member x day array as well, `daily_capacity` on
+the member's working days (the calendar with their time off) and zero
+otherwise, so a card that runs through a member's holiday over-allocates them
+just like two overlapping cards do.
+
+The initial build is a difference array per member (+1 at each card's first
+day, -1 after its last, with `np.add.at`) turned into loads by one cumulative
+sum and masked to working days. Afterwards a single card is applied or
+withdrawn by adding to or subtracting from its slice of its assignee's row,
+so keeping the matrix current as cards change costs as much as the card is
+long, however many cards the organization has.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Hashable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from .calendar import DateLike, WorkingCalendar, default_calendar, parse_dates, to_dates
+
+# Cards a member can work on per working day
+DEFAULT_DAILY_CAPACITY = 1.0
+# Load over capacity by less than this is not an over-allocation
+OVERLOAD_TOLERANCE = 1e-9
+
+
+@dataclass
+class WorkloadCard:
+    key: Hashable
+    # ID of the assigned member, as in the matrix's member dicts
+    member: Hashable
+    start: Optional[DateLike]
+    end: Optional[DateLike]
+
+
+@dataclass
+class OverAllocation:
+    member: dict
+    start: date
+    end: date
+    # Working days in the run on which the member is over capacity
+    days: int
+    peak_load: float
+
+
+class WorkloadMatrix:
+    """Load of `members` (dicts with an "id" and optionally "time_off") on each day from `start` to `end`."""
+
+    def __init__(self, members: Sequence[dict], start: DateLike, end: DateLike,
+                 calendar: WorkingCalendar = default_calendar, daily_capacity: float = DEFAULT_DAILY_CAPACITY):
+        self.members = list(members)
+        self._rows = {member["id"]: row for row, member in enumerate(self.members)}
+        self.start, self.end = parse_dates([start, end])
+        self.days = np.arange(self.start, self.end + 1) if self.start <= self.end else np.array([], "datetime64[D]")
+        # Days a card's load falls on; the member calendars only decide capacity
+        self.working = calendar.is_working_day(self.days).astype(float)
+        self.capacity = np.array(
+            [calendar.for_member(member).is_working_day(self.days) for member in self.members], dtype=float,
+        ).reshape(len(self.members), len(self.days)) * daily_capacity
+        self.load = np.zeros_like(self.capacity)
+        # card key -> (row, first day, last day + 1) of the load it contributes
+        self._cards: dict[Hashable, tuple[int, int, int]] = {}
+        # Keys of cards without an assignee in the matrix or without dates in the window
+        self.unplaced: set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def _spans(self, members: Sequence[Hashable], starts: Sequence, ends: Sequence):
+        """Rows and [first, last) day positions of cards, clipped to the window; -1 rows for unplaceable cards."""
+        rows = np.array([self._rows.get(member, -1) for member in members], dtype=np.int64)
+        starts, ends = parse_dates(starts), parse_dates(ends)
+        # A card with only one date lasts that day
+        starts = np.where(np.isnat(starts), ends, starts)
+        ends = np.where(np.isnat(ends), starts, ends)
+        first = np.clip((starts - self.start).astype(np.int64), 0, len(self.days))
+        last = np.clip((ends - self.start).astype(np.int64) + 1, 0, len(self.days))
+        rows[np.isnat(starts) | (first >= last)] = -1
+        return rows, first, last
+
+    def set_cards(self, cards: Iterable[WorkloadCard]):
+        """Replaces every card in the matrix."""
+        cards = list(cards)
+        rows, first, last = self._spans([card.member for card in cards], [card.start for card in cards],
+                                        [card.end for card in cards])
+        placed = rows >= 0
+        difference = np.zeros((len(self.members), len(self.days) + 1))
+        np.add.at(difference, (rows[placed], first[placed]), 1.0)
+        np.add.at(difference, (rows[placed], last[placed]), -1.0)
+        self.load = np.cumsum(difference[:, :-1], axis=1) * self.working
+
+        self._cards = {
+            card.key: (int(row), int(start), int(stop))
+            for card, row, start, stop, is_placed in zip(cards, rows, first, last, placed) if is_placed
+        }
+        self.unplaced = {card.key for card, is_placed in zip(cards, placed) if not is_placed}
+
+    def update(self, card: WorkloadCard):
+        """Applies a new or changed card: its previous load is withdrawn and its current load added."""
+        self.remove(card.key)
+        rows, first, last = self._spans([card.member], [card.start], [card.end])
+        row, start, stop = int(rows[0]), int(first[0]), int(last[0])
+        if row < 0:
+            self.unplaced.add(card.key)
+            return
+        self.load[row, start:stop] += self.working[start:stop]
+        self._cards[card.key] = (row, start, stop)
+
+    def remove(self, key: Hashable):
+        self.unplaced.discard(key)
+        span = self._cards.pop(key, None)
+        if span is not None:
+            row, start, stop = span
+            self.load[row, start:stop] -= self.working[start:stop]
+
+    def over_allocated(self) -> np.ndarray:
+        """Member x day mask of the days on which a member has more load than capacity."""
+        return self.load > self.capacity + OVERLOAD_TOLERANCE
+
+    def over_allocations(self) -> list[OverAllocation]:
+        """Runs of over-allocated days per member; a run continues over the days nobody works (weekends, holidays)."""
+        over = self.over_allocated()
+        allocations = []
+        for row in np.flatnonzero(over.any(axis=1)):
+            # Only working days can end a run
+            days = np.flatnonzero(over[row] | (self.working == 0))
+            positions = np.flatnonzero(over[row])
+            # Split where a counted day is followed by a gap of actual working days
+            breaks = np.flatnonzero(np.diff(days) > 1)
+            for run_start, run_end in zip(np.r_[days[0], days[breaks + 1]], np.r_[days[breaks], days[-1]]):
+                in_run = positions[(positions >= run_start) & (positions <= run_end)]
+                if not len(in_run):
+                    continue
+                first_day, last_day = to_dates(self.days[[in_run[0], in_run[-1]]])
+                allocations.append(OverAllocation(
+                    member=self.members[row],
+                    start=first_day,
+                    end=last_day,
+                    days=len(in_run),
+                    peak_load=float(self.load[row, in_run].max()),
+                ))
+        return allocations
+
+    def heatmap(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> dict:
+        """Per-member daily load, capacity and utilization from `start` to `end` (the whole window by default)."""
+        first, last = 0, len(self.days)
+        window = parse_dates([start, end])
+        if not np.isnat(window[0]):
+            first = int(np.clip((window[0] - self.start).astype(np.int64), 0, len(self.days)))
+        if not np.isnat(window[1]):
+            last = int(np.clip((window[1] - self.start).astype(np.int64) + 1, first, len(self.days)))
+
+        load, capacity = self.load[:, first:last], self.capacity[:, first:last]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = np.where(capacity > 0, load / capacity, np.where(load > 0, np.inf, 0.0))
+        over = self.over_allocated()[:, first:last]
+        return {
+            "days": [day.isoformat() for day in to_dates(self.days[first:last])],
+            "members": [
+                {
+                    "member": _describe(member),
+                    "load": load[row].round(2).tolist(),
+                    "capacity": capacity[row].round(2).tolist(),
+                    # Share of capacity taken; null where a member with no capacity has load
+                    "utilization": [None if np.isinf(value) else round(float(value), 2) for value in utilization[row]],
+                    "over_allocated_days": int(over[row].sum()),
+                }
+                for row, member in enumerate(self.members)
+            ],
+        }
+
+    def as_dict(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> dict:
+        return {
+            "start_date": to_dates(self.days[:1])[0].isoformat() if len(self.days) else None,
+            "end_date": to_dates(self.days[-1:])[0].isoformat() if len(self.days) else None,
+            "cards": len(self._cards),
+            "unplaced_cards": len(self.unplaced),
+            "heatmap": self.heatmap(start, end),
+            "over_allocations": [
+                {
+                    "member": _describe(allocation.member),
+                    "start_date": allocation.start.isoformat(),
+                    "end_date": allocation.end.isoformat(),
+                    "days": allocation.days,
+                    "peak_load": round(allocation.peak_load, 2),
+                }
+                for allocation in self.over_allocations()
+            ],
+        }
+
+
+def _describe(member: dict) -> dict:
+    """The member as reported, without the time off its capacity was computed from."""
+    return {key: value for key, value in member.items() if key != "time_off"}
@@ -1,8 +1,12 @@
 import os
+import time
 from celery import Celery
+from celery.signals import before_task_publish, task_prerun, task_postrun
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pm_master.settings')
 
+from pm_master.metrics import celery_task_duration_seconds, task_queued, task_started
+
 app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
@@ -11,3 +15,27 @@ app.autodiscover_tasks()
 app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
+
+
+# ================================ Metrics ================================
+# Task timings are pushed to the shared Redis metrics store and served by /metrics.
+
+_task_started_at = {}
+
+
+@before_task_publish.connect
+def record_task_queued(sender=None, headers=None, **kwargs):
+    task_queued(headers["id"])
+
+
+@task_prerun.connect
+def record_task_started(task_id=None, task=None, **kwargs):
+    _task_started_at[task_id] = time.perf_counter()
+    task_started(task_id, task.name)
+
+
+@task_postrun.connect
+def record_task_finished(task_id=None, task=None, state=None, **kwargs):
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None:
+        celery_task_duration_seconds.observe(time.perf_counter() - started_at, task=task.name, state=state or "UNKNOWN")
@@ -0,0 +1,203 @@
+"""
+Prometheus-style metrics shared by the web and worker processes.
+
+Counters and histograms are aggregated in Redis, so observations made in the
+Celery worker and in the web process are served together by `/metrics`.
+Queue gauges are read from the broker at scrape time.
+"""
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.http import HttpResponse
+
+from project.events import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+registry = []
+
+
+def _label_key(labels: dict) -> str:
+    return json.dumps(labels, sort_keys=True)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.key = f"{KEY_PREFIX}:{name}"
+        registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        try:
+            get_redis().hincrbyfloat(self.key, _label_key(labels), amount)
+        except redis.RedisError as e:
+            logger.warning("Could not record metric %s: %s", self.name, e)
+
+    def collect(self, raw: dict) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(json.loads(labels))} {float(value)}"
+            for labels, value in sorted(raw.items())
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.key = f"{KEY_PREFIX}:{name}"
+        registry.append(self)
+
+    def observe(self, value: float, **labels):
+        label_key = _label_key(labels)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for bound in self.buckets:
+                if value <= bound:
+                    pipe.hincrbyfloat(self.key, f"{label_key}|{bound}", 1)
+            pipe.hincrbyfloat(self.key, f"{label_key}|sum", value)
+            pipe.hincrbyfloat(self.key, f"{label_key}|count", 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not record metric %s: %s", self.name, e)
+
+    def collect(self, raw: dict) -> list[str]:
+        series = {}
+        for field, value in raw.items():
+            label_key, _, suffix = field.rpartition("|")
+            series.setdefault(label_key, {})[suffix] = float(value)
+
+        lines = []
+        for label_key, values in sorted(series.items()):
+            labels = json.loads(label_key)
+            for bound in self.buckets:
+                bucket_labels = {**labels, "le": str(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {values.get(str(bound), 0.0)}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {values.get('count', 0.0)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {values.get('sum', 0.0)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {values.get('count', 0.0)}")
+        return lines
+
+
+class Timer:
+    """Context manager that observes the elapsed seconds into a histogram."""
+
+    def __init__(self, histogram: Histogram, **labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started_at, **self.labels)
+        return False
+
+
+# ================================ Metrics ================================
+
+flow_runs_total = Counter("flow_runs_total", "Project flow runs by outcome")
+flow_stage_duration_seconds = Histogram("flow_stage_duration_seconds", "Duration of ProJectFlow stages")
+
+trello_requests_total = Counter("trello_requests_total", "Trello API operations by status code")
+trello_request_duration_seconds = Histogram(
+    "trello_request_duration_seconds", "Latency of Trello API operations",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+llm_request_duration_seconds = Histogram("llm_request_duration_seconds", "Latency of LLM calls")
+llm_tokens_total = Counter("llm_tokens_total", "LLM tokens by model, stage and kind")
+
+cache_requests_total = Counter("cache_requests_total", "Cache lookups by cache and result")
+
+celery_task_queue_wait_seconds = Histogram("celery_task_queue_wait_seconds", "Time tasks spent queued before a worker picked them up")
+celery_task_duration_seconds = Histogram("celery_task_duration_seconds", "Celery task run time")
+
+# Publish timestamps of queued tasks, used to report the age of the oldest one
+QUEUED_TASKS_KEY = f"{KEY_PREFIX}:celery_queued_tasks"
+# Tasks that never reach a worker (revoked, lost) are forgotten after this long
+QUEUED_TASKS_RETENTION = 60 * 60 * 24
+
+
+def task_queued(task_id: str):
+    try:
+        get_redis().zadd(QUEUED_TASKS_KEY, {task_id: time.time()})
+    except redis.RedisError as e:
+        logger.warning("Could not record queued task %s: %s", task_id, e)
+
+
+def task_started(task_id: str, task_name: str):
+    try:
+        client = get_redis()
+        queued_at = client.zscore(QUEUED_TASKS_KEY, task_id)
+        client.zrem(QUEUED_TASKS_KEY, task_id)
+    except redis.RedisError as e:
+        logger.warning("Could not record started task %s: %s", task_id, e)
+        return
+    if queued_at is not None:
+        celery_task_queue_wait_seconds.observe(time.time() - queued_at, task=task_name)
+
+
+def _queue_gauges() -> list[str]:
+    lines = [
+        "# HELP celery_queue_length Messages waiting in the Celery broker queue",
+        "# TYPE celery_queue_length gauge",
+        "# HELP celery_oldest_task_age_seconds Age of the oldest task still waiting for a worker",
+        "# TYPE celery_oldest_task_age_seconds gauge",
+    ]
+    try:
+        broker = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+        queue = getattr(settings, "CELERY_TASK_DEFAULT_QUEUE", "celery")
+        lines.append(f'celery_queue_length{{queue="{queue}"}} {broker.llen(queue)}')
+
+        client = get_redis()
+        client.zremrangebyscore(QUEUED_TASKS_KEY, "-inf", time.time() - QUEUED_TASKS_RETENTION)
+        oldest = client.zrange(QUEUED_TASKS_KEY, 0, 0, withscores=True)
+        age = time.time() - oldest[0][1] if oldest else 0
+        lines.append(f"celery_oldest_task_age_seconds {age}")
+    except redis.RedisError as e:
+        logger.warning("Could not read Celery queue gauges: %s", e)
+    return lines
+
+
+def render_metrics() -> str:
+    client = get_redis()
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        try:
+            raw = client.hgetall(metric.key)
+        except redis.RedisError as e:
+            logger.warning("Could not read metric %s: %s", metric.name, e)
+            continue
+        lines.extend(metric.collect(raw))
+    lines.extend(_queue_gauges())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -222,6 +222,62 @@ CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_TASK_ACKS_LATE = True
 CELERY_WORKER_DISABLE_RATE_LIMITS = True
 
+# Redis used for live flow progress events (pub/sub)
+REDIS_URL = getenv("REDIS_URL", CELERY_BROKER_URL)
+# Seconds an event stream stays open without receiving an event before it is closed; each open stream holds a server worker
+EVENT_STREAM_IDLE_TIMEOUT = int(getenv("EVENT_STREAM_IDLE_TIMEOUT", 600))
+
+# Tracing: "file" (JSON lines at TRACE_FILE), "memory" (in-process) or "none"
+TRACE_EXPORTER = getenv("TRACE_EXPORTER", "file")
+TRACE_FILE = getenv("TRACE_FILE", str(BASE_DIR / "traces.jsonl"))
+
+# LLM backend: "live" (OpenAI), "record" (OpenAI, saving completions to LLM_FIXTURES)
+# or "replay" (serve the recorded completions, no OpenAI access needed)
+LLM_BACKEND = getenv("LLM_BACKEND", "live")
+LLM_FIXTURES = getenv("LLM_FIXTURES", str(BASE_DIR / "fixtures" / "llm.jsonl"))
+# Delay per replayed call: seconds, or "recorded" for the original call's latency
+LLM_REPLAY_LATENCY = getenv("LLM_REPLAY_LATENCY", "0")
+
+# Board backend used by the crews and the project API: "trello" or "local" (in memory)
+BOARD_BACKEND = getenv("BOARD_BACKEND", "trello")
+
+# Trello HTTP cassette: "off", "record" (save traffic to TRELLO_CASSETTE) or "replay".
+# TRELLO_CASSETTE_SPEED scales the recorded timings on replay (1 = original, 0 = no delay)
+TRELLO_CASSETTE_MODE = getenv("TRELLO_CASSETTE_MODE", "off")
+TRELLO_CASSETTE = getenv("TRELLO_CASSETTE", str(BASE_DIR / "fixtures" / "trello.jsonl"))
+TRELLO_CASSETTE_SPEED = float(getenv("TRELLO_CASSETTE_SPEED", 1))
+
+# Trello requests allowed per 10 seconds (Trello's limit per token is 100); 0 disables the client-side limit
+TRELLO_RATE_LIMIT = int(getenv("TRELLO_RATE_LIMIT", 100))
+
+# Cards the execution crew creates in parallel (1 = one after another)
+EXECUTION_CONCURRENCY = int(getenv("EXECUTION_CONCURRENCY", 1))
+
+# Card date updates sent to the board in parallel when cards are rescheduled
+BOARD_SYNC_CONCURRENCY = int(getenv("BOARD_SYNC_CONCURRENCY", 4))
+
+# Checks on the plan before any card is created: "repair" fixes trivial problems and skips cards
+# that are still invalid, "strict" fails the run on any violation, "off" disables the checks
+PLAN_VALIDATION = getenv("PLAN_VALIDATION", "repair")
+
+# "single": one planning crew run produces the whole plan; "workstreams": the project is outlined
+# into workstreams whose cards are generated concurrently and merged (for large projects)
+PLANNING_MODE = getenv("PLANNING_MODE", "single")
+
+# Stream the planned tasks to the execution crew while they are generated, through a queue of this size
+PLAN_STREAMING = getenv("PLAN_STREAMING", "false").lower() == "true"
+PLAN_STREAM_QUEUE_SIZE = int(getenv("PLAN_STREAM_QUEUE_SIZE", 8))
+
+# Days the scheduler counts as working days when it dates the plan (a NumPy weekmask)
+SCHEDULE_WEEKMASK = getenv("SCHEDULE_WEEKMASK", "Mon Tue Wed Thu Fri")
+
+# Cards a member can work on per working day before the workload views flag them as over-allocated
+WORKLOAD_DAILY_CAPACITY = float(getenv("WORKLOAD_DAILY_CAPACITY", 1))
+
+# Projects (and organizations) whose dependency graph, member index and workload matrix
+# each process keeps in memory; the least recently used are dropped and rebuilt on demand
+PROJECT_CACHE_SIZE = int(getenv("PROJECT_CACHE_SIZE", 256))
+
 
 EMAIL_HOST_USER = getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = getenv('EMAIL_HOST_PASSWORD')
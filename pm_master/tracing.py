@@ -0,0 +1,96 @@
+"""
+Span-based tracing for project runs.
+
+A trace is opened per HTTP request, carried through the Celery message as a
+W3C traceparent carrier and continued by the flow, crew tasks, LLM calls and
+Trello calls. Spans are exported locally (JSON lines file or in-process
+memory), so no collector service is needed.
+
+We keep our own TracerProvider instead of the global one because crewai
+installs its own global provider for its telemetry.
+"""
+import asyncio
+import functools
+import threading
+
+from django.conf import settings
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON document per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = [span.to_json(indent=None) for span in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+memory_exporter = InMemorySpanExporter()
+_propagator = TraceContextTextMapPropagator()
+
+
+def _build_provider() -> TracerProvider:
+    provider = TracerProvider(resource=Resource.create({"service.name": "pm_master"}))
+
+    exporter = getattr(settings, "TRACE_EXPORTER", "file")
+    if exporter == "file":
+        provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(settings.TRACE_FILE)))
+    elif exporter == "memory":
+        provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+
+    return provider
+
+
+provider = _build_provider()
+tracer = provider.get_tracer("pm_master")
+
+
+def inject_context() -> dict:
+    """Serializes the current span context into a carrier that can travel in a Celery message."""
+    carrier = {}
+    _propagator.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: dict = None):
+    return _propagator.extract(carrier or {})
+
+
+def traced(name: str, **attributes):
+    """Runs the decorated function (sync or async) inside a child span of the current trace."""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(name, attributes=attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
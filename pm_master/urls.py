@@ -4,6 +4,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from pm_master.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Project Manager API",
@@ -23,6 +25,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path(f"{api_path}organization/", include("organization.urls")),
     path(f"{api_path}project/", include("project.urls")),
+    path("metrics", metrics_view, name="metrics"),
 
     # path("swagger<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"),
     path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
@@ -0,0 +1,55 @@
+"""
+Saving locally recomputed card dates and pushing them to the board.
+
+Rescheduling decides every new date locally; the board only has to be told.
+The changed cards are saved with one `bulk_update`, then sent as one batch of
+date-only updates, run concurrently on up to `BOARD_SYNC_CONCURRENCY`
+threads. A card that fails does not stop the others; the failures are
+returned so the caller can report them, and the database keeps the new dates
+either way.
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from integrations.boards import get_board_integration
+from project.models import ProjectCard
+
+logger = logging.getLogger(__name__)
+
+
+def save_card_dates(cards: list[ProjectCard]):
+    """Saves the cards' start and end dates in one query; call inside the caller's transaction."""
+    # bulk_update does not touch auto_now fields; the workload caches pick changed cards up by updated_at
+    now = timezone.now()
+    for card in cards:
+        card.updated_at = now
+    ProjectCard.objects.bulk_update(cards, ["start_date", "end_date", "updated_at"], batch_size=500)
+
+
+def push_card_dates(cards: Iterable[ProjectCard]) -> list[dict]:
+    """Sends the cards' start and end dates to the board; returns the cards that could not be updated."""
+    cards = [card for card in cards if card.trello_card_id]
+    if not cards:
+        return []
+
+    board = get_board_integration()
+
+    def push(card: ProjectCard):
+        board.update_card_dates(card.trello_card_id, card.start_date, card.end_date)
+
+    failures = []
+    # The board override and the trace context are carried into the worker threads
+    with ThreadPoolExecutor(max_workers=max(settings.BOARD_SYNC_CONCURRENCY, 1)) as pool:
+        futures = [(card, pool.submit(contextvars.copy_context().run, push, card)) for card in cards]
+        for card, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning("Could not update the dates of card %s on the board: %s", card.trello_card_id, e)
+                failures.append({"id": card.id, "trello_card_id": card.trello_card_id, "error": str(e)})
+    return failures
@@ -0,0 +1,56 @@
+"""
+Bounded in-process caches of per-project planning structures.
+
+Dependency graphs, member indexes and workload matrices are kept in memory
+by the process that built them, keyed by project (or organization). A web
+worker lives long and sees many projects, so each cache keeps only the
+`PROJECT_CACHE_SIZE` most recently used entries; an evicted entry is simply
+rebuilt from the database the next time it is needed.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from django.conf import settings
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe mapping that drops its least recently used entry beyond `size` entries."""
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size if size is not None else settings.PROJECT_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V):
+        with self._lock:
+            self._set(key, value)
+
+    def get_or_set(self, key: Hashable, create: Callable[[], V], valid: Callable[[V], bool] = lambda value: True) -> V:
+        """The entry of `key`, replaced with `create()` if missing or not `valid`."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None or not valid(value):
+                value = create()
+                self._set(key, value)
+            else:
+                self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: Hashable, value: V):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(self.size, 1):
+            self._entries.popitem(last=False)
@@ -0,0 +1,136 @@
+import json
+import logging
+import time
+from typing import Optional
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# How many events are kept per project so late subscribers can catch up
+EVENT_LOG_SIZE = 500
+EVENT_LOG_TTL = 60 * 60 * 24
+HEARTBEAT_SECONDS = 15
+
+TERMINAL_EVENTS = {"flow_finished", "flow_failed"}
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def _channel(project_id: str) -> str:
+    return f"project:{project_id}:events"
+
+
+def _log_key(project_id: str) -> str:
+    return f"project:{project_id}:events:log"
+
+
+def _seq_key(project_id: str) -> str:
+    return f"project:{project_id}:events:seq"
+
+
+def reset_events(project_id: str):
+    """
+    Drops the replay log of a project before a new run starts.
+    The sequence counter is kept so event IDs stay monotonic across runs.
+    """
+    try:
+        get_redis().delete(_log_key(project_id))
+    except redis.RedisError as e:
+        logger.warning("Could not reset event log for project %s: %s", project_id, e)
+
+
+def publish_event(project_id: str, event: str, data: dict = None):
+    """
+    Publishes a progress event for a project and appends it to the replay log.
+    Redis failures are logged and swallowed so they never break a flow run.
+    """
+    if not project_id:
+        return None
+
+    client = get_redis()
+    try:
+        event_id = client.incr(_seq_key(project_id))
+        message = json.dumps({"id": event_id, "event": event, "data": data or {}}, default=str)
+
+        pipe = client.pipeline()
+        pipe.rpush(_log_key(project_id), message)
+        pipe.ltrim(_log_key(project_id), -EVENT_LOG_SIZE, -1)
+        pipe.expire(_log_key(project_id), EVENT_LOG_TTL)
+        pipe.expire(_seq_key(project_id), EVENT_LOG_TTL)
+        pipe.publish(_channel(project_id), message)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Could not publish %s event for project %s: %s", event, project_id, e)
+        return None
+
+    return event_id
+
+
+def format_sse(message: dict) -> str:
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+def stream_events(project_id: str, last_event_id: int = 0, heartbeat: int = HEARTBEAT_SECONDS,
+                  idle_timeout: Optional[int] = None):
+    """
+    Yields server-sent event frames for a project.
+
+    Subscribes first and then replays the log, so nothing published in between
+    is lost; duplicates are dropped by event ID. The stream ends after a
+    terminal event and sends comment frames as keep-alives while idle. A client
+    may connect before the run's worker publishes `flow_started`, so the stream
+    waits for events whether or not a run has started; it ends when no event
+    arrives for `idle_timeout` seconds (EVENT_STREAM_IDLE_TIMEOUT; a worker that
+    died never publishes its terminal event), or when Redis fails.
+
+    The response is a synchronous generator, so each open stream holds a server
+    worker (a WSGI process or thread) for up to `idle_timeout` seconds after
+    its last event. Size the worker pool for the number of concurrent viewers.
+    """
+    if idle_timeout is None:
+        idle_timeout = settings.EVENT_STREAM_IDLE_TIMEOUT
+    client = get_redis()
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+
+    try:
+        pubsub.subscribe(_channel(project_id))
+        seen = last_event_id
+        for raw in client.lrange(_log_key(project_id), 0, -1):
+            message = json.loads(raw)
+            if message["id"] <= seen:
+                continue
+            seen = message["id"]
+            yield format_sse(message)
+            if message["event"] in TERMINAL_EVENTS:
+                return
+
+        idle_since = time.monotonic()
+        while True:
+            raw = pubsub.get_message(timeout=heartbeat)
+            if raw is None:
+                if time.monotonic() - idle_since >= idle_timeout:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            message = json.loads(raw["data"])
+            if message["id"] <= seen:
+                continue
+            seen = message["id"]
+            idle_since = time.monotonic()
+            yield format_sse(message)
+            if message["event"] in TERMINAL_EVENTS:
+                return
+    except redis.RedisError as e:
+        logger.warning("Event stream of project %s ended: %s", project_id, e)
+    finally:
+        pubsub.close()
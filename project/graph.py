@@ -0,0 +1,37 @@
+"""
+Per-project card dependency graphs.
+
+A project's `DependencyGraph` is built from its `ProjectCard` and
+`CardDependency` rows the first time it is needed and rebuilt when either
+changes. Cards and dependencies are only ever added or deleted, so whether
+they changed is one aggregate query per table: row count, highest ID and
+latest creation time (SQLite can hand a deleted highest ID to the next row).
+"""
+from django.db.models import Count, Max
+
+from planning.graph import DependencyGraph
+from project.caching import LRUCache
+from project.models import CardDependency, ProjectCard
+
+# project ID -> (row stamp, graph of ProjectCard IDs)
+_graphs: LRUCache[tuple[tuple, DependencyGraph]] = LRUCache()
+
+
+def dependency_graph(project_id) -> DependencyGraph:
+    """The graph of the project's cards (by ProjectCard ID), rebuilt if cards or dependencies were added or removed."""
+    cards = ProjectCard.objects.filter(project_id=project_id)
+    dependencies = CardDependency.objects.filter(project_id=project_id)
+    stamp = (
+        tuple(cards.aggregate(count=Count("id"), last=Max("id"), created_at=Max("created_at")).values()),
+        tuple(dependencies.aggregate(count=Count("id"), last=Max("id"), created_at=Max("created_at")).values()),
+    )
+    cached = _graphs.get(str(project_id))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    graph = DependencyGraph(
+        cards.order_by("id").values_list("id", flat=True),
+        dependencies.values_list("card_id", "depends_on_id"),
+    )
+    _graphs.set(str(project_id), (stamp, graph))
+    return graph
@@ -0,0 +1,33 @@
+"""
+Per-project TF-IDF member indexes.
+
+An index is built from a project's `ProjectMember` rows the first time it is
+needed and rebuilt when the rows change. Whether they changed is one
+aggregate query (member count and latest `updated_at`), so every process
+notices edits made by any other process without rebuilding on every request.
+"""
+from django.db.models import Count, Max
+
+from planning.matching import MemberIndex
+from project.caching import LRUCache
+from project.models import ProjectMember
+
+# project ID -> (row stamp, index)
+_indexes: LRUCache[tuple[tuple, MemberIndex]] = LRUCache()
+
+
+def member_index(project_id) -> MemberIndex:
+    """The project's member index, rebuilt if its members were added, edited or removed since the last call."""
+    members = ProjectMember.objects.filter(project_id=project_id)
+    stamp = tuple(members.aggregate(count=Count("id"), updated_at=Max("updated_at")).values())
+    cached = _indexes.get(str(project_id))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    index = MemberIndex([
+        {"id": member.id, "name": member.name, "email": member.email, "role": member.role,
+         "skills": member.skills, "trello_member_id": member.trello_member_id}
+        for member in members.order_by("id")
+    ])
+    _indexes.set(str(project_id), (stamp, index))
+    return index
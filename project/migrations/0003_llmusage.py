@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_project_industry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(db_index=True)),
+                ('stage', models.CharField(max_length=64)),
+                ('task_name', models.CharField(blank=True, default='', max_length=255)),
+                ('agent_role', models.CharField(blank=True, default='', max_length=255)),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_hash', models.CharField(db_index=True, max_length=64)),
+                ('prompt_excerpt', models.TextField(blank=True, default='')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('cached_tokens', models.PositiveIntegerField(default=0)),
+                ('cost', models.DecimalField(decimal_places=6, default=0, max_digits=12)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('cache_hit', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_usage', to='project.project')),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:04
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_llmusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanPreview',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('run_id', models.UUIDField()),
+                ('card_specifications', models.JSONField(default=list)),
+                ('board_lists', models.JSONField(default=list)),
+                ('summary', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('preview', 'Preview'), ('committing', 'Committing'), ('committed', 'Committed')], default='preview', max_length=20)),
+                ('commit_run_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('committed_at', models.DateTimeField(blank=True, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plan_previews', to='project.project')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
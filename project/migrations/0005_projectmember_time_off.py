@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_planpreview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmember',
+            name='time_off',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
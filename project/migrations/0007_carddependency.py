@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_projectcard_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectcard',
+            name='task_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.CreateModel(
+            name='CardDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='project.projectcard')),
+                ('depends_on', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependents', to='project.projectcard')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='project.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('card', 'depends_on'), name='unique_card_dependency')],
+            },
+        ),
+    ]
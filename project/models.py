@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models import Count, Max, Min, Sum
 from uuid import uuid4
 
 from organization.models import Organization
+from planning.skills import skill_taxonomy
 # Create your models here.
 
 class Project(models.Model):
@@ -33,6 +35,8 @@ class ProjectMember(models.Model):
     role = models.CharField(max_length=255)
     skills = models.JSONField(default=list)
     trello_member_id = models.CharField(max_length=255, null=True, blank=True)
+    # Days the member is away: [{"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}], both included
+    time_off = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,6 +47,10 @@ class ProjectMember(models.Model):
     def set_trello_member_id(self, trello_member_id):
         self.trello_member_id = trello_member_id
         self.save()
+    @property
+    def skill_bits(self):
+        """Bitset of the member's normalized skills in the shared skill taxonomy"""
+        return skill_taxonomy.bits(self.skills)
 
 class ProjectTList(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
@@ -64,10 +72,129 @@ class ProjectCard(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     trello_card_id = models.CharField(max_length=255, null=True, blank=True)
+    # ID of the planned task the card was created from, which its dependencies refer to
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+    trello_list_id = models.CharField(max_length=255, null=True, blank=True)
+    assignee = models.ForeignKey(ProjectMember, on_delete=models.SET_NULL, null=True, blank=True, related_name="cards")
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} - {self.project.name}"
     def get_trello_card_id(self):
         return self.trello_card_id
+
+
+class CardDependency(models.Model):
+    """`card` cannot start before `depends_on` is done."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    card = models.ForeignKey(ProjectCard, on_delete=models.CASCADE, related_name="dependencies")
+    depends_on = models.ForeignKey(ProjectCard, on_delete=models.CASCADE, related_name="dependents")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["card", "depends_on"], name="unique_card_dependency"),
+        ]
+
+    def __str__(self):
+        return f"{self.card.name} -> {self.depends_on.name}"
+
+
+class LLMUsageQuerySet(models.QuerySet):
+    def for_organization(self, organization_id):
+        return self.filter(project__organization_id=organization_id)
+
+    def _usage_totals(self):
+        return {
+            "calls": Count("id"),
+            "prompt_tokens": Sum("prompt_tokens"),
+            "completion_tokens": Sum("completion_tokens"),
+            "cached_tokens": Sum("cached_tokens"),
+            "cost": Sum("cost"),
+            "latency_ms": Sum("latency_ms"),
+            "cache_hits": Count("id", filter=models.Q(cache_hit=True)),
+        }
+
+    def totals(self):
+        return self.aggregate(**self._usage_totals())
+
+    def by_stage(self):
+        return self.values("stage").annotate(**self._usage_totals()).order_by("stage")
+
+    def by_project(self):
+        return (
+            self.values("project_id", "project__name")
+            .annotate(**self._usage_totals())
+            .order_by("-cost")
+        )
+
+    def by_run(self):
+        return (
+            self.values("run_id")
+            .annotate(started_at=Min("created_at"), **self._usage_totals())
+            .order_by("-started_at")
+        )
+
+    def most_expensive_prompts(self, limit=10):
+        return (
+            self.values("stage", "task_name", "prompt_hash")
+            .annotate(prompt_excerpt=Max("prompt_excerpt"), **self._usage_totals())
+            .order_by("-cost")[:limit]
+        )
+
+
+class LLMUsage(models.Model):
+    """One LLM call made by a crew during a project run."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="llm_usage")
+    run_id = models.UUIDField(db_index=True)
+    stage = models.CharField(max_length=64)
+    task_name = models.CharField(max_length=255, blank=True, default="")
+    agent_role = models.CharField(max_length=255, blank=True, default="")
+    model = models.CharField(max_length=100)
+    prompt_hash = models.CharField(max_length=64, db_index=True)
+    prompt_excerpt = models.TextField(blank=True, default="")
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    cached_tokens = models.PositiveIntegerField(default=0)
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    cache_hit = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LLMUsageQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.model} ({self.stage}) - {self.project.name}"
+
+
+class PlanPreview(models.Model):
+    """Card specifications of a preview run (research and planning only), kept until committed to the board."""
+    STATUS_PREVIEW = "preview"
+    STATUS_COMMITTING = "committing"
+    STATUS_COMMITTED = "committed"
+    STATUS_CHOICES = [
+        (STATUS_PREVIEW, "Preview"),
+        (STATUS_COMMITTING, "Committing"),
+        (STATUS_COMMITTED, "Committed"),
+    ]
+
+    id = models.UUIDField(default=uuid4, editable=False, unique=True, primary_key=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="plan_previews")
+    run_id = models.UUIDField()
+    card_specifications = models.JSONField(default=list)
+    # Lists the planning crew created on the sandbox board: [{"id", "name", "pos"}]
+    board_lists = models.JSONField(default=list)
+    summary = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PREVIEW)
+    commit_run_id = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Plan preview {self.id} ({self.status}) - {self.project.name}"
@@ -0,0 +1,73 @@
+"""
+Rescheduling a project's cards when one of them slips.
+
+The new dates of the moved card are propagated through the project's cached
+dependency graph (`planning/propagation.py`), so only the dates of the cards
+downstream of it, and of their dependencies, are loaded and only the cards
+that have to move are written: in one `bulk_update`, and to the board in one
+batch. No plan is regenerated.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from django.db import transaction
+
+from planning.calendar import DateLike, parse_dates
+from planning.propagation import DateChange, propagate_delay, propagation_inputs
+from project.board_sync import push_card_dates, save_card_dates
+from project.graph import dependency_graph
+from project.models import ProjectCard
+
+
+@dataclass
+class Rescheduling:
+    changes: list[DateChange] = field(default_factory=list)
+    # Cards whose new dates could not be sent to the board
+    push_failures: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "changes": [
+                {
+                    "id": change.node,
+                    "previous_start_date": change.previous_start.isoformat() if change.previous_start else None,
+                    "previous_end_date": change.previous_end.isoformat() if change.previous_end else None,
+                    "start_date": change.start.isoformat() if change.start else None,
+                    "end_date": change.end.isoformat() if change.end else None,
+                    "shift_days": change.shift,
+                }
+                for change in self.changes
+            ],
+            "push_failures": self.push_failures,
+        }
+
+
+def reschedule_card(card: ProjectCard, start_date: Optional[DateLike] = None, end_date: Optional[DateLike] = None,
+                    dry_run: bool = False) -> Rescheduling:
+    """
+    Moves the card to the new dates (see `propagate_delay` for either being None) and the cards it blocks
+    as far as they have to; with `dry_run`, the changes are only computed.
+    """
+    project = card.project
+    graph = dependency_graph(project.id)
+    # Only the dates of the cards downstream of the card, and of their dependencies, are read
+    rows = list(ProjectCard.objects.filter(project=project, id__in=propagation_inputs(graph, card.id)).values_list(
+        "id", "start_date", "end_date",
+    ))
+    positions = [graph.position(card_id) for card_id, _, _ in rows]
+    starts = np.full(len(graph), np.datetime64("NaT"), dtype="datetime64[D]")
+    ends = starts.copy()
+    starts[positions] = parse_dates([start for _, start, _ in rows])
+    ends[positions] = parse_dates([end for _, _, end in rows])
+    changes = propagate_delay(graph, starts, ends, card.id, start_date, end_date, project.organization.working_calendar())
+    if dry_run or not changes:
+        return Rescheduling(changes=changes)
+
+    cards = ProjectCard.objects.in_bulk([change.node for change in changes])
+    for change in changes:
+        cards[change.node].start_date, cards[change.node].end_date = change.start, change.end
+    with transaction.atomic():
+        save_card_dates(list(cards.values()))
+
+    return Rescheduling(changes=changes, push_failures=push_card_dates(cards.values()))
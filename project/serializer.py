@@ -1,18 +1,26 @@
 from rest_framework import serializers
 
-from integrations.trello import TrelloIntegration
+from integrations.boards import get_board_integration
 from organization.models import Organization
-from .models import Project, ProjectMember, ProjectTList, ProjectCard
+from .models import PlanPreview, Project, ProjectMember, ProjectTList, ProjectCard
 from pydantic import BaseModel
 from django.utils import timezone
 
-trello_integration = TrelloIntegration()
+class TimeOffSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=True)
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError("Time off cannot end before it starts")
+        return attrs
 
 class TeamMemberSerializer(serializers.Serializer):
     name = serializers.CharField(required=True)
     email = serializers.EmailField(required=True)
     role = serializers.CharField(required=True)
     skills = serializers.ListField(child=serializers.CharField(), required=True)
+    # Days the member is away, excluded from their capacity
+    time_off = serializers.ListField(child=TimeOffSerializer(), required=False, default=list)
 
 class TimelineSerializer(serializers.Serializer):
     start_date = serializers.DateField(required=True)
@@ -30,6 +38,8 @@ class CreateProjectSerializer(serializers.ModelSerializer):
     team_members = serializers.ListField(child=TeamMemberSerializer(), write_only=True)
     organization_id = serializers.CharField(required=True)
     timeline = TimelineSerializer(required=True, write_only=True)
+    # Preview projects only run research and planning; the board is created when the plan is committed
+    preview = serializers.BooleanField(required=False, default=False, write_only=True)
     def validate_team_members(self, value):
         for member in value:
             if 'name' not in member:
@@ -47,22 +57,28 @@ class CreateProjectSerializer(serializers.ModelSerializer):
         return value
     class Meta:
         model = Project
-        fields = ['id', 'name', 'description', 'industry', 'team_members', 'timeline', "trello_board_id", "organization_id"]
+        fields = ['id', 'name', 'description', 'industry', 'team_members', 'timeline', "trello_board_id", "organization_id", "preview"]
     def create(self, validated_data):
         # Extract non-model fields
         team_members_data = validated_data.pop('team_members', [])
         timeline_data = validated_data.pop('timeline')
         organization_id = validated_data.pop('organization_id')
+        preview = validated_data.pop('preview', False)
 
-        # Create Trello board
-        board = trello_integration.create_board(
-            validated_data['name'],
-            validated_data['description'],
-            team_members_data
-        )
+        board = None
+        member_mapping = {}
+        if not preview:
+            # Resolved per request so BOARD_BACKEND and use_board_integration() are honoured
+            board_integration = get_board_integration()
+            # Create Trello board
+            board = board_integration.create_board(
+                validated_data['name'],
+                validated_data['description'],
+                team_members_data
+            )
 
-        # Invite team members to board and get their Trello member IDs
-        member_mapping = trello_integration.invite_team_members(board['id'], team_members_data)
+            # Invite team members to board and get their Trello member IDs
+            member_mapping = board_integration.invite_team_members(board['id'], team_members_data)
 
         # Get organization
         organization = Organization.objects.get(id=organization_id)
@@ -75,7 +91,7 @@ class CreateProjectSerializer(serializers.ModelSerializer):
             industry=validated_data.get('industry'),
             start_date=timeline_data['start_date'],
             end_date=timeline_data['end_date'],
-            trello_board_id=board['id']
+            trello_board_id=board['id'] if board else None
         )
 
         # Save team members to ProjectMember model with their Trello IDs
@@ -87,10 +103,97 @@ class CreateProjectSerializer(serializers.ModelSerializer):
                 email=member_data['email'],
                 role=member_data['role'],
                 skills=member_data['skills'],
-                trello_member_id=trello_member_id  # Set the Trello ID from the mapping
+                trello_member_id=trello_member_id,  # Set the Trello ID from the mapping
+                time_off=[
+                    {"start_date": str(time_off['start_date']), "end_date": str(time_off['end_date'])}
+                    for time_off in member_data.get('time_off', [])
+                ],
             )
 
         return project
 
 
+
+class MatchTaskSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False)
+    title = serializers.CharField(required=True)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class MemberMatchRequestSerializer(serializers.Serializer):
+    # Without tasks, the project's cards are ranked
+    tasks = serializers.ListField(child=MatchTaskSerializer(), required=False)
+    limit = serializers.IntegerField(required=False, default=3, min_value=1, max_value=50)
+
+
+class RiskTaskSerializer(serializers.Serializer):
+    id = serializers.CharField(required=True)
+    title = serializers.CharField(required=False, allow_blank=True)
+    # Working days: most likely, and optionally the best and worst case
+    estimate_days = serializers.FloatField(required=True, min_value=0)
+    optimistic_days = serializers.FloatField(required=False, min_value=0)
+    pessimistic_days = serializers.FloatField(required=False, min_value=0)
+    depends_on = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    def validate(self, attrs):
+        if attrs.get('optimistic_days', attrs['estimate_days']) > attrs['estimate_days']:
+            raise serializers.ValidationError("Optimistic estimate cannot exceed the estimate")
+        if attrs.get('pessimistic_days', attrs['estimate_days']) < attrs['estimate_days']:
+            raise serializers.ValidationError("Pessimistic estimate cannot be below the estimate")
+        return attrs
+
+
+class ScheduleRiskRequestSerializer(serializers.Serializer):
+    # Simulated synchronously, so the plan size is bounded
+    tasks = serializers.ListField(child=RiskTaskSerializer(), required=True, allow_empty=False, max_length=500)
+    samples = serializers.IntegerField(required=False, default=20000, min_value=1000, max_value=100000)
+    # Makes the simulation reproducible
+    seed = serializers.IntegerField(required=False)
+
+
+class RescheduleCardSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    # Only compute the date changes
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if "start_date" not in data and "end_date" not in data:
+            raise serializers.ValidationError("Give a new start_date, end_date or both")
+        if "start_date" in data and "end_date" in data and data["end_date"] < data["start_date"]:
+            raise serializers.ValidationError("end_date must be on or after start_date")
+        return data
+
+
+class TimelineShiftSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    # Defaults to the current length of the project
+    end_date = serializers.DateField(required=False)
+    # Keep each card's offset and length in working days rather than calendar days
+    working_days = serializers.BooleanField(default=True)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if "end_date" in data and data["end_date"] < data["start_date"]:
+            raise serializers.ValidationError("end_date must be on or after start_date")
+        return data
+
+
+class PlanPreviewSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlanPreview
+        fields = ['id', 'project', 'run_id', 'status', 'summary', 'created_at', 'commit_run_id', 'committed_at']
+
+
+class PlanPreviewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlanPreview
+        fields = PlanPreviewSummarySerializer.Meta.fields + ['board_lists', 'card_specifications']
+
+
+class ProjectCardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProjectCard
+        fields = ['id', 'name', 'task_id', 'trello_card_id', 'trello_list_id', 'assignee', 'start_date', 'end_date']
+
+
 # class updateProjectSerializer(serializers.ModelSerializer):
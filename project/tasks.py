@@ -1,24 +1,37 @@
 import asyncio
 from celery import shared_task
-from .models import Project, ProjectMember
-from crews.main import run_flow
+from django.utils import timezone
+from .models import PlanPreview, Project, ProjectMember
+from crews.main import run_flow, run_plan_commit
+from integrations.boards import get_board_integration
+from pm_master.tracing import extract_context, tracer
 
 
 
 
 @shared_task
-def create_project(project_id: str):
+def create_project(project_id: str, trace_context: dict = None, mode: str = "full"):
+    # Continue the trace opened by the HTTP request that queued this task
+    with tracer.start_as_current_span("create_project", context=extract_context(trace_context)) as span:
+        span.set_attribute("project.id", project_id)
+        span.set_attribute("flow.mode", mode)
+        return _create_project(project_id, mode)
+
+
+def _create_project(project_id: str, mode: str = "full"):
     project = Project.objects.get(id=project_id)
     team_members = ProjectMember.objects.filter(project=project)
 
     # Convert QuerySet to list of dicts for serialization
     team_members_list = [
         {
+            "id": member.id,
             "name": member.name,
             "email": member.email,
             "role": member.role,
             "skills": member.skills,
-            "trello_member_id": member.trello_member_id
+            "trello_member_id": member.trello_member_id,
+            "time_off": member.time_off,
         }
         for member in team_members
     ]
@@ -30,11 +43,12 @@ def create_project(project_id: str):
     "team_members": team_members_list,
     "project_timeline": f"{project.start_date} to {project.end_date}",
     "board_id": project.trello_board_id,
-    "project_id": str(project.id)
+    "project_id": str(project.id),
+    "holidays": project.organization.holidays,
 }
 
     # Use asyncio.run() to properly execute the async function
-    result = asyncio.run(run_flow(project_data))
+    result = asyncio.run(run_flow(project_data, mode=mode))
 
     # Make sure to return a JSON-serializable result
     return {
@@ -42,3 +56,63 @@ def create_project(project_id: str):
         "project_id": str(project.id),
         "result": str(result)  # Convert result to string if needed
     }
+
+
+@shared_task
+def commit_plan_preview(preview_id: str, trace_context: dict = None):
+    with tracer.start_as_current_span("commit_plan_preview", context=extract_context(trace_context)) as span:
+        span.set_attribute("plan_preview.id", preview_id)
+        preview = PlanPreview.objects.select_related("project").get(id=preview_id)
+        try:
+            return _commit_plan_preview(preview)
+        except Exception:
+            # Let the preview be committed again
+            PlanPreview.objects.filter(id=preview.id).update(status=PlanPreview.STATUS_PREVIEW)
+            raise
+
+
+def _provision_board(project: Project):
+    """Creates the Trello board of a project that was created in preview mode, and invites its members."""
+    board_integration = get_board_integration()
+    board = board_integration.create_board(project.name, project.description, [])
+    project.set_trello_board_id(board["id"])
+
+    members = list(ProjectMember.objects.filter(project=project))
+    member_mapping = board_integration.invite_team_members(
+        board["id"],
+        [{"name": member.name, "email": member.email} for member in members],
+    )
+    for member in members:
+        if member_mapping.get(member.email):
+            member.set_trello_member_id(member_mapping[member.email])
+
+
+def _commit_plan_preview(preview: PlanPreview):
+    project = preview.project
+    if not project.trello_board_id:
+        _provision_board(project)
+
+    run_id, result = asyncio.run(run_plan_commit({
+        "project_id": str(project.id),
+        "board_id": project.trello_board_id,
+        "project_timeline": f"{project.start_date} to {project.end_date}",
+        "board_lists": preview.board_lists,
+        "card_specifications": preview.card_specifications,
+        "holidays": project.organization.holidays,
+        "board_member_ids": dict(
+            ProjectMember.objects.filter(project=project, trello_member_id__isnull=False)
+            .values_list("id", "trello_member_id")
+        ),
+    }))
+
+    preview.status = PlanPreview.STATUS_COMMITTED
+    preview.commit_run_id = run_id
+    preview.committed_at = timezone.now()
+    preview.save(update_fields=["status", "commit_run_id", "committed_at"])
+
+    return {
+        "status": "success",
+        "project_id": str(project.id),
+        "preview_id": str(preview.id),
+        "result": str(result)
+    }
@@ -1,3 +1,273 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import date
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+import fakeredis
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from integrations.boards import use_board_integration
+from integrations.local_board import LocalBoardIntegration
+from organization.models import Organization, User
+from project.events import publish_event, reset_events, stream_events
+from project.models import CardDependency, PlanPreview, Project, ProjectCard, ProjectMember
+from project.serializer import CreateProjectSerializer
+
+
+class OrganizationScopedTestCase(TestCase):
+    """A user of one organization, with a project in their organization and one in another."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create(username="admin")
+        cls.organization = Organization.objects.create(name="Acme", admin=admin)
+        cls.other_organization = Organization.objects.create(name="Globex", admin=admin)
+        cls.user = User.objects.create(username="ann", organization=cls.organization)
+        cls.project = cls.create_project(cls.organization)
+        cls.other_project = cls.create_project(cls.other_organization)
+
+    @staticmethod
+    def create_project(organization):
+        return Project.objects.create(
+            name="Shop", description="Web shop", organization=organization,
+            start_date=date(2025, 3, 3), end_date=date(2025, 3, 28),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class ProjectEventsViewTests(OrganizationScopedTestCase):
+    def test_another_organizations_project_is_not_found(self):
+        response = self.client.get(reverse("project_events", args=[self.other_project.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class UsageViewTests(OrganizationScopedTestCase):
+    def test_project_usage_of_another_organization_is_not_found(self):
+        self.assertEqual(self.client.get(reverse("project_usage", args=[self.project.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse("project_usage", args=[self.other_project.id])).status_code, 404)
+
+    def test_usage_of_another_organization_is_not_found(self):
+        response = self.client.get(reverse("organization_usage", args=[self.organization.id]))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse("organization_usage", args=[self.other_organization.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class RescheduleCardViewTests(OrganizationScopedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.design, cls.build, cls.docs = [
+            ProjectCard.objects.create(project=cls.project, name=name, description="", start_date=start, end_date=end)
+            for name, start, end in [
+                ("Design", date(2025, 3, 3), date(2025, 3, 5)),
+                ("Build", date(2025, 3, 6), date(2025, 3, 7)),
+                ("Docs", date(2025, 3, 10), date(2025, 3, 10)),
+            ]
+        ]
+        CardDependency.objects.create(project=cls.project, card=cls.build, depends_on=cls.design)
+        cls.other_card = ProjectCard.objects.create(
+            project=cls.other_project, name="Design", description="", start_date=date(2025, 3, 3), end_date=date(2025, 3, 5),
+        )
+
+    def reschedule(self, card, **data):
+        return self.client.post(reverse("reschedule_card", args=[card.project_id, card.id]), data, format="json")
+
+    def test_moves_the_card_and_its_dependents(self):
+        response = self.reschedule(self.design, end_date="2025-03-07", dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(change["id"], change["start_date"], change["end_date"]) for change in response.json()["changes"]],
+            [(self.design.id, "2025-03-03", "2025-03-07"), (self.build.id, "2025-03-10", "2025-03-11")],
+        )
+
+    def test_another_organizations_card_is_not_moved(self):
+        response = self.reschedule(self.other_card, end_date="2025-03-07")
+        self.assertEqual(response.status_code, 404)
+        self.other_card.refresh_from_db()
+        self.assertEqual(self.other_card.end_date, date(2025, 3, 5))
+
+
+class ProjectTimelineShiftViewTests(OrganizationScopedTestCase):
+    def shift(self, project):
+        return self.client.post(
+            reverse("project_timeline_shift", args=[project.id]), {"start_date": "2025-04-07"}, format="json",
+        )
+
+    def test_shifts_the_project(self):
+        response = self.shift(self.project)
+        self.assertEqual(response.status_code, 200)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.start_date, date(2025, 4, 7))
+
+    def test_another_organizations_project_is_not_shifted(self):
+        self.assertEqual(self.shift(self.other_project).status_code, 404)
+        self.other_project.refresh_from_db()
+        self.assertEqual(self.other_project.start_date, date(2025, 3, 3))
+
+
+class PlanPreviewViewTests(OrganizationScopedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.preview = PlanPreview.objects.create(project=cls.project, run_id=uuid4())
+        cls.other_preview = PlanPreview.objects.create(project=cls.other_project, run_id=uuid4())
+
+    def test_previews_of_another_organization_are_not_found(self):
+        self.assertEqual(self.client.get(reverse("project_plan_previews", args=[self.project.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse("project_plan_previews", args=[self.other_project.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("plan_preview", args=[self.preview.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse("plan_preview", args=[self.other_preview.id])).status_code, 404)
+
+    @mock.patch("project.views.create_project")
+    def test_another_organizations_project_is_not_previewed(self, create_project):
+        self.assertEqual(self.client.post(reverse("project_plan_previews", args=[self.other_project.id])).status_code, 404)
+        create_project.delay.assert_not_called()
+
+    @mock.patch("project.views.commit_plan_preview")
+    def test_another_organizations_preview_is_not_committed(self, commit_plan_preview):
+        self.assertEqual(self.client.post(reverse("commit_plan_preview", args=[self.other_preview.id])).status_code, 404)
+        commit_plan_preview.delay.assert_not_called()
+        self.other_preview.refresh_from_db()
+        self.assertEqual(self.other_preview.status, PlanPreview.STATUS_PREVIEW)
+
+        self.assertEqual(self.client.post(reverse("commit_plan_preview", args=[self.preview.id])).status_code, 202)
+        commit_plan_preview.delay.assert_called_once()
+
+
+class ProjectMemberMatchesViewTests(OrganizationScopedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for project in (cls.project, cls.other_project):
+            ProjectMember.objects.create(project=project, name="Bo", email="bo@example.com", role="Backend developer",
+                                         skills=["Python", "Django"])
+
+    def match(self, project):
+        return self.client.post(
+            reverse("project_member_matches", args=[project.id]), {"tasks": [{"title": "Django API"}]}, format="json",
+        )
+
+    def test_ranks_the_members(self):
+        response = self.match(self.project)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["name"] for c in response.json()["matches"][0]["candidates"]], ["Bo"])
+
+    def test_members_of_another_organization_are_not_matched(self):
+        self.assertEqual(self.match(self.other_project).status_code, 404)
+
+
+class ProjectScheduleRiskViewTests(OrganizationScopedTestCase):
+    def simulate(self, project):
+        return self.client.post(reverse("project_schedule_risk", args=[project.id]), {
+            "tasks": [{"id": "a", "estimate_days": 2}, {"id": "b", "estimate_days": 3, "depends_on": ["a"]}],
+            "samples": 1000, "seed": 1,
+        }, format="json")
+
+    def test_simulates_the_schedule(self):
+        response = self.simulate(self.project)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["planned"]["duration_days"], 5)
+
+    def test_another_organizations_project_is_not_simulated(self):
+        self.assertEqual(self.simulate(self.other_project).status_code, 404)
+
+
+class WorkloadViewTests(OrganizationScopedTestCase):
+    def test_project_workload_of_another_organization_is_not_found(self):
+        self.assertEqual(self.client.get(reverse("project_workload", args=[self.project.id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse("project_workload", args=[self.other_project.id])).status_code, 404)
+
+    def test_workload_of_another_organization_is_not_found(self):
+        response = self.client.get(reverse("organization_workload", args=[self.organization.id]))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse("organization_workload", args=[self.other_organization.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CardDependenciesViewTests(OrganizationScopedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.design, cls.build = [
+            ProjectCard.objects.create(project=cls.project, name=name, description="") for name in ("Design", "Build")
+        ]
+        CardDependency.objects.create(project=cls.project, card=cls.build, depends_on=cls.design)
+        cls.other_card = ProjectCard.objects.create(project=cls.other_project, name="Design", description="")
+
+    def test_dependencies_of_the_card(self):
+        response = self.client.get(reverse("card_dependencies", args=[self.project.id, self.design.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card["name"] for card in response.json()["blocks"]], ["Build"])
+
+    def test_another_organizations_card_is_not_found(self):
+        response = self.client.get(reverse("card_dependencies", args=[self.other_project.id, self.other_card.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CreateProjectSerializerTests(OrganizationScopedTestCase):
+    def test_the_board_is_created_on_the_backend_in_use(self):
+        serializer = CreateProjectSerializer(data={
+            "name": "Blog", "description": "Company blog", "organization_id": str(self.organization.id),
+            "timeline": {"start_date": "2099-03-02", "end_date": "2099-03-27"},
+            "team_members": [{"name": "Ann", "email": "ann@example.com", "role": "Developer", "skills": ["Python"]}],
+        })
+        serializer.is_valid(raise_exception=True)
+        with use_board_integration(LocalBoardIntegration()) as board:
+            project = serializer.save()
+        self.assertIn(project.trello_board_id, board.boards)
+        [member] = board.get_team_members(project.trello_board_id)
+        self.assertEqual(project.projectmember_set.get().trello_member_id, member["id"])
+
+
+class EventStreamTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("project.events._client", fakeredis.FakeRedis(decode_responses=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def frames(self, project_id, **kwargs):
+        return [frame for frame in stream_events(project_id, heartbeat=0.05, **kwargs)]
+
+    def test_replays_the_log_up_to_the_terminal_event(self):
+        for event in ("flow_started", "stage_started", "flow_finished", "stage_started"):
+            publish_event("p1", event, {"stage": "plan"})
+        frames = self.frames("p1", idle_timeout=1)
+        self.assertEqual([frame.split("\n")[1] for frame in frames],
+                         ["event: flow_started", "event: stage_started", "event: flow_finished"])
+        self.assertTrue(frames[1].startswith("id: 2\n"))
+        self.assertEqual(len(self.frames("p1", last_event_id=2, idle_timeout=1)), 1)
+
+    def test_waits_for_a_run_that_has_not_started_yet(self):
+        def run():
+            time.sleep(0.2)
+            publish_event("p1", "flow_started")
+            publish_event("p1", "flow_finished")
+
+        threading.Thread(target=run).start()
+        frames = self.frames("p1", idle_timeout=5)
+        self.assertGreater(frames.count(": keep-alive\n\n"), 1)
+        self.assertEqual([frame.split("\n")[1] for frame in frames if not frame.startswith(":")],
+                         ["event: flow_started", "event: flow_finished"])
+
+    def test_ends_after_the_idle_timeout(self):
+        publish_event("p1", "flow_started")
+        started_at = time.monotonic()
+        frames = self.frames("p1", idle_timeout=0.2)
+        self.assertLess(time.monotonic() - started_at, 2)
+        self.assertEqual(frames[0].split("\n")[1], "event: flow_started")
+        self.assertTrue(all(frame == ": keep-alive\n\n" for frame in frames[1:]))
+
+    def test_reset_keeps_event_ids_increasing(self):
+        publish_event("p1", "flow_started")
+        reset_events("p1")
+        self.assertEqual(publish_event("p1", "flow_started"), 2)
+        events = [frame for frame in self.frames("p1", idle_timeout=0.1) if not frame.startswith(":")]
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith("id: 2\n"))
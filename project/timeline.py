@@ -0,0 +1,99 @@
+"""
+Moving a whole project to a new timeline.
+
+A card's offset from the project's start is given by its stored dates and
+the project's stored start date, so when the start moves, every card is
+re-dated from its offset instead of running the flow again. With
+`working_days`, a card keeps its offset and its length in working days on
+the organization's calendar: all the cards are rebased with vectorized
+calendar calls (`WorkingCalendar.rebase_spans`). Otherwise every date moves
+by the same number of calendar days. The cards whose dates changed are saved
+with one `bulk_update` and pushed to the board as one concurrent batch, which
+the Trello rate limiter paces.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from django.db import transaction
+
+from planning.calendar import parse_dates, to_dates
+from project.board_sync import push_card_dates, save_card_dates
+from project.models import Project, ProjectCard
+
+
+@dataclass
+class TimelineShift:
+    start: date
+    end: date
+    working_days: bool
+    # Card ID -> new (start, end) of the cards whose dates changed
+    changes: dict[int, tuple[Optional[date], Optional[date]]] = field(default_factory=dict)
+    # Cards that end after the new end of the project
+    past_end: list[int] = field(default_factory=list)
+    push_failures: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "start_date": self.start.isoformat(),
+            "end_date": self.end.isoformat(),
+            "working_days": self.working_days,
+            "cards_moved": len(self.changes),
+            "changes": [
+                {
+                    "id": card_id,
+                    "start_date": start.isoformat() if start else None,
+                    "end_date": end.isoformat() if end else None,
+                }
+                for card_id, (start, end) in self.changes.items()
+            ],
+            "past_end": self.past_end,
+            "push_failures": self.push_failures,
+        }
+
+
+def shift_project_timeline(project: Project, start_date: date, end_date: Optional[date] = None,
+                           working_days: bool = True, dry_run: bool = False) -> TimelineShift:
+    """
+    Moves the project to start on `start_date` (and end on `end_date`, or as many days later as before)
+    and its cards with it; with `dry_run`, nothing is saved or pushed.
+    """
+    if end_date is None:
+        end_date = start_date + (project.end_date - project.start_date)
+    cards = list(ProjectCard.objects.filter(project=project).order_by("id"))
+    starts = parse_dates([card.start_date for card in cards])
+    ends = parse_dates([card.end_date for card in cards])
+
+    if working_days:
+        calendar = project.organization.working_calendar()
+        new_starts, new_ends = calendar.rebase_spans(starts, ends, project.start_date, start_date)
+    else:
+        # NaT stays NaT
+        days = np.timedelta64((start_date - project.start_date).days, "D")
+        new_starts, new_ends = starts + days, ends + days
+
+    moved = np.flatnonzero(
+        ((new_starts != starts) & ~np.isnat(starts)) | ((new_ends != ends) & ~np.isnat(ends))
+    )
+    moved_starts, moved_ends = to_dates(new_starts[moved]), to_dates(new_ends[moved])
+    shift = TimelineShift(
+        start=start_date,
+        end=end_date,
+        working_days=working_days,
+        changes={cards[index].id: (start, end) for index, start, end in zip(moved, moved_starts, moved_ends)},
+        past_end=[cards[index].id for index in np.flatnonzero(new_ends > np.datetime64(end_date, "D"))],
+    )
+    if dry_run:
+        return shift
+
+    moved_cards = [cards[index] for index in moved]
+    for card, start, end in zip(moved_cards, moved_starts, moved_ends):
+        card.start_date, card.end_date = start, end
+    with transaction.atomic():
+        project.start_date, project.end_date = start_date, end_date
+        project.save(update_fields=["start_date", "end_date", "updated_at"])
+        save_card_dates(moved_cards)
+
+    shift.push_failures = push_card_dates(moved_cards)
+    return shift
@@ -1,7 +1,38 @@
 from django.urls import path
 
-from project.views import CreateProjectView
+from project.views import (
+    CardDependenciesView,
+    CommitPlanPreviewView,
+    CreateProjectView,
+    OrganizationUsageView,
+    OrganizationWorkloadView,
+    PlanPreviewView,
+    ProjectMemberMatchesView,
+    ProjectEventsView,
+    ProjectPlanPreviewsView,
+    ProjectScheduleRiskView,
+    ProjectTimelineShiftView,
+    ProjectUsageView,
+    ProjectWorkloadView,
+    RescheduleCardView,
+)
 
 urlpatterns = [
     path('create/', CreateProjectView.as_view(), name='create_project'),
+    path('<uuid:project_id>/events/', ProjectEventsView.as_view(), name='project_events'),
+    path('<uuid:project_id>/usage/', ProjectUsageView.as_view(), name='project_usage'),
+    path('<uuid:project_id>/matches/', ProjectMemberMatchesView.as_view(), name='project_member_matches'),
+    path('<uuid:project_id>/risk/', ProjectScheduleRiskView.as_view(), name='project_schedule_risk'),
+    path('<uuid:project_id>/workload/', ProjectWorkloadView.as_view(), name='project_workload'),
+    path('<uuid:project_id>/cards/<int:card_id>/dependencies/', CardDependenciesView.as_view(),
+         name='card_dependencies'),
+    path('<uuid:project_id>/cards/<int:card_id>/reschedule/', RescheduleCardView.as_view(),
+         name='reschedule_card'),
+    path('<uuid:project_id>/timeline/', ProjectTimelineShiftView.as_view(), name='project_timeline_shift'),
+    path('<uuid:project_id>/previews/', ProjectPlanPreviewsView.as_view(), name='project_plan_previews'),
+    path('previews/<uuid:preview_id>/', PlanPreviewView.as_view(), name='plan_preview'),
+    path('previews/<uuid:preview_id>/commit/', CommitPlanPreviewView.as_view(), name='commit_plan_preview'),
+    path('usage/organization/<uuid:organization_id>/', OrganizationUsageView.as_view(), name='organization_usage'),
+    path('workload/organization/<uuid:organization_id>/', OrganizationWorkloadView.as_view(),
+         name='organization_workload'),
 ]
@@ -1,15 +1,54 @@
+import json
+
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.decorators import api_view
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 
-from project.tasks import create_project
-from .serializer import CreateProjectSerializer
+from project.events import stream_events
+from project.graph import dependency_graph
+from organization.models import Organization
+from planning.calendar import parse_date
+from planning.risk import RiskTask, simulate_schedule
+from project.matching import member_index
+from project.models import LLMUsage, PlanPreview, Project, ProjectCard
+from project.rescheduling import reschedule_card
+from project.tasks import commit_plan_preview, create_project
+from project.timeline import shift_project_timeline
+from project.workload import organization_workload, project_workload
+from pm_master.tracing import inject_context, tracer
+from .serializer import (
+    CreateProjectSerializer,
+    MemberMatchRequestSerializer,
+    PlanPreviewSerializer,
+    PlanPreviewSummarySerializer,
+    ProjectCardSerializer,
+    RescheduleCardSerializer,
+    ScheduleRiskRequestSerializer,
+    TimelineShiftSerializer,
+)
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 # Create your views here.
+def organization_projects(request):
+    """Projects of the requester's organization; any other organization's project is not found."""
+    return Project.objects.filter(organization_id=request.user.organization_id)
+
+
+def organization_plan_previews(request):
+    """Plan previews of the requester's organization's projects."""
+    return PlanPreview.objects.filter(project__organization_id=request.user.organization_id)
+
+
+def requester_organizations(request):
+    """The requester's organization; any other organization is not found."""
+    return Organization.objects.filter(id=request.user.organization_id)
+
+
 class CreateProjectView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -27,6 +66,11 @@ class CreateProjectView(APIView):
         tags=["Project"],
     )
     def post(self, request):
+        # Root span of the project run; its context travels with the Celery message
+        with tracer.start_as_current_span("CreateProjectView.post"):
+            return self._create(request)
+
+    def _create(self, request):
         serializer = CreateProjectSerializer(data=request.data)
         if serializer.is_valid():
             project = serializer.save()
@@ -44,7 +88,8 @@ class CreateProjectView(APIView):
 
             try:
                 # TODO: Run Celery task here if needed
-                create_project.delay(str(project.id))
+                mode = "preview" if serializer.validated_data.get("preview") else "full"
+                create_project.delay(str(project.id), trace_context=inject_context(), mode=mode)
             except Exception as e:
                 print(e)
                 return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -52,3 +97,482 @@ class CreateProjectView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF negotiate `Accept: text/event-stream` for SSE views."""
+    media_type = "text/event-stream"
+    format = "txt"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data)
+
+
+class ProjectEventsView(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    @swagger_auto_schema(
+        operation_description="Stream live progress of a project run as server-sent events "
+                              "(stage transitions, card creation, token and latency counters)",
+        operation_summary="Stream project run events",
+        manual_parameters=[
+            openapi.Parameter("last_event_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Resume after this event ID (the Last-Event-ID header is also honoured)"),
+        ],
+        responses={
+            200: openapi.Response("text/event-stream of project events"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, project_id):
+        if not organization_projects(request).filter(id=project_id).exists():
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id") or 0
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return Response({"error": "last_event_id must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_events(str(project_id), last_event_id),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class ProjectUsageView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Token and cost ledger of a project: totals, per stage, per run and the most expensive prompts",
+        operation_summary="Get project LLM usage",
+        manual_parameters=[
+            openapi.Parameter("run_id", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Restrict the ledger to a single run"),
+        ],
+        responses={
+            200: openapi.Response("Project LLM usage"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, project_id):
+        if not organization_projects(request).filter(id=project_id).exists():
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        usage = LLMUsage.objects.filter(project_id=project_id)
+        run_id = request.query_params.get("run_id")
+        if run_id:
+            usage = usage.filter(run_id=run_id)
+
+        return Response({
+            "totals": usage.totals(),
+            "by_stage": list(usage.by_stage()),
+            "by_run": list(usage.by_run()),
+            "most_expensive_prompts": list(usage.most_expensive_prompts()),
+        }, status=status.HTTP_200_OK)
+
+
+class OrganizationUsageView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Token and cost ledger across all projects of an organization",
+        operation_summary="Get organization LLM usage",
+        responses={
+            200: openapi.Response("Organization LLM usage"),
+            404: openapi.Response("Organization not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, organization_id):
+        if not requester_organizations(request).filter(id=organization_id).exists():
+            return Response({"error": "Organization not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        usage = LLMUsage.objects.for_organization(organization_id)
+
+        return Response({
+            "totals": usage.totals(),
+            "by_stage": list(usage.by_stage()),
+            "by_project": list(usage.by_project()),
+            "most_expensive_prompts": list(usage.most_expensive_prompts()),
+        }, status=status.HTTP_200_OK)
+
+
+class ProjectMemberMatchesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Rank the project's members for each task by TF-IDF match of the task's title and "
+                              "description against the members' roles and skills; without tasks, the project's "
+                              "cards are ranked",
+        operation_summary="Match tasks to members",
+        request_body=MemberMatchRequestSerializer,
+        responses={
+            200: openapi.Response("Ranked candidates per task"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, project_id):
+        if not organization_projects(request).filter(id=project_id).exists():
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = MemberMatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = serializer.validated_data.get("tasks")
+        if tasks is None:
+            tasks = [
+                {"id": str(card.id), "title": card.name, "description": card.description}
+                for card in ProjectCard.objects.filter(project_id=project_id).order_by("id")
+            ]
+        index = member_index(project_id)
+        ranked = index.rank(
+            [f"{task['title']} {task.get('description', '')}" for task in tasks], serializer.validated_data["limit"],
+        )
+        return Response({
+            "matches": [
+                {
+                    "id": task.get("id"),
+                    "title": task["title"],
+                    "candidates": [
+                        {"member_id": match.member["id"], "name": match.member["name"],
+                         "role": match.member["role"], "score": match.score}
+                        for match in matches
+                    ],
+                }
+                for task, matches in zip(tasks, ranked)
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+WORKLOAD_WINDOW_PARAMETERS = [
+    openapi.Parameter("start_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                      description="First day of the heatmap (YYYY-MM-DD)"),
+    openapi.Parameter("end_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                      description="Last day of the heatmap (YYYY-MM-DD)"),
+]
+
+
+def workload_window(request):
+    """The heatmap's start and end dates from the query, or an error response for a malformed one."""
+    window = []
+    for name in ("start_date", "end_date"):
+        value = request.query_params.get(name)
+        if value and parse_date(value) is None:
+            return None, Response({"error": f"{name} must be a YYYY-MM-DD date"}, status=status.HTTP_400_BAD_REQUEST)
+        window.append(value)
+    return window, None
+
+
+class ProjectWorkloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Daily workload of each project member from the project's assigned, dated cards: a "
+                              "member x day heatmap of load against capacity (working days outside the member's "
+                              "time off) and the runs of days on which a member is over-allocated",
+        operation_summary="Get project workload",
+        manual_parameters=WORKLOAD_WINDOW_PARAMETERS,
+        responses={
+            200: openapi.Response("Project workload"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, project_id):
+        project = organization_projects(request).select_related("organization").filter(id=project_id).first()
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        window, error = workload_window(request)
+        if error is not None:
+            return error
+
+        with tracer.start_as_current_span("ProjectWorkloadView.get"):
+            workload = project_workload(project, *window)
+        return Response(workload, status=status.HTTP_200_OK)
+
+
+class OrganizationWorkloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Daily workload of everybody on the organization's active projects (members are "
+                              "matched across projects by email), with the days on which they are over-allocated",
+        operation_summary="Get organization workload",
+        manual_parameters=WORKLOAD_WINDOW_PARAMETERS,
+        responses={
+            200: openapi.Response("Organization workload"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Organization not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, organization_id):
+        organization = requester_organizations(request).filter(id=organization_id).first()
+        if organization is None:
+            return Response({"error": "Organization not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        window, error = workload_window(request)
+        if error is not None:
+            return error
+
+        with tracer.start_as_current_span("OrganizationWorkloadView.get"):
+            workload = organization_workload(organization, *window)
+        return Response(workload, status=status.HTTP_200_OK)
+
+
+class CardDependenciesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Dependencies of a card of the project: the cards it directly depends on, every card "
+                              "that must finish before it can start, the cards that directly depend on it and "
+                              "every card it blocks. Answered from the project's precomputed reachability index",
+        operation_summary="Get card dependencies",
+        responses={
+            200: openapi.Response("Card dependencies"),
+            404: openapi.Response("Card not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, project_id, card_id):
+        card = ProjectCard.objects.filter(
+            project_id=project_id, id=card_id, project__organization_id=request.user.organization_id,
+        ).first()
+        if card is None:
+            return Response({"error": "Card not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        graph = dependency_graph(project_id)
+        related = {
+            "depends_on": graph.direct_dependencies(card.id),
+            "prerequisites": graph.prerequisites(card.id),
+            "dependents": graph.direct_dependents(card.id),
+            "blocks": graph.blocks(card.id),
+        }
+        cards = ProjectCard.objects.in_bulk({card_id for card_ids in related.values() for card_id in card_ids})
+        return Response({
+            "card": ProjectCardSerializer(card).data,
+            **{
+                relation: ProjectCardSerializer([cards[card_id] for card_id in card_ids if card_id in cards], many=True).data
+                for relation, card_ids in related.items()
+            },
+        }, status=status.HTTP_200_OK)
+
+
+class RescheduleCardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Move a card's dates and shift the cards downstream of it as far as their "
+                              "dependencies require: each moved card starts on the working day after its latest "
+                              "dependency ends and keeps its length in working days; cards with enough slack stay. "
+                              "Only the changed cards are saved and sent to the board, in one batch",
+        operation_summary="Reschedule a card",
+        request_body=RescheduleCardSerializer,
+        responses={
+            200: openapi.Response("Date changes"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Card not found"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, project_id, card_id):
+        card = ProjectCard.objects.select_related("project__organization").filter(
+            project_id=project_id, id=card_id, project__organization_id=request.user.organization_id,
+        ).first()
+        if card is None:
+            return Response({"error": "Card not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = RescheduleCardSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # A new start alone moves the whole card; a new end alone keeps its start
+        start_date = serializer.validated_data.get("start_date")
+        end_date = serializer.validated_data.get("end_date")
+        if start_date is None and card.start_date and end_date < card.start_date:
+            return Response({"error": "end_date is before the card's start_date"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with tracer.start_as_current_span("RescheduleCardView.post") as span:
+            rescheduling = reschedule_card(card, start_date, end_date, dry_run=serializer.validated_data["dry_run"])
+            span.set_attribute("reschedule.changes", len(rescheduling.changes))
+        return Response(rescheduling.as_dict(), status=status.HTTP_200_OK)
+
+
+class ProjectTimelineShiftView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Move the project to a new start (and end) date and re-date every card from its "
+                              "offset to the project start, in working days on the organization's calendar or in "
+                              "calendar days. The moved cards are saved and sent to the board concurrently, "
+                              "without running the crews",
+        operation_summary="Shift the project timeline",
+        request_body=TimelineShiftSerializer,
+        responses={
+            200: openapi.Response("New card dates"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, project_id):
+        project = organization_projects(request).select_related("organization").filter(id=project_id).first()
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = TimelineShiftSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with tracer.start_as_current_span("ProjectTimelineShiftView.post") as span:
+            shift = shift_project_timeline(project, **serializer.validated_data)
+            span.set_attribute("timeline.cards_moved", len(shift.changes))
+        return Response(shift.as_dict(), status=status.HTTP_200_OK)
+
+
+class ProjectScheduleRiskView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Monte Carlo simulation of a plan's schedule from the project's start date: task "
+                              "durations are drawn from three-point (PERT) distributions and the dependencies "
+                              "are scheduled in every sample. Returns P50/P80/P95 completion dates, the "
+                              "probability of finishing by the project's end date and each task's criticality "
+                              "index (the share of samples in which it is on the critical path)",
+        operation_summary="Simulate schedule risk",
+        request_body=ScheduleRiskRequestSerializer,
+        responses={
+            200: openapi.Response("Schedule risk"),
+            400: openapi.Response("Bad request"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, project_id):
+        project = organization_projects(request).select_related("organization").filter(id=project_id).first()
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ScheduleRiskRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = [
+            RiskTask(
+                id=task["id"],
+                most_likely=task["estimate_days"],
+                optimistic=task.get("optimistic_days"),
+                pessimistic=task.get("pessimistic_days"),
+                depends_on=task["depends_on"],
+            )
+            for task in serializer.validated_data["tasks"]
+        ]
+        with tracer.start_as_current_span("ProjectScheduleRiskView.post") as span:
+            span.set_attribute("risk.tasks", len(tasks))
+            risk = simulate_schedule(
+                tasks, project.start_date, project.organization.working_calendar(),
+                samples=serializer.validated_data["samples"], deadline=project.end_date,
+                seed=serializer.validated_data.get("seed"),
+            )
+        return Response(risk.as_dict(), status=status.HTTP_200_OK)
+
+
+class ProjectPlanPreviewsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="List the plan previews of a project with their summaries (card count, date span, label distribution)",
+        operation_summary="List plan previews",
+        responses={
+            200: openapi.Response("Plan previews", PlanPreviewSummarySerializer(many=True)),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, project_id):
+        project = organization_projects(request).filter(id=project_id).first()
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        previews = project.plan_previews.all()
+        return Response(PlanPreviewSummarySerializer(previews, many=True).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Run research and planning only and store the resulting plan as a preview; "
+                              "nothing is created on the board",
+        operation_summary="Preview a project plan",
+        responses={
+            202: openapi.Response("Preview run queued"),
+            404: openapi.Response("Project not found"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, project_id):
+        if not organization_projects(request).filter(id=project_id).exists():
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        with tracer.start_as_current_span("ProjectPlanPreviewsView.post"):
+            create_project.delay(str(project_id), trace_context=inject_context(), mode="preview")
+        return Response({"status": "queued", "project_id": str(project_id)}, status=status.HTTP_202_ACCEPTED)
+
+
+class PlanPreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get a plan preview with its full card specifications",
+        operation_summary="Get plan preview",
+        responses={
+            200: openapi.Response("Plan preview", PlanPreviewSerializer),
+            404: openapi.Response("Plan preview not found"),
+        },
+        tags=["Project"],
+    )
+    def get(self, request, preview_id):
+        preview = organization_plan_previews(request).filter(id=preview_id).first()
+        if preview is None:
+            return Response({"error": "Plan preview not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(PlanPreviewSerializer(preview).data, status=status.HTTP_200_OK)
+
+
+class CommitPlanPreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Create the board content of a plan preview: runs only the execution stage against the stored plan",
+        operation_summary="Commit plan preview",
+        responses={
+            202: openapi.Response("Commit queued"),
+            404: openapi.Response("Plan preview not found"),
+            409: openapi.Response("Plan preview already committed"),
+        },
+        tags=["Project"],
+    )
+    def post(self, request, preview_id):
+        previews = organization_plan_previews(request)
+        if not previews.filter(id=preview_id).exists():
+            return Response({"error": "Plan preview not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Claim the preview atomically so it cannot be committed twice
+        claimed = previews.filter(id=preview_id, status=PlanPreview.STATUS_PREVIEW).update(
+            status=PlanPreview.STATUS_COMMITTING
+        )
+        if not claimed:
+            return Response({"error": "Plan preview is already committed"}, status=status.HTTP_409_CONFLICT)
+
+        with tracer.start_as_current_span("CommitPlanPreviewView.post"):
+            try:
+                commit_plan_preview.delay(str(preview_id), trace_context=inject_context())
+            except Exception as e:
+                PlanPreview.objects.filter(id=preview_id).update(status=PlanPreview.STATUS_PREVIEW)
+                return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"status": "queued", "preview_id": str(preview_id)}, status=status.HTTP_202_ACCEPTED)
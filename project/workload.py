@@ -0,0 +1,123 @@
+"""
+Cached workload matrices of projects and organizations.
+
+A matrix is built from the `ProjectCard` rows the first time a project's (or
+an organization's) workload is requested and is then kept current
+incrementally: each request fetches only the cards whose `updated_at` is not
+older than the last card applied, and applies them one by one. Cards are
+never deleted in place, so a change in the number or the IDs of the cards
+(one aggregate query) rebuilds the matrix, as does a change in the members,
+their time off, the project dates or the organization's holidays.
+
+An organization's matrix has a row per person: project members are matched
+by email across projects, and their time off is combined.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Sum
+
+from organization.models import Organization
+from planning.workload import WorkloadCard, WorkloadMatrix
+from project.caching import LRUCache
+from project.models import Project, ProjectCard, ProjectMember
+
+
+@dataclass
+class _Entry:
+    stamp: tuple
+    # (count, ID sum) of the cards the matrix was built from
+    cards: tuple
+    # updated_at of the latest card applied
+    synced_at: Optional[datetime]
+    matrix: WorkloadMatrix
+    lock: threading.Lock
+
+
+# ("project" | "organization", ID) -> matrix
+_entries: LRUCache[_Entry] = LRUCache()
+
+
+def project_workload(project: Project, start=None, end=None) -> dict:
+    """The project's workload (see `WorkloadMatrix.as_dict`), heatmap limited to `start`..`end` if given."""
+    members = ProjectMember.objects.filter(project=project)
+    stamp = (
+        tuple(members.aggregate(count=Count("id"), updated_at=Max("updated_at")).values()),
+        project.start_date, project.end_date,
+        project.organization.updated_at,
+    )
+
+    def build() -> WorkloadMatrix:
+        return WorkloadMatrix(
+            [_member(member) for member in members.order_by("id")],
+            project.start_date, project.end_date, project.organization.working_calendar(),
+            daily_capacity=settings.WORKLOAD_DAILY_CAPACITY,
+        )
+
+    return _workload(("project", str(project.id)), stamp, build, ProjectCard.objects.filter(project=project),
+                     lambda card: card["assignee_id"], start, end)
+
+
+def organization_workload(organization: Organization, start=None, end=None) -> dict:
+    """The workload of everybody on the organization's active projects, over all of those projects' dates."""
+    projects = Project.objects.filter(organization=organization, is_active=True, is_deleted=False)
+    members = ProjectMember.objects.filter(project__in=projects)
+    stamp = (
+        tuple(members.aggregate(count=Count("id"), updated_at=Max("updated_at")).values()),
+        tuple(projects.aggregate(
+            count=Count("id"), start=Min("start_date"), end=Max("end_date"), updated_at=Max("updated_at"),
+        ).values()),
+        organization.updated_at,
+    )
+
+    def build() -> WorkloadMatrix:
+        people: dict[str, dict] = {}
+        for member in members.order_by("id"):
+            email = member.email.casefold()
+            if email in people:
+                people[email]["time_off"] += member.time_off or []
+            else:
+                people[email] = {**_member(member), "id": email}
+        window = projects.aggregate(start=Min("start_date"), end=Max("end_date"))
+        return WorkloadMatrix(
+            list(people.values()), window["start"], window["end"], organization.working_calendar(),
+            daily_capacity=settings.WORKLOAD_DAILY_CAPACITY,
+        )
+
+    return _workload(("organization", str(organization.id)), stamp, build,
+                     ProjectCard.objects.filter(project__in=projects),
+                     lambda card: (card["assignee__email"] or "").casefold() or None, start, end)
+
+
+def _member(member: ProjectMember) -> dict:
+    return {"id": member.id, "name": member.name, "email": member.email, "role": member.role,
+            "time_off": list(member.time_off or [])}
+
+
+def _workload(key, stamp, build, cards, member_of, start, end) -> dict:
+    card_stamp = tuple(cards.aggregate(count=Count("id"), ids=Sum("id")).values())
+    entry = _entries.get_or_set(
+        key, lambda: _Entry(stamp, (), None, None, threading.Lock()), valid=lambda entry: entry.stamp == stamp,
+    )
+
+    with entry.lock:
+        fields = ("id", "assignee_id", "assignee__email", "start_date", "end_date", "updated_at")
+        if entry.matrix is None or entry.cards != card_stamp:
+            entry.matrix = build()
+            changed = list(cards.values(*fields))
+            entry.matrix.set_cards(_cards(changed, member_of))
+        else:
+            # Not only the later ones: a card saved in the same instant as the last one may not have been seen
+            changed = list(cards.filter(updated_at__gte=entry.synced_at).values(*fields)) if entry.synced_at else []
+            for card in _cards(changed, member_of):
+                entry.matrix.update(card)
+        entry.cards = card_stamp
+        entry.synced_at = max([card["updated_at"] for card in changed], default=entry.synced_at)
+        return entry.matrix.as_dict(start, end)
+
+
+def _cards(cards: list[dict], member_of) -> list[WorkloadCard]:
+    return [WorkloadCard(card["id"], member_of(card), card["start_date"], card["end_date"]) for card in cards]